@@ -0,0 +1,64 @@
+import json
+from datetime import datetime
+
+import aio_pika
+from aio_pika import Message, DeliveryMode, ExchangeType
+from aio_pika.abc import AbstractRobustConnection
+
+from app.entities.card import Card, CardStatus
+
+
+class CardEventPublisher:
+    """
+    Публикует изменения статуса карточек в fanout exchange, на который подписан producer.
+    """
+
+    def __init__(self,
+                 rabbit_url: str,
+                 exchange: str):
+        self.rabbit_url = rabbit_url
+        self.exchange_name = exchange
+        self.connection = None
+        self.channel = None
+        self.exchange = None
+        self._owns_connection = False
+
+    async def connect(self, connection: AbstractRobustConnection = None):
+        """
+        :param connection: Уже открытое соединение, например соединение consumer: публикатор открывает в нем
+            свой канал, а закрывает соединение его владелец. Без него открывается отдельное соединение.
+        """
+        self._owns_connection = connection is None
+        self.connection = connection or await aio_pika.connect_robust(self.rabbit_url)
+        self.channel = await self.connection.channel()
+        self.exchange = await self.channel.declare_exchange(self.exchange_name,
+                                                            ExchangeType.FANOUT,
+                                                            durable=True)
+
+    async def publish(self, card: Card):
+        # событие только уведомляет клиента, поэтому его потеря не должна ломать расчет
+        if self.exchange is None:
+            return
+        data = {
+            'id': str(card.id),
+            'user_id': str(card.user_id),
+            'card_type': card.card_type,
+            'status': CardStatus(card.status).value,
+            'updated_at': datetime.now().isoformat(),
+        }
+        try:
+            await self.exchange.publish(
+                Message(json.dumps(data).encode(),
+                        content_type='application/json',
+                        delivery_mode=DeliveryMode.NOT_PERSISTENT),
+                routing_key='',
+            )
+        except Exception as e:
+            print(f"Failed to publish event for card {card.id}: {e}")
+
+    async def close(self):
+        if self.connection and self._owns_connection:
+            await self.connection.close()
+        elif self.channel and not self.channel.is_closed:
+            await self.channel.close()
+        self.exchange = None
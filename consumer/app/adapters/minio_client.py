@@ -1,10 +1,18 @@
-from minio import Minio
+from app.adapters.object_storage import S3ObjectStorage
 from app.core.config import settings
 
-client = Minio(
-    settings.MINIO_ENDPOINT,
+# Один клиент на процесс: пул HTTP-соединений общий для всех задач, которые ходят в MinIO
+storage = S3ObjectStorage(
+    endpoint_url=f'{"https" if settings.MINIO_SECURE else "http"}://{settings.MINIO_ENDPOINT}',
     access_key=settings.MINIO_ACCESS_KEY,
     secret_key=settings.MINIO_SECRET_KEY,
-    secure=False
+    region=settings.MINIO_REGION,
+    max_pool_connections=settings.MINIO_POOL_SIZE,
+    connect_timeout=settings.MINIO_CONNECT_TIMEOUT,
+    read_timeout=settings.MINIO_READ_TIMEOUT,
+    retries=settings.MINIO_RETRIES,
+    multipart_threshold=settings.MINIO_MULTIPART_THRESHOLD,
+    part_size=settings.MINIO_PART_SIZE,
+    max_concurrency=settings.MINIO_TRANSFER_CONCURRENCY,
+    spool_max_size=settings.MINIO_SPOOL_MAX_SIZE,
 )
-
@@ -1,64 +1,180 @@
 import asyncio
 import json
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
 
 import aio_pika
-from aio_pika import IncomingMessage, Message, DeliveryMode
+from aio_pika import IncomingMessage, Message, DeliveryMode, ExchangeType
+from aio_pika.abc import AbstractChannel, AbstractQueue
 
+from app.card_handlers.base.exceptions import CardHandlerException
+from app.core.metrics import MESSAGES_IN_FLIGHT, QUEUE_WAIT_SECONDS, PROCESSING_SECONDS
 from app.entities.card import Card
+from app.exceptions.card import CardLeaseBusy
 from app.services.card_service import CardServiceFactory
 
 
+@dataclass
+class QueueConfig:
+    """
+    Настройки одной очереди.
+
+    :param name: Имя очереди.
+    :param routing_key: Ключ привязки к exchange, None - очередь не привязывается (старая общая очередь).
+    :param prefetch_count: Сколько сообщений брокер отдает каналу очереди без подтверждения.
+    :param concurrency: Сколько сообщений очереди обрабатывается одновременно.
+    """
+    name: str
+    routing_key: Optional[str] = None
+    prefetch_count: int = 10
+    concurrency: int = 1
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Повторная обработка через очереди ожидания: сообщение публикуется в очередь с TTL,
+    после истечения которого брокер возвращает его в исходную очередь.
+
+    :param max_attempts: Количество повторов, после которых сообщение уходит в очередь {queue}.dead.
+    :param base_delay: Задержка перед первым повтором, с. Каждый следующий повтор ждет вдвое дольше.
+    :param max_delay: Максимальная задержка, с.
+    :param jitter: Доля задержки, на которую она случайно уменьшается, чтобы повторы не шли пачкой.
+    """
+    max_attempts: int = 5
+    base_delay: float = 5
+    max_delay: float = 300
+    jitter: float = 0.2
+
+    def tier_delay(self, attempt: int) -> float:
+        return min(self.base_delay * 2 ** attempt, self.max_delay)
+
+    def delay(self, attempt: int) -> float:
+        return self.tier_delay(attempt) * (1 - self.jitter * random.random())
+
+
+@dataclass
+class _QueueConsumer:
+    config: QueueConfig
+    channel: AbstractChannel
+    queue: AbstractQueue
+    semaphore: asyncio.Semaphore
+    consumer_tag: Optional[str] = None
+
+
+def card_routing_key(card_type: str) -> str:
+    return f'card.{card_type}'
+
+
+def retry_queue_name(queue: str, delay: float) -> str:
+    # задержка входит в имя, чтобы смена настроек не конфликтовала с уже объявленными очередями
+    return f'{queue}.retry.{int(delay * 1000)}'
+
+
+def dead_letter_queue_name(queue: str) -> str:
+    return f'{queue}.dead'
+
+
 class RabbitMQConsumer:
-    MAX_RETRIES = 5
+    FAILURE_REASON_LIMIT = 1000
 
     def __init__(self,
                  rabbit_url: str,
-                 queue: str,
-                 card_service_factory: CardServiceFactory):
+                 exchange: str,
+                 queues: list[QueueConfig],
+                 card_service_factory: CardServiceFactory,
+                 shutdown_timeout: float = 60,
+                 retry_policy: RetryPolicy = None,
+                 dedup_size: int = 10000):
         self.rabbit_url = rabbit_url
-        self.queue = queue
+        self.exchange = exchange
+        self.queues = queues
         self.card_service_factory = card_service_factory
+        self.shutdown_timeout = shutdown_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
         self.connection = None
-        self.channel = None
-        self.queue_object = None
+        self.consumers: list[_QueueConsumer] = []
+        # задачи обработки сообщений, которые нужно дождаться при остановке
+        self._in_flight: set[asyncio.Task] = set()
+        self._closing = False
+        # message_id уже обработанных сообщений: повторные доставки отбрасываются без обращения к БД
+        self._processed: OrderedDict[str, None] = OrderedDict()
+        self._dedup_size = dedup_size
 
     async def connect(self):
         try:
             self.connection = await aio_pika.connect_robust(self.rabbit_url)
-            self.channel = await self.connection.channel()
-            await self.channel.set_qos(prefetch_count=10)
-            self.queue_object = await self.channel.declare_queue(self.queue, durable=True)
-            # logger.info(f"Connected to RabbitMQ and declared queue '{self.queue}'")
+            # у каждой очереди свой канал, чтобы prefetch одного типа карточек не влиял на другие
+            for config in self.queues:
+                channel = await self.connection.channel()
+                await channel.set_qos(prefetch_count=config.prefetch_count)
+                queue = await channel.declare_queue(config.name, durable=True)
+                if config.routing_key is not None:
+                    exchange = await channel.declare_exchange(self.exchange, ExchangeType.TOPIC, durable=True)
+                    await queue.bind(exchange, routing_key=config.routing_key)
+                await self.__declare_retry_queues(channel, config.name)
+                self.consumers.append(_QueueConsumer(config=config,
+                                                     channel=channel,
+                                                     queue=queue,
+                                                     semaphore=asyncio.Semaphore(config.concurrency)))
+            # logger.info(f"Connected to RabbitMQ and declared queues")
         except Exception as e:
             # logger.error(f"Failed to connect to RabbitMQ: {e}")
             raise e
 
     async def start_consuming(self):
-        await self.connect()
-        await self.queue_object.consume(self.on_message)
+        if not self.consumers:
+            await self.connect()
+        for consumer in self.consumers:
+            consumer.consumer_tag = await consumer.queue.consume(partial(self.on_message, consumer))
         # logger.info("Started consuming messages")
 
-    async def on_message(self, message: IncomingMessage):
+    async def on_message(self, consumer: _QueueConsumer, message: IncomingMessage):
+        # каждое сообщение обрабатывается в отдельной задаче, одновременно - не больше concurrency задач очереди
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+        if message.message_id and message.message_id in self._processed:
+            await message.ack()
+            return
+
+        received = time.perf_counter()
         body = message.body.decode()
         data = json.loads(body)
 
         headers = message.headers or {}
         retries = headers.get("x-retries", 0)
 
+        queue = consumer.config.name
         try:
-            await self.__work(data)
+            async with consumer.semaphore:
+                if self._closing:
+                    # обработка еще не началась - возвращаем сообщение в очередь другому воркеру
+                    await message.nack(requeue=True)
+                    return
+                QUEUE_WAIT_SECONDS.labels(queue).observe(time.perf_counter() - received)
+                with MESSAGES_IN_FLIGHT.labels(queue).track_inprogress(), \
+                        PROCESSING_SECONDS.labels(queue).time():
+                    await self.__work(data)
+            # подтверждаем только после завершения обработки
+            self.__remember(message.message_id)
             await message.ack()
-        except Exception:
-            if retries < self.MAX_RETRIES:
-                new_headers = {**headers, "x-retries": retries + 1}
-                await self.channel.default_exchange.publish(
-                    Message(
-                        message.body,
-                        headers=new_headers,
-                        delivery_mode=DeliveryMode.PERSISTENT,
-                    ),
-                    routing_key=self.queue,
-                )
+        except Exception as e:
+            reason = f'{type(e).__name__}: {e}'[:self.FAILURE_REASON_LIMIT]
+            # ошибка обработчика повторится при любом повторе, поэтому сразу в очередь dead
+            if retries < self.retry_policy.max_attempts and not isinstance(e, CardHandlerException):
+                await self.__retry(consumer, message, headers, retries)
+            else:
+                await self.__dead_letter(consumer, message, headers, reason)
+                # карточку, которую считает другой воркер, не помечаем как FAILED
+                if not isinstance(e, CardLeaseBusy):
+                    await self.__fail_card(data, str(e) or reason)
             # ACK оригинал в любом случае — чтобы не было зацикливания
             await message.ack()
 
@@ -66,6 +182,72 @@ class RabbitMQConsumer:
         async with self.card_service_factory.get_service() as card_service:
             await card_service.process_card(**data)
 
+    def __remember(self, message_id: Optional[str]):
+        if not message_id:
+            return
+        self._processed[message_id] = None
+        self._processed.move_to_end(message_id)
+        while len(self._processed) > self._dedup_size:
+            self._processed.popitem(last=False)
+
+    async def __declare_retry_queues(self, channel: AbstractChannel, queue: str):
+        for attempt in range(self.retry_policy.max_attempts):
+            delay = self.retry_policy.tier_delay(attempt)
+            await channel.declare_queue(
+                retry_queue_name(queue, delay),
+                durable=True,
+                arguments={
+                    'x-message-ttl': int(delay * 1000),
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': queue,
+                },
+            )
+        await channel.declare_queue(dead_letter_queue_name(queue), durable=True)
+
+    async def __retry(self, consumer: _QueueConsumer, message: IncomingMessage, headers: dict, retries: int):
+        # TTL сообщения не больше TTL очереди, поэтому разброс не нарушает порядок истечения внутри очереди
+        await consumer.channel.default_exchange.publish(
+            Message(
+                message.body,
+                headers={**headers, "x-retries": retries + 1},
+                message_id=message.message_id,
+                delivery_mode=DeliveryMode.PERSISTENT,
+                expiration=self.retry_policy.delay(retries),
+            ),
+            routing_key=retry_queue_name(consumer.config.name, self.retry_policy.tier_delay(retries)),
+        )
+
+    async def __dead_letter(self, consumer: _QueueConsumer, message: IncomingMessage, headers: dict, reason: str):
+        await consumer.channel.default_exchange.publish(
+            Message(
+                message.body,
+                headers={
+                    **headers,
+                    "x-failure-reason": reason,
+                    "x-failed-at": datetime.now().isoformat(),
+                },
+                message_id=message.message_id,
+                delivery_mode=DeliveryMode.PERSISTENT,
+            ),
+            routing_key=dead_letter_queue_name(consumer.config.name),
+        )
+
+    async def __fail_card(self, data: dict, reason: str):
+        try:
+            async with self.card_service_factory.get_service() as card_service:
+                await card_service.fail_card(data['id'], reason)
+        except Exception as e:
+            print(f"Failed to mark card {data.get('id')} as failed: {e}")
+
     async def close(self):
+        # перестаем принимать новые сообщения и дожидаемся уже начатых;
+        # неподтвержденные сообщения брокер вернет в очередь после закрытия соединения
+        self._closing = True
+        for consumer in self.consumers:
+            if consumer.consumer_tag is not None:
+                await consumer.queue.cancel(consumer.consumer_tag)
+        if self._in_flight:
+            await asyncio.wait(set(self._in_flight), timeout=self.shutdown_timeout)
         if self.connection:
-            await self.connection.close()
\ No newline at end of file
+            await self.connection.close()
+        self.consumers = []
@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+from typing import Optional
+
+
+class SpooledFile(io.BufferedIOBase):
+    """
+    Файл для обработчиков: до max_size байт держится в памяти, сверх этого - во временном файле на диске.
+
+    При передаче в процесс-воркер передается путь к временному файлу, а не его содержимое.
+    Временный файл удаляется при закрытии в процессе, который его создал.
+
+    :param name: Имя исходного файла, обработчики проверяют по нему расширение.
+    :param max_size: Размер, после которого содержимое переносится на диск.
+    """
+
+    def __init__(self, name: str, max_size: int = 16 * 1024 * 1024):
+        super().__init__()
+        self.name = name
+        self._max_size = max_size
+        self._file = io.BytesIO()
+        self._path: Optional[str] = None
+        self._owner = True
+
+    @property
+    def rolled(self) -> bool:
+        return self._path is not None
+
+    def write(self, data) -> int:
+        if self._path is None and self._file.tell() + len(data) > self._max_size:
+            self.__rollover()
+        return self._file.write(data)
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self._file.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._file.read1(size)
+
+    def readinto(self, buffer) -> int:
+        return self._file.readinto(buffer)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return self._owner
+
+    def close(self):
+        if self.closed:
+            return
+        self._file.close()
+        if self._owner and self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+        super().close()
+
+    def __rollover(self):
+        fd, path = tempfile.mkstemp(prefix='npi-spool-')
+        file = os.fdopen(fd, 'w+b')
+        file.write(self._file.getbuffer())
+        file.seek(self._file.tell())
+        self._file.close()
+        self._file = file
+        self._path = path
+
+    def __reduce__(self):
+        if self._path is not None:
+            self._file.flush()
+            return _restore, (self.name, None, self._path)
+        return _restore, (self.name, self._file.getvalue(), None)
+
+
+def _restore(name: str, data: Optional[bytes], path: Optional[str]) -> SpooledFile:
+    # копия в процессе-воркере только читает и не удаляет временный файл
+    spooled = SpooledFile(name)
+    spooled._owner = False
+    if path is not None:
+        spooled._file.close()
+        spooled._file = open(path, 'rb')
+        spooled._path = path
+    else:
+        spooled._file = io.BytesIO(data)
+    return spooled
@@ -1,8 +1,11 @@
+import io
 from abc import ABC, abstractmethod
 
 
-from dataclasses import dataclass
-from typing import Any, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.card_handlers.base.utils import stage, collect_stages
 
 
 @dataclass
@@ -22,11 +25,46 @@ class ResultParameter:
 class HandlerResult:
     data: Optional[list[ResultParameter]] # json с результатами
     assets: Optional[list[DataAsset]] # массив файлов
+    # независимые друг от друга генераторы файлов, запускаются параллельно в пуле процессов,
+    # поэтому должны сериализоваться pickle (функция модуля + аргументы, например functools.partial)
+    asset_producers: list[Callable[[], DataAsset]] = field(default_factory=list)
+    # время этапов расчета, с, и размер входного файла; заполняются в CardHandler.run
+    stages: dict[str, float] = field(default_factory=dict)
+    input_bytes: Optional[int] = None
 
 
 class CardHandler(ABC):
+    """
+    Экземпляр обработчика один на процесс (HandlerManager) и обрабатывает все карточки своего типа,
+    поэтому process не должен хранить в нем состояние отдельного расчета.
+    """
     CARD_TYPE: str = 'base'
 
+    # этапы внутри process размечаются через with self.stage('parse'): ...
+    stage = staticmethod(stage)
+
+    def setup(self):
+        """
+        Вызывается один раз в процессе до первой карточки: загрузка таблиц, прогрев кешей и JIT.
+        """
+
+    def teardown(self):
+        """
+        Вызывается при остановке процесса.
+        """
+
+    def run(self, data) -> HandlerResult:
+        """
+        Вызывает process, добавляя в результат время этапов и размер входного файла.
+        """
+        input_bytes = data.seek(0, io.SEEK_END)
+        data.seek(0)
+        with collect_stages() as stages:
+            result = self.process(data)
+        result.stages = stages
+        result.input_bytes = input_bytes
+        return result
+
     @abstractmethod
     def process(self, data) -> HandlerResult:
         raise NotImplementedError
@@ -1,17 +1,71 @@
-from typing import Type
+import importlib
+from functools import partial
+from typing import Callable, Type
 
-from app.card_handlers.base.card_handler import CardHandler
+from app.card_handlers.base.card_handler import CardHandler, HandlerResult
 from app.card_handlers.base.exceptions import NoSuchHandler
+from app.entities.card import CardType
+
+# экземпляры обработчиков этого процесса: setup выполняется один раз, процессы пулов,
+# созданные fork после warm_up, получают их уже готовыми
+_instances: dict[Type[CardHandler], CardHandler] = {}
+
+
+def handler_instance(handler_class: Type[CardHandler]) -> CardHandler:
+    handler = _instances.get(handler_class)
+    if handler is None:
+        handler = handler_class()
+        handler.setup()
+        _instances[handler_class] = handler
+    return handler
+
+
+def run_handler(handler_class: Type[CardHandler], data) -> HandlerResult:
+    # в пул процессов передается класс (pickle по имени), а не экземпляр со всеми его таблицами
+    return handler_instance(handler_class).run(data)
+
+
+def teardown_handlers():
+    while _instances:
+        _, handler = _instances.popitem()
+        handler.teardown()
 
 
 class HandlerManager:
-    def __init__(self, *handlers: Type[CardHandler]):
-        self._handlers = {
-            h.CARD_TYPE: h for h in handlers
-        }
+    """
+    Обработчики регистрируются путем импорта 'модуль:Класс' и импортируются при первой карточке своего типа:
+    pandas, scipy, matplotlib и openpyxl не загружаются при запуске процесса. warm_up импортирует все сразу.
+
+    :param handlers: Тип карточки -> путь импорта или уже импортированный класс обработчика.
+    """
+
+    def __init__(self, handlers: dict[str, str | Type[CardHandler]]):
+        self._handlers = {CardType(card_type).value: handler for card_type, handler in handlers.items()}
+
+    @property
+    def card_types(self) -> list[str]:
+        return list(self._handlers)
 
     def get_handler(self, card_type: str) -> CardHandler:
+        return handler_instance(self._resolve(card_type))
+
+    def get_runner(self, card_type: str) -> Callable[..., HandlerResult]:
+        """
+        Функция расчета для пула процессов: runner(data) вызывает run экземпляра обработчика в том процессе,
+        где выполняется.
+        """
+        return partial(run_handler, self._resolve(card_type))
+
+    def warm_up(self):
+        for card_type in self._handlers:
+            self.get_handler(card_type)
+
+    def _resolve(self, card_type: str) -> Type[CardHandler]:
         try:
-            return self._handlers[card_type]()
+            handler = self._handlers[card_type]
         except KeyError:
             raise NoSuchHandler(f'No handler found for type {card_type}')
+        if isinstance(handler, str):
+            module_name, _, class_name = handler.partition(':')
+            handler = self._handlers[card_type] = getattr(importlib.import_module(module_name), class_name)
+        return handler
@@ -0,0 +1,183 @@
+import threading
+from dataclasses import dataclass, field, asdict
+from io import BytesIO
+from typing import Optional
+
+import numpy as np
+
+# Рендеринг графиков без pyplot: у каждого потока свои фигуры, глобального состояния нет.
+# matplotlib импортируется при первом рендере: consumer с отложенным рендерингом графики не рисует
+
+DEFAULT_DPI = 200
+DEFAULT_FORMAT = 'png'
+
+MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+@dataclass
+class Line:
+    x: list[float]
+    y: list[float]
+    label: Optional[str] = None
+    color: Optional[str] = None
+    linestyle: str = '-'
+    marker: Optional[str] = None
+
+
+@dataclass
+class HLine:
+    y: float
+    label: Optional[str] = None
+    color: Optional[str] = None
+    linestyle: str = '-'
+
+
+@dataclass
+class ChartSpec:
+    """
+    Описание графика: данные и оформление, без привязки к matplotlib.
+
+    :param kind: Тип графика, для каждого типа держится своя шаблонная фигура.
+    :param title: Заголовок графика.
+    :param xlabel: Подпись оси X.
+    :param ylabel: Подпись оси Y.
+    :param lines: Линии графика.
+    :param hlines: Горизонтальные линии на всю ширину графика.
+    :param figsize: Размер фигуры в дюймах.
+    :param yticks: Положения делений оси Y; если не заданы, деления расставляются автоматически.
+    :param yticklabels: Подписи делений оси Y, по одной на каждое из yticks.
+    """
+    kind: str
+    title: str
+    xlabel: str
+    ylabel: str
+    lines: list[Line] = field(default_factory=list)
+    hlines: list[HLine] = field(default_factory=list)
+    figsize: tuple[float, float] = (10, 5)
+    yticks: Optional[list[float]] = None
+    yticklabels: Optional[list[str]] = None
+
+    def dump(self) -> dict:
+        data = asdict(self)
+        # numpy-массивы и скаляры приводятся к обычным float, чтобы описание можно было сохранить в JSON
+        for line in data['lines']:
+            line['x'] = np.asarray(line['x'], dtype=float).tolist()
+            line['y'] = np.asarray(line['y'], dtype=float).tolist()
+        for hline in data['hlines']:
+            hline['y'] = float(hline['y'])
+        data['figsize'] = list(data['figsize'])
+        # деления оси Y задаются редко, без них в описании остаются только прежние ключи
+        if data['yticks'] is None:
+            del data['yticks'], data['yticklabels']
+        else:
+            data['yticks'] = np.asarray(data['yticks'], dtype=float).tolist()
+        return data
+
+
+class _FigureTemplate:
+    """
+    Заранее построенная фигура одного типа графика. При рендере обновляются только данные линий.
+    """
+
+    def __init__(self, spec: ChartSpec):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # подписи делений оси Y длинные, без tight layout они обрезаются краем фигуры
+        self.figure = Figure(figsize=spec.figsize, layout='tight' if spec.yticklabels else None)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+        self.axes.grid()
+        self._lines = []
+        self._hlines = []
+
+    def update(self, spec: ChartSpec):
+        self.figure.set_size_inches(spec.figsize)
+        self.axes.set_title(spec.title)
+        self.axes.set_xlabel(spec.xlabel)
+        self.axes.set_ylabel(spec.ylabel)
+
+        auto_color = 0
+        for i, line in enumerate(spec.lines):
+            if i == len(self._lines):
+                self._lines.append(self.axes.plot([], [])[0])
+            artist = self._lines[i]
+            if line.color is None:
+                color = f'C{auto_color}'
+                auto_color += 1
+            else:
+                color = line.color
+            artist.set_data(line.x, line.y)
+            artist.set(label=line.label,
+                       color=color,
+                       linestyle=line.linestyle,
+                       marker=line.marker or 'None',
+                       visible=True)
+        for artist in self._lines[len(spec.lines):]:
+            artist.set(visible=False, label=None)
+
+        for i, hline in enumerate(spec.hlines):
+            if i == len(self._hlines):
+                self._hlines.append(self.axes.axhline(0))
+            self._hlines[i].set_ydata([hline.y, hline.y])
+            self._hlines[i].set(label=hline.label,
+                                color=hline.color or 'C0',
+                                linestyle=hline.linestyle,
+                                visible=True)
+        for artist in self._hlines[len(spec.hlines):]:
+            artist.set(visible=False, label=None)
+
+        self.axes.relim(visible_only=True)
+        self.axes.autoscale_view()
+        if spec.yticks is not None:
+            self.axes.set_yticks(spec.yticks, labels=spec.yticklabels)
+        else:
+            self._reset_yticks()
+        if any(line.label for line in spec.lines) or any(hline.label for hline in spec.hlines):
+            self.axes.legend(handles=[a for a in self._lines + self._hlines if a.get_visible() and a.get_label()])
+        elif self.axes.get_legend():
+            self.axes.get_legend().remove()
+
+
+    def _reset_yticks(self):
+        from matplotlib.ticker import AutoLocator, ScalarFormatter
+
+        if not isinstance(self.axes.yaxis.get_major_locator(), AutoLocator):
+            self.axes.yaxis.set_major_locator(AutoLocator())
+            self.axes.yaxis.set_major_formatter(ScalarFormatter())
+
+
+class ChartRenderer:
+    """
+    Потокобезопасный рендерер графиков по ChartSpec.
+
+    :param dpi: Разрешение изображения по умолчанию.
+    :param fmt: Формат изображения по умолчанию (png, svg).
+    """
+
+    def __init__(self, dpi: int = DEFAULT_DPI, fmt: str = DEFAULT_FORMAT):
+        self.dpi = dpi
+        self.fmt = fmt
+        self._local = threading.local()
+
+    def render(self, spec: ChartSpec, dpi: int = None, fmt: str = None) -> bytes:
+        template = self._get_template(spec)
+        template.update(spec)
+        output = BytesIO()
+        template.figure.savefig(output, format=fmt or self.fmt, dpi=dpi or self.dpi)
+        return output.getvalue()
+
+    def _get_template(self, spec: ChartSpec) -> _FigureTemplate:
+        templates = getattr(self._local, 'templates', None)
+        if templates is None:
+            templates = self._local.templates = {}
+        template = templates.get(spec.kind)
+        if template is None:
+            template = templates[spec.kind] = _FigureTemplate(spec)
+        return template
+
+
+renderer = ChartRenderer()
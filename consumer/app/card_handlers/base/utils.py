@@ -1,13 +1,43 @@
 import time
-from functools import wraps
-
-
-def print_work_time(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        res = func(*args, **kwargs)
-        end = time.time()
-        print(end - start)
-        return res
-    return wrapper
\ No newline at end of file
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Время этапов текущего расчета. Обработчик выполняется в пуле процессов, поэтому замеры
+# возвращаются вместе с HandlerResult, а метрики пишет уже card_service
+_current_stages: ContextVar[Optional[dict[str, float]]] = ContextVar('card_handler_stages', default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Замер этапа расчета: контекстный менеджер или декоратор.
+
+        with stage('parse'):
+            ...
+
+        @stage('compute')
+        def calc(...):
+            ...
+
+    Повторные вызовы одного этапа суммируются. Вне collect_stages ничего не замеряется.
+    """
+    stages = _current_stages.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def collect_stages():
+    stages = {}
+    token = _current_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _current_stages.reset(token)
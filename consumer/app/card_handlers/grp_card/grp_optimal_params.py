@@ -1,45 +1,58 @@
+from functools import partial
+
 import pandas as pd
 
 from app.card_handlers.grp_card.src.excel_reader import load_excel_data
+from app.card_handlers.grp_card.src import chen_kernels
 from app.card_handlers.grp_card.src.productivity_coefficient import ProductivityCoefficient
-from app.card_handlers.grp_card.src.plot_generator import generate_flow_distribution_graph, generate_productivity_coef_graph
+from app.card_handlers.grp_card.src.tail_in_utils import meyer_radius_curves
+from app.card_handlers.grp_card.src.plot_generator import flow_distribution_chart, productivity_coef_chart
 
 from app.card_handlers.base.exceptions import CardHandlerException
-from app.card_handlers.base.utils import print_work_time
 from app.card_handlers.base.card_handler import (
     CardHandler,
     HandlerResult,
     DataAsset,
     ResultParameter,
 )
+from app.core.config import settings
 from app.entities.card import CardType
 
 
 class GrpCardHandler(CardHandler):
     CARD_TYPE = CardType.GRP
 
-    @print_work_time
+    def __init__(self, flux_grid: str = None, flux_tolerance: float = None):
+        self.flux_grid = flux_grid or settings.GRP_FLUX_GRID
+        self.flux_tolerance = flux_tolerance or settings.GRP_FLUX_TOLERANCE
+
+    def setup(self):
+        meyer_radius_curves()
+        chen_kernels.use_backend(settings.GRP_KERNELS)
+
     def process(self, data) -> HandlerResult:
         """
         Основной метод обработки данных.
         """
         try:
-            file_content = pd.ExcelFile(data)
             if not data.name.endswith('.xlsx'):
                 raise CardHandlerException("Ожидается файл с расширением .xlsx")
 
             # Загрузка данных
-            seams, well, aux = load_excel_data(file_content)
+            with self.stage('parse'):
+                file_content = pd.ExcelFile(data)
+                seams, well, aux = load_excel_data(file_content)
             if seams is None or well is None or aux is None:
                 raise ValueError("Ошибка: данные не загружены, расчет не выполнен.")
 
             # Расчет коэффициента продуктивности
-            prod_coef = ProductivityCoefficient(seam_props=seams, well_props=well, aux_props=aux)
-            prod_coef.calc_prod_coef()
-
-            # Подготовка данных для графиков
-            graph_1 = generate_flow_distribution_graph(prod_coef)
-            graph_2 = generate_productivity_coef_graph(seams, well, aux)
+            with self.stage('compute'):
+                prod_coef = ProductivityCoefficient(seam_props=seams,
+                                                    well_props=well,
+                                                    aux_props=aux,
+                                                    flux_grid=self.flux_grid,
+                                                    flux_tolerance=self.flux_tolerance)
+                prod_coef.calc_prod_coef()
 
             # Формирование параметров результата
             result_data = [
@@ -51,12 +64,19 @@ class GrpCardHandler(CardHandler):
                                 value=prod_coef.well_props.array_prod_coef_tail.tolist()),
             ]
 
+            # распределение притока только оборачивает готовые массивы, его график собирается сразу;
+            # в пул графиков уходит лишь график продуктивности с пересчетами Кпрод
+            with self.stage('plot'):
+                flow_distribution = flow_distribution_asset(prod_coef)
+
             # Формирование итогового результата
             result = HandlerResult(
                 data=result_data,
-                assets=[
-                    DataAsset(name="График распределения притока", file_format=".png", asset_type="graph", data=graph_1['bytes']),
-                    DataAsset(name="График зависимости продуктивности", file_format=".png", asset_type="graph", data=graph_2['bytes']),
+                assets=[flow_distribution],
+                asset_producers=[
+                    partial(productivity_coef_asset, seams, well, aux,
+                            prod_coef.well_props.array_prod_coef_tail,
+                            self.flux_grid, self.flux_tolerance, chen_kernels.kernels.backend),
                 ]
             )
             return result
@@ -73,6 +93,25 @@ class GrpCardHandler(CardHandler):
                 raise ValueError(f"Отсутствует обязательный параметр: {key}")
 
 
+def flow_distribution_asset(prod_coef: ProductivityCoefficient) -> DataAsset:
+    return DataAsset(name="График распределения притока",
+                     file_format=".png",
+                     asset_type="graph",
+                     data=flow_distribution_chart(prod_coef))
+
+
+def productivity_coef_asset(seams, well, aux, prod_coef_tail,
+                            flux_grid: str = 'uniform', flux_tolerance: float = 1e-6,
+                            kernels: str = 'python') -> DataAsset:
+    # график пересчитывает Кпрод в процессе пула графиков, где setup обработчика мог не вызываться:
+    # ряды считаются тем же бэкендом, что и в расчете карточки
+    chen_kernels.use_backend(kernels)
+    return DataAsset(name="График зависимости продуктивности",
+                     file_format=".png",
+                     asset_type="graph",
+                     data=productivity_coef_chart(seams, well, aux, prod_coef_tail, flux_grid, flux_tolerance))
+
+
 if __name__ == '__main__':
     handler = GrpCardHandler()
 
@@ -84,7 +123,7 @@ if __name__ == '__main__':
             print("Результаты обработки:")
             print(result.data)  # JSON данные
             print("Графики и файлы:")
-            for asset in result.assets:
+            for asset in result.assets + [producer() for producer in result.asset_producers]:
                 print(f"{asset.asset_type}: {asset.data}")
     except Exception as e:
         print(f"Ошибка при выполнении обработчика: {e}")
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+Циклы по рядам модели Chen: распределение притока и давления вдоль трещины, забойное давление и Кпрод.
+
+Ряды сходятся за разное число членов в каждой точке, поэтому векторизуются плохо. Циклы написаны
+на подмножестве Python, которое компилирует Numba: с бэкендом 'numba' те же функции компилируются
+@njit(cache=True) (машинный код кешируется на диске рядом с модулем или в NUMBA_CACHE_DIR),
+с бэкендом 'python' выполняются интерпретатором. Numba - необязательная зависимость:
+если она не установлена, используется 'python'.
+
+Исключение - flux_series: в адаптивной сетке ее вызывают для массива точек, и для бэкенда 'python'
+есть версия на numpy (flux_series_vectorized), цикл компилируется только Numba.
+"""
+import logging
+from dataclasses import dataclass
+from math import cosh, sinh, tanh, cos, sin, acos, sqrt, floor
+from typing import Callable
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('python', 'numba')
+
+
+def qi_kernel(xf, x, k, mu, p_i, ksi_e, ksi_1, f_e, c, accuracy, e):
+    # Формула (20) из статьи Chen
+    x_start = x
+    size = floor((xf - x_start) / accuracy)
+    qi = np.zeros(size)
+    qi_accum = np.zeros(size)
+    x_axes = np.zeros(size)
+    sum_u_x = 0.0
+    i = 0
+    while x < xf:
+        # Переход от эллиптических координат
+        nu = acos(x / (xf * cosh(ksi_1)))
+        # Определяем сумму ряда.
+        # Вычисляем первый элемент ряд при n = 2
+        n = 2
+        a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+        s_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+        a_for_u_x = s_for_u_x
+        # Продолжаем суммировать до тех пор, пока элемент ряда не достигнет заданной точности, т.е. a станет < e
+        while abs(a_for_u_x) > e:
+            n = n + 1
+            if 2 * n * ksi_e > 700:
+                n = n - 1
+                break
+            else:
+                a_n = (
+                    (c / 4)
+                    * (((-1) ** n) / n)
+                    * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+                )
+                a_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+                s_for_u_x = s_for_u_x + a_for_u_x
+        u_x = (
+            (k / (mu * xf))
+            * (p_i / (sqrt(((sinh(ksi_1)) ** 2) + ((sin(nu)) ** 2))))
+            * ((c / 4) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) + s_for_u_x)
+        )
+        # Перевод м3/с в м3/сут:
+        u_x = u_x * 86400
+        # Суммарный дебит
+        sum_u_x = sum_u_x + u_x
+        # Заносим значения в массивы
+        x_axes[i] = x
+        qi[i] = u_x
+        if i == 0:
+            qi_accum[i] = u_x
+        if i > 0:
+            qi_accum[i] = qi_accum[i - 1] + u_x
+        x = x + accuracy
+        i = i + 1
+        if i > size - 1:
+            break
+    return sum_u_x, qi, qi_accum, x_axes
+
+
+def flux_series(nus, ksi_e, ksi_1, f_e, c, e):
+    # Сумма ряда формулы (20) в точках nu, как в qi_kernel, без множителя перед ней
+    result = np.zeros(len(nus))
+    for i in range(len(nus)):
+        nu = nus[i]
+        n = 2
+        a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+        s_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+        a_for_u_x = s_for_u_x
+        while abs(a_for_u_x) > e:
+            n = n + 1
+            if 2 * n * ksi_e > 700:
+                n = n - 1
+                break
+            else:
+                a_n = (
+                    (c / 4)
+                    * (((-1) ** n) / n)
+                    * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+                )
+                a_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+                s_for_u_x = s_for_u_x + a_for_u_x
+        result[i] = (c / 4) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) + s_for_u_x
+    return result
+
+
+def flux_series_vectorized(nus, ksi_e, ksi_1, f_e, c, e, block=128):
+    # flux_series на numpy для бэкенда 'python': коэффициенты ряда от nu не зависят, члены считаются
+    # блоками по block номеров сразу во всех точках. В точке суммируются те же члены, что в цикле
+    # (до первого по модулю не больше e, включительно), и в том же порядке
+    nus = np.asarray(nus, dtype=float)
+    sums = np.zeros(len(nus))
+    active = np.arange(len(nus))
+    n_last = max(2, floor(700 / (2 * ksi_e)))
+    start = 2
+    while len(active) and start <= n_last:
+        n = np.arange(start, min(start + block, n_last + 1), dtype=float)
+        sign = np.where(n % 2 == 0, 1.0, -1.0)
+        a_n = (c / 4) * (sign / n) * (sinh(2 * ksi_e) / (n * f_e * np.cosh(2 * n * ksi_e) + np.sinh(2 * n * ksi_e)))
+        terms = (2 * n * a_n * np.sinh(2 * n * (ksi_e - ksi_1))) * np.cos(2 * n * nus[active, None])
+        large = np.abs(terms) > e
+        included = np.ones_like(large)
+        included[:, 1:] = np.cumprod(large[:, :-1], axis=1)
+        sums[active] = np.cumsum(np.column_stack([sums[active], terms * included]), axis=1)[:, -1]
+        active = active[included[:, -1] & large[:, -1]]
+        start += block
+    return (c / 4) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) + sums
+
+
+def p_fracture_kernel(xf, x, p_i, ksi_e, ksi_1, f_e, c, c_3, accuracy, e):
+    # Формула (26) из статьи Chen
+    x_start = x
+    size = floor((xf - x_start) / accuracy)
+    p_fi = np.zeros(size)
+    i = 0
+    while x < xf:
+        # Переход от эллиптических координат
+        nu = acos(x / (xf * cosh(ksi_1)))
+        # Определяем сумму ряда.
+        # Вычисляем первый элемент ряд при n = 2
+        n = 2
+        a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+        s_for_p_f = (1 / (2 * n)) * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+        a = s_for_p_f
+        while abs(a) > e:
+            n = n + 1
+            if 2 * n * ksi_e > 710:
+                n = n - 1
+                break
+            else:
+                a_n = (
+                    (c / 4)
+                    * (((-1) ** n) / n)
+                    * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+                )
+                a = (1 / (2 * n)) * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
+                s_for_p_f = s_for_p_f + a
+        p_f = (-2 / f_e) * ((c / 8) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) * (nu**2) - s_for_p_f) + c_3
+        p_f = p_f * p_i / 100000
+        # Заносим значения в массивы
+        p_fi[i] = p_f
+        x = x + accuracy
+        i = i + 1
+        if i > size - 1:
+            break
+    return p_fi
+
+
+def pwf_series(ksi_e, ksi_1, f_e, c, e):
+    # Формула (27) из статьи Chen
+    n = 2
+    a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+    s_for_p_w = ((-1) ** n) * (a_n / (2 * n)) * sinh(2 * n * (ksi_e - ksi_1))
+    a = s_for_p_w
+    while abs(a) > e:
+        n = n + 1
+        if 2 * n * ksi_e > 710:
+            n = n - 1
+            break
+        else:
+            a_n = (
+                (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
+            )
+            a = ((-1) ** n) * (a_n / (2 * n)) * sinh(2 * n * (ksi_e - ksi_1))
+            s_for_p_w = s_for_p_w + a
+    return s_for_p_w
+
+
+def jd_chen_series(ksi_e, f_e, e):
+    # Формулы (41-42) из статьи Chen
+    n = 2
+    s_for_b = (1 / (n**2)) * (1 / (1 + n * f_e * (1 / tanh(2 * n * ksi_e))))
+    a = s_for_b
+    while abs(a) > e:
+        n = n + 1
+        a = (1 / (n**2)) * (1 / (1 + n * f_e * (1 / tanh(2 * n * ksi_e))))
+        s_for_b = s_for_b + a
+    return s_for_b
+
+
+@dataclass(frozen=True)
+class ChenKernels:
+    backend: str
+    qi: Callable
+    flux_series: Callable
+    p_fracture: Callable
+    pwf_series: Callable
+    jd_chen_series: Callable
+
+
+PYTHON_KERNELS = ChenKernels('python', qi_kernel, flux_series_vectorized, p_fracture_kernel, pwf_series,
+                             jd_chen_series)
+
+# текущий бэкенд процесса, задается в GrpCardHandler.setup
+kernels = PYTHON_KERNELS
+
+# Параметры трещины из входного файла ГРП (xf = 50 м, шаг 1 м) для сверки скомпилированных функций с Python
+_REFERENCE = dict(xf=50.0, x=0.0, k=1e-15, mu=0.001, p_i=20200000.0, ksi_e=3.8096618122277075,
+                  ksi_1=6.366197719375609e-05, f_e=12.732395447351628, c=0.0003867574740872585,
+                  c_3=1.0004, accuracy=1.0, e=1e-10)
+
+
+def compile_kernels() -> ChenKernels:
+    jit = numba.njit(cache=True)
+    return ChenKernels('numba',
+                       jit(qi_kernel),
+                       jit(flux_series),
+                       jit(p_fracture_kernel),
+                       jit(pwf_series),
+                       jit(jd_chen_series))
+
+
+def verify(candidate: ChenKernels, rtol: float = 1e-9) -> list[str]:
+    """
+    Сравнивает функции candidate с Python на эталонных параметрах. Первый вызов скомпилированной
+    функции загружает машинный код из кеша или компилирует его. Возвращает список расхождений.
+    """
+    ref = _REFERENCE
+    calls = {
+        'qi': (ref['xf'], ref['x'], ref['k'], ref['mu'], ref['p_i'], ref['ksi_e'], ref['ksi_1'],
+               ref['f_e'], ref['c'], ref['accuracy'], ref['e']),
+        'flux_series': (np.linspace(0.01, 1.57, 50), ref['ksi_e'], ref['ksi_1'], ref['f_e'], ref['c'], ref['e']),
+        'p_fracture': (ref['xf'], ref['x'], ref['p_i'], ref['ksi_e'], ref['ksi_1'], ref['f_e'], ref['c'],
+                       ref['c_3'], ref['accuracy'], ref['e']),
+        'pwf_series': (ref['ksi_e'], ref['ksi_1'], ref['f_e'], ref['c'], ref['e']),
+        'jd_chen_series': (ref['ksi_e'], ref['f_e'], ref['e']),
+    }
+    diffs = []
+    for name, args in calls.items():
+        expected = _flatten(getattr(PYTHON_KERNELS, name)(*args))
+        actual = _flatten(getattr(candidate, name)(*args))
+        if expected.shape != actual.shape or not np.allclose(actual, expected, rtol=rtol, atol=0):
+            diffs.append(name)
+    return diffs
+
+
+def _flatten(value) -> np.ndarray:
+    if isinstance(value, tuple):
+        return np.concatenate([np.ravel(item) for item in value])
+    return np.ravel(value)
+
+
+def use_backend(backend: str) -> ChenKernels:
+    """
+    Переключает функции рядов процесса на backend. Скомпилированные функции используются, только если
+    совпали с Python на эталонных параметрах; иначе и при отсутствии Numba остается 'python'.
+    """
+    global kernels
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown kernels backend {backend!r}, expected one of {BACKENDS}')
+    if backend == 'python':
+        kernels = PYTHON_KERNELS
+    elif kernels.backend != backend:
+        if numba is None:
+            logger.warning('numba is not installed, using python kernels')
+            kernels = PYTHON_KERNELS
+        else:
+            compiled = compile_kernels()
+            diffs = verify(compiled)
+            if diffs:
+                logger.error('numba kernels differ from python: %s, using python kernels', ', '.join(diffs))
+                kernels = PYTHON_KERNELS
+            else:
+                kernels = compiled
+    return kernels
@@ -1,10 +1,13 @@
 import numpy as np
 from scipy.signal import wiener
 from scipy.optimize import minimize_scalar
-from math import cosh, sinh, asinh, tanh, cos, sin, acos, sqrt, floor, pi, log
+from math import cosh, sinh, asinh, tanh, floor, pi, log
 from scipy.interpolate import interp1d
+from numpy.polynomial.chebyshev import chebfit, chebval
 from typing import Tuple
 
+from . import chen_kernels
+
 
 def calc_constants(
     k_f: float, w_f: float, k: float, xf: float, mu: float, q_w: float, h: float, p_i: float, ksi_e: float, ksi_1: float
@@ -93,21 +96,7 @@ def calc_pwf(ksi_e: float, ksi_1: float, p_i: float, f_e: float, c: float, c_3:
     -------
     """
     # Формула (27) из статьи Chen
-    n = 2
-    a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-    s_for_p_w = ((-1) ** n) * (a_n / (2 * n)) * sinh(2 * n * (ksi_e - ksi_1))
-    a = s_for_p_w
-    while abs(a) > e:
-        n = n + 1
-        if 2 * n * ksi_e > 710:
-            n = n - 1
-            break
-        else:
-            a_n = (
-                (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-            )
-            a = ((-1) ** n) * (a_n / (2 * n)) * sinh(2 * n * (ksi_e - ksi_1))
-            s_for_p_w = s_for_p_w + a
+    s_for_p_w = chen_kernels.kernels.pwf_series(ksi_e, ksi_1, f_e, c, e)
     p_w = (-2 / f_e) * (((c * (pi**2)) / 32) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) - s_for_p_w) + c_3
     p_w = p_w * p_i / 100000
     return p_w
@@ -131,13 +120,7 @@ def calc_jd_chen(k, h, mu, ksi_e: float, f_e: float, a_1: float, e: float) -> fl
     -------
     """
     # Формулы (41-42) из статьи Chen
-    n = 2
-    s_for_b = (1 / (n**2)) * (1 / (1 + n * f_e * (1 / tanh(2 * n * ksi_e))))
-    a = s_for_b
-    while abs(a) > e:
-        n = n + 1
-        a = (1 / (n**2)) * (1 / (1 + n * f_e * (1 / tanh(2 * n * ksi_e))))
-        s_for_b = s_for_b + a
+    s_for_b = chen_kernels.kernels.jd_chen_series(ksi_e, f_e, e)
     b_d = (
         ksi_e
         + (1 / sinh(2 * ksi_e))
@@ -222,59 +205,95 @@ def calc_qi(
     k_f = (f_e * k * xf) / 0.005
 
     # Формула (20) из статьи Chen
-    x_start = x
-    qi = np.zeros(floor((xf - x_start) / accuracy))
-    qi_accum = np.zeros(floor((xf - x_start) / accuracy))
-    x_axes = np.zeros(floor((xf - x_start) / accuracy))
-    sum_u_x = 0
-    i = 0
-    while x < xf:
-        # Переход от эллиптических координат
-        nu = acos(x / (xf * cosh(ksi_1)))
-        # Определяем сумму ряда.
-        # Вычисляем первый элемент ряд при n = 2
-        n = 2
-        a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-        s_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
-        a_for_u_x = s_for_u_x
-        # Продолжаем суммировать до тех пор, пока элемент ряда не достигнет заданной точности, т.е. a станет < e
-        while abs(a_for_u_x) > e:
-            n = n + 1
-            if 2 * n * ksi_e > 700:
-                n = n - 1
-                # print('Точность расчета для распределения притока в точке', x, ' принята ', abs(a_for_u_x))
-                break
-            else:
-                a_n = (
-                    (c / 4)
-                    * (((-1) ** n) / n)
-                    * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-                )
-                a_for_u_x = 2 * n * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
-                s_for_u_x = s_for_u_x + a_for_u_x
-        u_x = (
-            (k / (mu * xf))
-            * (p_i / (sqrt(((sinh(ksi_1)) ** 2) + ((sin(nu)) ** 2))))
-            * ((c / 4) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) + s_for_u_x)
-        )
-        # Перевод м3/с в м3/сут:
-        u_x = u_x * 86400
-        # Суммарный дебит
-        sum_u_x = sum_u_x + u_x
-        # Заносим значения в массивы
-        x_axes[i] = x
-        qi[i] = u_x
-        if i == 0:
-            qi_accum[i] = u_x
-        if i > 0:
-            qi_accum[i] = qi_accum[i - 1] + u_x
-        x = x + accuracy
-        i = i + 1
-        if i > floor((xf - x_start) / accuracy) - 1:
-            break
+    sum_u_x, qi, qi_accum, x_axes = chen_kernels.kernels.qi(xf, x, k, mu, p_i, ksi_e, ksi_1, f_e, c, accuracy, e)
     return (sum_u_x * 4 * accuracy * h), qi, qi_accum, x_axes
 
 
+def calc_qi_adaptive(
+    xf: float,
+    x: float,
+    k: float,
+    h: float,
+    mu: float,
+    p_i: float,
+    ksi_e: float,
+    ksi_1: float,
+    f_e: float,
+    c: float,
+    accuracy: float,
+    e: float,
+    tolerance: float = 1e-6,
+    points: int = 100,
+) -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Функция расчета распределения притока вдоль трещины на адаптивной сетке.
+
+    calc_qi считает ряд в каждой точке с шагом accuracy, а smoothing_qi затем оставляет из них points точек.
+    Здесь ряд считается в узлах Чебышёва по эллиптической координате nu: в координате x они сгущаются
+    к концу трещины, где приток растет. Множитель перед рядом, дающий особенность на конце трещины,
+    считается точно. Число узлов удваивается (старые узлы переиспользуются), пока интерполянт на
+    выходной сетке не перестанет меняться больше чем на tolerance; если узлов нужно больше, чем points,
+    ряд считается прямо в точках выходной сетки.
+
+    Выходная сетка совпадает с сеткой smoothing_qi для calc_qi с тем же шагом accuracy: от x до
+    последней точки равномерной сетки.
+
+    Parameters
+    ----------
+    :param xf: полудлина трещины, (м)
+    :param x: начальная координата, (м)
+    :param k: коэффициент проницаемости пласта, (м2)
+    :param h: мощность пласта, (м)
+    :param mu: вязкость жидкости, (Па*с)
+    :param p_i: начальное пластовое давление, (Па)
+    :param ksi_e: эллиптическая координата контура питания скважины, (рад)
+    :param ksi_1: эллиптическая координата трещины, (рад)
+    :param f_e: безразмерная эллиптическая проводимость трещины
+    :param c: константа C
+    :param accuracy: шаг равномерной сетки, задает последнюю точку выходной сетки
+    :param e: точность вычисления
+    :param tolerance: допустимое относительное изменение интерполянта при удвоении числа узлов
+    :param points: количество точек выходной сетки
+
+    :return: рассчитанный дебит скважины, массивы притока, накопленного потока вдоль трещины и координаты
+    -------
+    """
+    x_last = x + (floor((xf - x) / accuracy) - 1) * accuracy
+    x_axes = np.linspace(x, x_last, points)
+    nu_out = np.arccos(x_axes / (xf * cosh(ksi_1)))
+    nu_min, nu_max = nu_out[-1], nu_out[0]
+    t_out = (2 * nu_out - nu_min - nu_max) / (nu_max - nu_min)
+
+    def series(t: np.ndarray) -> np.ndarray:
+        nu = nu_min + (t + 1) * (nu_max - nu_min) / 2
+        return chen_kernels.kernels.flux_series(nu, ksi_e, ksi_1, f_e, c, e)
+
+    # узлы Чебышёва - Лобатто степени m входят в узлы степени 2m
+    degree = 8
+    values = series(np.cos(pi * np.arange(degree + 1) / degree))
+    while True:
+        if 2 * degree + 1 > points:
+            series_out = chen_kernels.kernels.flux_series(nu_out, ksi_e, ksi_1, f_e, c, e)
+            break
+        refined = np.empty(2 * degree + 1)
+        refined[::2] = values
+        refined[1::2] = series(np.cos(pi * np.arange(1, 2 * degree, 2) / (2 * degree)))
+        coarse_out = chebval(t_out, chebfit(np.cos(pi * np.arange(degree + 1) / degree), values, degree))
+        fine_out = chebval(t_out, chebfit(np.cos(pi * np.arange(2 * degree + 1) / (2 * degree)), refined, 2 * degree))
+        degree, values = 2 * degree, refined
+        if np.abs(fine_out - coarse_out).max() <= tolerance * np.abs(fine_out).max():
+            series_out = fine_out
+            break
+
+    qi = (k / (mu * xf)) * (p_i / np.sqrt(sinh(ksi_1) ** 2 + np.sin(nu_out) ** 2)) * series_out
+    # Перевод м3/с в м3/сут:
+    qi = qi * 86400
+    # дебит - интеграл притока до последней точки сетки; в переменной nu (dx = xf * ch(ksi_1) * sin(nu) dnu)
+    # подынтегральная функция не имеет особенности на конце трещины
+    sum_qi = np.trapezoid(qi * xf * cosh(ksi_1) * np.sin(nu_out), -nu_out)
+    return 4 * h * sum_qi, qi, np.cumsum(qi), x_axes
+
+
 def calc_p_fracture(
     xf: float,
     x: float,
@@ -307,43 +326,7 @@ def calc_p_fracture(
     -------
     """
     # Формула (26) из статьи Chen
-    x_start = x
-    p_fi = np.zeros(floor((xf - x_start) / accuracy))
-    x_axes = np.zeros(floor((xf - x_start) / accuracy))
-    i = 0
-    while x < xf:
-        # Переход от эллиптических координат
-        nu = acos(x / (xf * cosh(ksi_1)))
-        # Определяем сумму ряда.
-        # Вычисляем первый элемент ряд при n = 2
-        n = 2
-        a_n = (c / 4) * (((-1) ** n) / n) * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-        s_for_p_f = (1 / (2 * n)) * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
-        a = s_for_p_f
-        while abs(a) > e:
-            n = n + 1
-            if 2 * n * ksi_e > 710:
-                n = n - 1
-                # print('Точность расчета для распределения давления принята ', abs(a))
-                break
-            else:
-                a_n = (
-                    (c / 4)
-                    * (((-1) ** n) / n)
-                    * (sinh(2 * ksi_e) / (n * f_e * cosh(2 * n * ksi_e) + sinh(2 * n * ksi_e)))
-                )
-                a = (1 / (2 * n)) * a_n * sinh(2 * n * (ksi_e - ksi_1)) * cos(2 * n * nu)
-                s_for_p_f = s_for_p_f + a
-        p_f = (-2 / f_e) * ((c / 8) * (sinh(2 * ksi_e) - sinh(2 * ksi_1)) * (nu**2) - s_for_p_f) + c_3
-        p_f = p_f * p_i / 100000
-        # Заносим значения в массивы
-        x_axes[i] = x
-        p_fi[i] = p_f
-        x = x + accuracy
-        i = i + 1
-        if i > floor((xf - x_start) / accuracy) - 1:
-            break
-    return p_fi
+    return chen_kernels.kernels.p_fracture(xf, x, p_i, ksi_e, ksi_1, f_e, c, c_3, accuracy, e)
 
 
 def smoothing_qi(qi: np.ndarray, x_axes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -65,7 +65,8 @@ def load_excel_data(file_content: pd.ExcelFile):
             get_value('C21'),  # Шаг вычисления притока
             get_value('C22'),  # Проницаемость загрязненной зоны
             get_value('C23'),  # Точка начала загрязненной зоны
-            np.flip(ws.iloc[1:21, col_map['E']].values).tolist()  # Длина загрязненной зоны
+            # Длины загрязненной зоны, сколько заполнено; текст и примечания в столбце E пропускаются
+            np.flip(pd.to_numeric(ws.iloc[1:, col_map['E']], errors='coerce').dropna().values).tolist()
         )
 
         return seams, well, aux
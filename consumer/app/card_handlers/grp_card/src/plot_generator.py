@@ -1,72 +1,68 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import copy
-from io import BytesIO
+from app.card_handlers.base.plotting import ChartSpec, Line
 from .productivity_coefficient import ProductivityCoefficient
 
-# добавил этот модуль для преобразования графиков в байты
+# Графики не рендерятся при расчете: сохраняется только описание, картинка строится при первом запросе файла
 
 
-def generate_flow_distribution_graph(prod_coef) -> dict:
+def flow_distribution_chart(prod_coef) -> ChartSpec:
     """
-    Генерация графика распределения потока.
+    Описание графика распределения потока.
     """
-    plt.figure(figsize=(10, 5))
-    plt.plot(prod_coef.aux_props.array_x_axes_smooth, prod_coef.well_props.array_accumulated_flow_in_fracture,
-             color='r', label='Накопленный поток в трещине', linestyle='dashed')
-    plt.plot(prod_coef.aux_props.array_x_axes_smooth, prod_coef.well_props.array_flow_along_fracture,
-             label='Адаптация параметра alpha')
-    plt.xlabel('x, м')
-    plt.ylabel('Q, м3/сут')
-    plt.title('Распределение притока в трещине')
-    plt.legend()
-    plt.grid()
+    return ChartSpec(
+        kind='grp_flow_distribution',
+        title='Распределение притока в трещине',
+        xlabel='x, м',
+        ylabel='Q, м3/сут',
+        lines=[
+            Line(x=prod_coef.aux_props.array_x_axes_smooth,
+                 y=prod_coef.well_props.array_accumulated_flow_in_fracture,
+                 color='r', label='Накопленный поток в трещине', linestyle='dashed'),
+            Line(x=prod_coef.aux_props.array_x_axes_smooth,
+                 y=prod_coef.well_props.array_flow_along_fracture,
+                 label='Адаптация параметра alpha'),
+        ],
+    )
 
-    return _save_plot_to_bytes("flow_distribution_graph.png")
 
-
-def generate_productivity_coef_graph(seams, well, aux) -> dict:
+def productivity_coef_chart(seams, well, aux, prod_coef_tail=None,
+                            flux_grid: str = 'uniform', flux_tolerance: float = 1e-6) -> ChartSpec:
     """
-    Генерация графика зависимости продуктивности от загрязненности.
+    Описание графика зависимости продуктивности от загрязненности.
+
+    :param prod_coef_tail: Уже рассчитанный Кпрод для aux.k_f_tail, чтобы не пересчитывать его повторно.
+    :param flux_grid: Сетка распределения притока для пересчетов, та же, что в основном расчете.
+    :param flux_tolerance: Точность адаптивной сетки.
     """
     k_f_tail_values = [7E-11, 3E-11, 9E-12, aux.k_f_tail]
-    plt.figure(figsize=(10, 5))
     aux_copy = copy.deepcopy(aux)
+    well_copy = copy.deepcopy(well)
 
+    lines = []
     for k_f_tail in k_f_tail_values:
-        aux_copy.k_f_tail = k_f_tail
-        prod_coef = ProductivityCoefficient(seam_props=seams, well_props=well, aux_props=aux_copy)
-        prod_coef.calc_prod_coef()
-        plt.plot(
-            np.flip(prod_coef.aux_props.array_lenght_dirt),
-            prod_coef.well_props.array_prod_coef_tail,
-            label=f'k_f_tail = {k_f_tail:.2e}'
+        if k_f_tail == aux.k_f_tail and prod_coef_tail is not None:
+            array_prod_coef_tail = prod_coef_tail
+        else:
+            aux_copy.k_f_tail = k_f_tail
+            prod_coef = ProductivityCoefficient(seam_props=seams,
+                                                well_props=well_copy,
+                                                aux_props=aux_copy,
+                                                flux_grid=flux_grid,
+                                                flux_tolerance=flux_tolerance)
+            prod_coef.calc_prod_coef()
+            array_prod_coef_tail = prod_coef.well_props.array_prod_coef_tail
+        lines.append(
+            Line(x=np.flip(aux.array_lenght_dirt),
+                 y=array_prod_coef_tail,
+                 label=f'k_f_tail = {k_f_tail:.2e}')
         )
 
-    plt.xlabel('Длина загрязнения, м')
-    plt.ylabel('Безразмерный коэффициент продуктивности')
-    plt.title('Зависимость продуктивности трещины от её загрязненности')
-    plt.grid()
-    plt.legend()
-
-    return _save_plot_to_bytes("productivity_coef_graph.png")
-
-
-def _save_plot_to_bytes(filename: str) -> dict:
-    """
-    Сохраняет текущий график в байтовый формат и возвращает его данные.
-
-    :param filename: Имя файла.
-    :return: Словарь с данными графика.
-    """
-    img_bytes = BytesIO()
-    plt.savefig(img_bytes, format="png", dpi=200)
-    plt.close()
-    img_bytes.seek(0)
+    return ChartSpec(
+        kind='grp_productivity_coef',
+        title='Зависимость продуктивности трещины от её загрязненности',
+        xlabel='Длина загрязнения, м',
+        ylabel='Безразмерный коэффициент продуктивности',
+        lines=lines,
+    )
 
-    return {
-        "filename": filename,
-        "bytes": img_bytes.getvalue(),
-        "mime_type": "image/png",
-        "extension": "png",
-    }
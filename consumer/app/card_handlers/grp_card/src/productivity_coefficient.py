@@ -2,16 +2,32 @@ from .data import SeamProperty, WellProperty, AuxiliaryProperty
 from .elliptical_fracture_chen_utils import *
 from .tail_in_utils import *
 
+FLUX_GRIDS = ('uniform', 'adaptive')
+
 
 class ProductivityCoefficient:
     seam_props: SeamProperty
     well_props: WellProperty
     aux_props: AuxiliaryProperty
 
-    def __init__(self, seam_props: SeamProperty, well_props: WellProperty, aux_props: AuxiliaryProperty):
+    def __init__(self,
+                 seam_props: SeamProperty,
+                 well_props: WellProperty,
+                 aux_props: AuxiliaryProperty,
+                 flux_grid: str = 'uniform',
+                 flux_tolerance: float = 1e-6):
+        """
+        :param flux_grid: Сетка для распределения притока: uniform - с шагом aux_props.accuracy (calc_qi),
+            adaptive - узлы Чебышёва с контролем точности (calc_qi_adaptive).
+        :param flux_tolerance: Допустимое относительное изменение притока при уточнении адаптивной сетки.
+        """
+        if flux_grid not in FLUX_GRIDS:
+            raise ValueError(f'Unknown flux grid {flux_grid!r}, expected one of {FLUX_GRIDS}')
         self.seam_props = seam_props
         self.well_props = well_props
         self.aux_props = aux_props
+        self.flux_grid = flux_grid
+        self.flux_tolerance = flux_tolerance
 
     def calc_prod_coef(self):
         """
@@ -69,7 +85,7 @@ class ProductivityCoefficient:
         # print('JD dimensionless', j_d_dimensionless)
 
         # Распределение притока вдоль трещины
-        sum_qi, qi, qi_accum, x_axes = calc_qi(
+        flux_args = (
             self.well_props.xf,
             self.aux_props.x_coordinate,
             self.seam_props.permeability,
@@ -83,6 +99,10 @@ class ProductivityCoefficient:
             self.aux_props.accuracy,
             self.aux_props.epsilon,
         )
+        if self.flux_grid == 'adaptive':
+            sum_qi, qi, qi_accum, x_axes = calc_qi_adaptive(*flux_args, tolerance=self.flux_tolerance)
+        else:
+            sum_qi, qi, qi_accum, x_axes = calc_qi(*flux_args)
         # print('Суммарный дебит скважины: ' + str(sum_qi))
 
         # Распределение давления вдоль трещины
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from math import sqrt, pi, exp, log
 from scipy.interpolate import interp1d
 import numpy as np
@@ -118,6 +119,28 @@ def calc_sigma_from_x(x: float, rw: float, sigma_w: float, xf: float) -> float:
         return sigma_w + (1 - sigma_w) * (x - rw) / (xf - rw)
 
 
+# График Meyer fig.D3: б/р радиус от коэффициента проникновения трещины при lambd = 1, 2, 4, 6, 8, 10
+MEYER_LAMBDA = np.array([1, 2, 4, 6, 8, 10], dtype=float)
+MEYER_IX = np.array([0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1])
+MEYER_DIM_R = np.array([
+    [2, 2.01, 2.025, 2.06, 2.125, 2.2, 2.316, 2.46, 2.65, 2.825, 3.125],
+    [2, 2, 2, 2.016, 2.05, 2.1, 2.183, 2.3125, 2.475, 2.666, 2.866],
+    [2, 1.95, 1.8166, 1.675, 1.55, 1.475, 1.45, 1.466, 1.533, 1.65, 1.766],
+    [2, 1.85, 1.5, 1.216, 1, 0.875, 0.8, 0.766, 0.783, 0.825, 0.883],
+    [2, 1.716, 1.216, 0.833, 0.616, 0.475, 0.4, 0.366, 0.366, 0.375, 0.4],
+    [2, 1.566, 0.933, 0.55, 0.35, 0.233, 0.183, 0.166, 0.15, 0.151, 0.175],
+])
+
+
+@lru_cache(maxsize=None)
+def meyer_radius_curves() -> tuple:
+    """
+    Функции, описывающие зависимость б/р радиуса от коэффициента проникновения при различных lambd.
+    Строятся один раз на процесс.
+    """
+    return tuple(interp1d(MEYER_IX, dim_r, kind='cubic', fill_value="extrapolate") for dim_r in MEYER_DIM_R)
+
+
 def calc_sigma_inf(ix: float, lambd: float) -> float:
     """
     Функция расчёта обратного безразмерного радиуса скважины от коэффициента проникновения трещины ix и
@@ -133,127 +156,10 @@ def calc_sigma_inf(ix: float, lambd: float) -> float:
 
     График считан по точкам из статьи Meyer fig.D3
     """
-    # Создаем массивы для ix, lambd, r
-    i_x = np.zeros(11)
-
-    dim_r_l1 = np.zeros(11)
-    dim_r_l2 = np.zeros(11)
-    dim_r_l4 = np.zeros(11)
-    dim_r_l6 = np.zeros(11)
-    dim_r_l8 = np.zeros(11)
-    dim_r_l10 = np.zeros(11)
-
-    lambd_x = np.zeros(6)
-    r_lambd_y = np.zeros(6)
-
-    lambd_x[0] = 1
-    lambd_x[1] = 2
-    lambd_x[2] = 4
-    lambd_x[3] = 6
-    lambd_x[4] = 8
-    lambd_x[5] = 10
-
-    i_x[0] = 0
-    i_x[1] = 0.1
-    i_x[2] = 0.2
-    i_x[3] = 0.3
-    i_x[4] = 0.4
-    i_x[5] = 0.5
-    i_x[6] = 0.6
-    i_x[7] = 0.7
-    i_x[8] = 0.8
-    i_x[9] = 0.9
-    i_x[10] = 1
-
-    dim_r_l1[0] = 2
-    dim_r_l1[1] = 2.01
-    dim_r_l1[2] = 2.025
-    dim_r_l1[3] = 2.06
-    dim_r_l1[4] = 2.125
-    dim_r_l1[5] = 2.2
-    dim_r_l1[6] = 2.316
-    dim_r_l1[7] = 2.46
-    dim_r_l1[8] = 2.65
-    dim_r_l1[9] = 2.825
-    dim_r_l1[10] = 3.125
-
-    dim_r_l2[0] = 2
-    dim_r_l2[1] = 2
-    dim_r_l2[2] = 2
-    dim_r_l2[3] = 2.016
-    dim_r_l2[4] = 2.05
-    dim_r_l2[5] = 2.1
-    dim_r_l2[6] = 2.183
-    dim_r_l2[7] = 2.3125
-    dim_r_l2[8] = 2.475
-    dim_r_l2[9] = 2.666
-    dim_r_l2[10] = 2.866
-
-    dim_r_l4[0] = 2
-    dim_r_l4[1] = 1.95
-    dim_r_l4[2] = 1.8166
-    dim_r_l4[3] = 1.675
-    dim_r_l4[4] = 1.55
-    dim_r_l4[5] = 1.475
-    dim_r_l4[6] = 1.45
-    dim_r_l4[7] = 1.466
-    dim_r_l4[8] = 1.533
-    dim_r_l4[9] = 1.65
-    dim_r_l4[10] = 1.766
-
-    dim_r_l6[0] = 2
-    dim_r_l6[1] = 1.85
-    dim_r_l6[2] = 1.5
-    dim_r_l6[3] = 1.216
-    dim_r_l6[4] = 1
-    dim_r_l6[5] = 0.875
-    dim_r_l6[6] = 0.8
-    dim_r_l6[7] = 0.766
-    dim_r_l6[8] = 0.783
-    dim_r_l6[9] = 0.825
-    dim_r_l6[10] = 0.883
-
-    dim_r_l8[0] = 2
-    dim_r_l8[1] = 1.716
-    dim_r_l8[2] = 1.216
-    dim_r_l8[3] = 0.833
-    dim_r_l8[4] = 0.616
-    dim_r_l8[5] = 0.475
-    dim_r_l8[6] = 0.4
-    dim_r_l8[7] = 0.366
-    dim_r_l8[8] = 0.366
-    dim_r_l8[9] = 0.375
-    dim_r_l8[10] = 0.4
-
-    dim_r_l10[0] = 2
-    dim_r_l10[1] = 1.566
-    dim_r_l10[2] = 0.933
-    dim_r_l10[3] = 0.55
-    dim_r_l10[4] = 0.35
-    dim_r_l10[5] = 0.233
-    dim_r_l10[6] = 0.183
-    dim_r_l10[7] = 0.166
-    dim_r_l10[8] = 0.15
-    dim_r_l10[9] = 0.151
-    dim_r_l10[10] = 0.175
-
-    # Определяем функции, описывающие зависимость б/р радиуса от коэффициента проникновения при различных lambd
-    f_r_target_l1 = interp1d(i_x, dim_r_l1, kind='cubic', fill_value="extrapolate")
-    f_r_target_l2 = interp1d(i_x, dim_r_l2, kind='cubic', fill_value="extrapolate")
-    f_r_target_l4 = interp1d(i_x, dim_r_l4, kind='cubic', fill_value="extrapolate")
-    f_r_target_l6 = interp1d(i_x, dim_r_l6, kind='cubic', fill_value="extrapolate")
-    f_r_target_l8 = interp1d(i_x, dim_r_l8, kind='cubic', fill_value="extrapolate")
-    f_r_target_l10 = interp1d(i_x, dim_r_l10, kind='cubic', fill_value="extrapolate")
-
     # Рассчитываем б/р радиус при заданном значении ix
-    r_lambd_y[0] = f_r_target_l1(ix)
-    r_lambd_y[1] = f_r_target_l2(ix)
-    r_lambd_y[2] = f_r_target_l4(ix)
-    r_lambd_y[3] = f_r_target_l6(ix)
-    r_lambd_y[4] = f_r_target_l8(ix)
-    r_lambd_y[5] = f_r_target_l10(ix)
+    r_lambd_y = np.array([f_r_target(ix) for f_r_target in meyer_radius_curves()])
 
     # Определяем функцию, описывающую зависимость б/р радиуса от lambd
-    f_r_lambd = interp1d(lambd_x, r_lambd_y, kind='cubic', fill_value="extrapolate")
+    f_r_lambd = interp1d(MEYER_LAMBDA, r_lambd_y, kind='cubic', fill_value="extrapolate")
 
     return f_r_lambd(lambd)
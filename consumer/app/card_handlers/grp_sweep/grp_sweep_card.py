@@ -0,0 +1,131 @@
+from functools import partial
+
+import pandas as pd
+
+from app.card_handlers.grp_card.src.excel_reader import load_excel_data
+from app.card_handlers.grp_card.src import chen_kernels
+from app.card_handlers.grp_card.src.tail_in_utils import meyer_radius_curves
+from app.card_handlers.grp_sweep.src.excel_reader import load_sweep_plan
+from app.card_handlers.grp_sweep.src.sweep import run_sweep
+from app.card_handlers.grp_sweep.src.plot_generator import tornado_chart
+
+from app.card_handlers.base.exceptions import CardHandlerException
+from app.card_handlers.base.card_handler import (
+    CardHandler,
+    HandlerResult,
+    DataAsset,
+    ResultParameter,
+)
+from app.core.config import settings
+from app.entities.card import CardType
+
+
+class GrpSweepHandler(CardHandler):
+    """
+    Анализ чувствительности коэффициента продуктивности ГРП: исходные данные карточки ГРП
+    и лист "Диапазоны" с диапазонами параметров трещины. Все варианты считаются в одной карточке.
+    """
+    CARD_TYPE = CardType.GRP_SWEEP
+
+    def __init__(self, flux_tolerance: float = None, max_points: int = None):
+        self.flux_tolerance = flux_tolerance or settings.GRP_FLUX_TOLERANCE
+        self.max_points = max_points or settings.GRP_SWEEP_MAX_POINTS
+
+    def setup(self):
+        meyer_radius_curves()
+        chen_kernels.use_backend(settings.GRP_KERNELS)
+
+    def process(self, data) -> HandlerResult:
+        """
+        Основной метод обработки данных.
+        """
+        try:
+            if not data.name.endswith('.xlsx'):
+                raise CardHandlerException("Ожидается файл с расширением .xlsx")
+
+            with self.stage('parse'):
+                file_content = pd.ExcelFile(data)
+                seams, well, aux = load_excel_data(file_content)
+                if seams is None or well is None or aux is None:
+                    raise ValueError("Ошибка: данные не загружены, расчет не выполнен.")
+                plan = load_sweep_plan(file_content)
+            if plan.size > self.max_points:
+                raise ValueError(f"Вариантов перебора {plan.size}, допускается не больше {self.max_points}.")
+
+            with self.stage('compute'):
+                sweep = run_sweep(seams, well, aux, plan, flux_tolerance=self.flux_tolerance)
+
+            best = sweep.best
+            result_data = [
+                ResultParameter(name="sweep_parameters",
+                                translation="Перебираемые параметры",
+                                value=sweep.names),
+                ResultParameter(name="sweep_points",
+                                translation="Варианты",
+                                value=sweep.points.tolist()),
+                ResultParameter(name="productivity_coef",
+                                translation="Коэффициент продуктивности",
+                                value=sweep.productivity.tolist()),
+                ResultParameter(name="base_productivity_coef",
+                                translation="Коэффициент продуктивности для исходных данных",
+                                value=sweep.base_productivity),
+                ResultParameter(name="best_design",
+                                translation="Лучший вариант",
+                                value=[{'parameter': name, 'value': float(value)}
+                                       for name, value in zip(sweep.names, sweep.points[best])]),
+                ResultParameter(name="best_productivity_coef",
+                                translation="Коэффициент продуктивности лучшего варианта",
+                                value=float(sweep.productivity[best])),
+                ResultParameter(name="tornado",
+                                translation="Торнадо-диаграмма",
+                                value=sweep.tornado),
+                ResultParameter(name="response_surface",
+                                translation="Поверхность отклика",
+                                value=[{'term': term, 'coefficient': float(coefficient)}
+                                       for term, coefficient in zip(sweep.surface_terms, sweep.surface_coefficients)]),
+                ResultParameter(name="response_surface_r2",
+                                translation="Коэффициент детерминации поверхности отклика",
+                                value=sweep.surface_r2),
+            ]
+
+            return HandlerResult(
+                data=result_data,
+                assets=[],
+                asset_producers=[partial(tornado_asset, sweep.tornado, sweep.base_productivity)],
+            )
+        except CardHandlerException:
+            raise
+        except Exception as e:
+            raise CardHandlerException(f"Ошибка при обработке данных: {e}")
+
+    def validate(self, data):
+        """
+        Метод проверки входных данных.
+        """
+        required_keys = ["input_file"]
+        for key in required_keys:
+            if key not in data:
+                raise ValueError(f"Отсутствует обязательный параметр: {key}")
+
+
+def tornado_asset(tornado: list[dict], base_productivity: float) -> DataAsset:
+    return DataAsset(name="Торнадо-диаграмма",
+                     file_format=".png",
+                     asset_type="graph",
+                     data=tornado_chart(tornado, base_productivity))
+
+
+if __name__ == '__main__':
+    handler = GrpSweepHandler()
+
+    try:
+        filename = 'Входной файл.xlsx'
+        with open(filename, 'rb') as file:
+            result = handler.process(file)
+            print("Результаты обработки:")
+            print(result.data)
+            print("Графики и файлы:")
+            for asset in result.assets + [producer() for producer in result.asset_producers]:
+                print(f"{asset.asset_type}: {asset.data}")
+    except Exception as e:
+        print(f"Ошибка при выполнении обработчика: {e}")
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from .sweep import SWEEP_PARAMETERS, METHODS, ParameterRange, SweepPlan
+
+SHEET_NAME = 'Диапазоны'
+# подпись в столбце A -> поле SweepPlan
+PLAN_FIELDS = {
+    'Метод': 'method',
+    'Точек LHS': 'samples',
+    'Длина загрязнения, м': 'dirt_length',
+    'Seed': 'seed',
+}
+
+
+def load_sweep_plan(file_content: pd.ExcelFile) -> SweepPlan:
+    """
+    Загружает план перебора с листа "Диапазоны".
+
+    Строки параметров: название, обозначение из SWEEP_PARAMETERS (столбец B), минимум, максимум и
+    количество точек сетки. Параметр без минимума и максимума не перебирается. Ниже - настройки
+    перебора: подпись в столбце A, значение в столбце B.
+    """
+    if SHEET_NAME not in file_content.sheet_names:
+        raise ValueError(f"Лист '{SHEET_NAME}' не найден в файле.")
+    ws = file_content.parse(SHEET_NAME, header=None)
+    if ws.empty:
+        raise ValueError(f"Лист '{SHEET_NAME}' пуст.")
+
+    ranges = []
+    options = {}
+    for row in ws.itertuples(index=False):
+        label = row[0]
+        key = row[1] if len(row) > 1 else None
+        if key in SWEEP_PARAMETERS:
+            if pd.isna(row[2]) and pd.isna(row[3]):
+                continue
+            # столбец E с количеством точек необязателен, без него в листе может быть всего четыре столбца
+            points = int(row[4]) if len(row) > 4 and not pd.isna(row[4]) else 10
+            r = ParameterRange(key, float(row[2]), float(row[3]), points)
+            if not r.low < r.high:
+                raise ValueError(f"Минимум параметра {key} должен быть меньше максимума.")
+            if r.points < 2:
+                raise ValueError(f"Для параметра {key} нужно не меньше двух точек.")
+            ranges.append(r)
+        elif label in PLAN_FIELDS and not pd.isna(key):
+            options[PLAN_FIELDS[label]] = key
+
+    if not ranges:
+        raise ValueError("Не задан диапазон ни одного параметра.")
+    plan = SweepPlan(ranges=ranges,
+                     method=str(options.get('method', 'grid')).strip().lower(),
+                     samples=int(options.get('samples', 1000)),
+                     dirt_length=float(options['dirt_length']) if 'dirt_length' in options else None,
+                     seed=int(options.get('seed', 0)))
+    if plan.method not in METHODS:
+        raise ValueError(f"Метод перебора должен быть одним из {', '.join(METHODS)}.")
+    if plan.method == 'lhs' and plan.samples < 2:
+        raise ValueError("Для латинского гиперкуба нужно не меньше двух точек.")
+    return plan
@@ -0,0 +1,30 @@
+from app.card_handlers.base.plotting import ChartSpec, Line
+
+
+def tornado_chart(tornado: list[dict], base_productivity: float) -> ChartSpec:
+    """
+    Описание торнадо-диаграммы: отрезок на параметр от Кпрод при его минимуме до Кпрод при максимуме,
+    параметры сверху вниз по убыванию влияния, название параметра - подпись деления оси Y.
+    """
+    count = len(tornado)
+    lines = [
+        Line(x=[row['productivity_low'], row['productivity_high']],
+             y=[count - i, count - i],
+             marker='o')
+        for i, row in enumerate(tornado)
+    ]
+    lines.append(Line(x=[base_productivity, base_productivity],
+                      y=[0.5, count + 0.5],
+                      color='k',
+                      linestyle='dashed',
+                      label='Исходные данные'))
+    return ChartSpec(
+        kind='grp_sweep_tornado',
+        title='Чувствительность продуктивности к параметрам трещины',
+        xlabel='Безразмерный коэффициент продуктивности',
+        ylabel='Параметр',
+        lines=lines,
+        figsize=(10, 1.5 + count),
+        yticks=[count - i for i in range(count)],
+        yticklabels=[row['translation'] for row in tornado],
+    )
@@ -0,0 +1,222 @@
+"""
+Перебор параметров трещины ГРП: полная сетка или латинский гиперкуб по диапазонам xf, ширины
+и проницаемости трещины. Каждый вариант считается ProductivityCoefficient на адаптивной сетке
+распределения притока, все варианты и точки торнадо-диаграммы - одним пакетом в одном расчете карточки.
+"""
+from dataclasses import dataclass, replace
+from itertools import combinations
+from typing import Optional
+
+import numpy as np
+
+from app.card_handlers.grp_card.src.data import SeamProperty, WellProperty, AuxiliaryProperty
+from app.card_handlers.grp_card.src.productivity_coefficient import ProductivityCoefficient
+
+# параметры трещины (поля WellProperty), которые можно перебирать
+SWEEP_PARAMETERS = {
+    'xf': 'Полудлина трещины, м',
+    'width_fracture': 'Ширина трещины, м',
+    'permeability_fracture': 'Проницаемость трещины, м^2',
+}
+METHODS = ('grid', 'lhs')
+
+
+@dataclass
+class ParameterRange:
+    """
+    Диапазон перебора одного параметра трещины.
+
+    :param name: Поле WellProperty из SWEEP_PARAMETERS.
+    :param low: Минимальное значение.
+    :param high: Максимальное значение.
+    :param points: Количество значений на полной сетке.
+    """
+    name: str
+    low: float
+    high: float
+    points: int
+
+
+@dataclass
+class SweepPlan:
+    """
+    План перебора.
+
+    :param ranges: Диапазоны перебираемых параметров, остальные берутся из исходных данных.
+    :param method: grid - полная сетка, lhs - латинский гиперкуб.
+    :param samples: Количество точек латинского гиперкуба.
+    :param dirt_length: Длина загрязнения, м, для которой сравниваются варианты.
+    :param seed: Начальное значение генератора случайных чисел для латинского гиперкуба.
+    """
+    ranges: list[ParameterRange]
+    method: str = 'grid'
+    samples: int = 1000
+    dirt_length: Optional[float] = None
+    seed: int = 0
+
+    @property
+    def names(self) -> list[str]:
+        return [r.name for r in self.ranges]
+
+    @property
+    def size(self) -> int:
+        if self.method == 'lhs':
+            return self.samples
+        return int(np.prod([r.points for r in self.ranges]))
+
+
+@dataclass
+class SweepResult:
+    """
+    Результат перебора.
+
+    :param names: Перебираемые параметры.
+    :param points: Значения параметров, строка на вариант.
+    :param productivity: Безразмерный коэффициент продуктивности вариантов.
+    :param base_productivity: Коэффициент продуктивности для исходных данных.
+    :param tornado: Торнадо-диаграмма: изменение Кпрод при смене одного параметра с минимума на максимум.
+    :param surface_terms: Члены квадратичной поверхности отклика по нормированным на [-1, 1] параметрам.
+    :param surface_coefficients: Коэффициенты поверхности отклика.
+    :param surface_r2: Коэффициент детерминации поверхности отклика.
+    """
+    names: list[str]
+    points: np.ndarray
+    productivity: np.ndarray
+    base_productivity: float
+    tornado: list[dict]
+    surface_terms: list[str]
+    surface_coefficients: np.ndarray
+    surface_r2: float
+
+    @property
+    def best(self) -> int:
+        return int(np.argmax(self.productivity))
+
+
+def grid_points(ranges: list[ParameterRange]) -> np.ndarray:
+    axes = [np.linspace(r.low, r.high, r.points) for r in ranges]
+    return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(ranges))
+
+
+def lhs_points(ranges: list[ParameterRange], samples: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # по каждому параметру в каждом из samples равных интервалов ровно одна точка
+    strata = np.column_stack([rng.permutation(samples) for _ in ranges])
+    unit = (strata + rng.random((samples, len(ranges)))) / samples
+    low = np.array([r.low for r in ranges])
+    high = np.array([r.high for r in ranges])
+    return low + unit * (high - low)
+
+
+def sample_points(plan: SweepPlan) -> np.ndarray:
+    if plan.method not in METHODS:
+        raise ValueError(f'Unknown sweep method {plan.method!r}, expected one of {METHODS}')
+    if plan.method == 'lhs':
+        return lhs_points(plan.ranges, plan.samples, plan.seed)
+    return grid_points(plan.ranges)
+
+
+def evaluate(seams: SeamProperty,
+             well: WellProperty,
+             aux: AuxiliaryProperty,
+             names: list[str],
+             points: np.ndarray,
+             dirt_length: float,
+             flux_tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Безразмерный коэффициент продуктивности модели Tail-in для каждой строки points.
+    """
+    productivity = np.empty(len(points))
+    for i, row in enumerate(points):
+        design = replace(well, **dict(zip(names, row.tolist())))
+        # длина загрязнения не больше длины трещины варианта
+        design_aux = replace(aux, array_lenght_dirt=[min(dirt_length, 2 * design.xf)])
+        prod_coef = ProductivityCoefficient(seam_props=seams,
+                                            well_props=design,
+                                            aux_props=design_aux,
+                                            flux_grid='adaptive',
+                                            flux_tolerance=flux_tolerance)
+        prod_coef.calc_prod_coef()
+        if prod_coef.well_props.array_prod_coef_tail is None:
+            raise ValueError('Не заданы проницаемость и точка начала загрязнения (C22, C23)')
+        productivity[i] = prod_coef.well_props.array_prod_coef_tail[0]
+    return productivity
+
+
+def tornado_points(plan: SweepPlan, well: WellProperty) -> np.ndarray:
+    """
+    Исходный вариант и по два варианта на параметр: минимум и максимум при остальных исходных.
+    """
+    base = np.array([getattr(well, name) for name in plan.names], dtype=float)
+    points = [base]
+    for i, r in enumerate(plan.ranges):
+        for value in (r.low, r.high):
+            point = base.copy()
+            point[i] = value
+            points.append(point)
+    return np.array(points)
+
+
+def tornado_data(plan: SweepPlan, points: np.ndarray, productivity: np.ndarray) -> list[dict]:
+    rows = []
+    for i, r in enumerate(plan.ranges):
+        low, high = productivity[1 + 2 * i], productivity[2 + 2 * i]
+        rows.append({
+            'parameter': r.name,
+            'translation': SWEEP_PARAMETERS[r.name],
+            'base': float(points[0, i]),
+            'low': r.low,
+            'high': r.high,
+            'productivity_low': float(low),
+            'productivity_high': float(high),
+            'swing': float(abs(high - low)),
+        })
+    return sorted(rows, key=lambda row: row['swing'], reverse=True)
+
+
+def response_surface(plan: SweepPlan, points: np.ndarray,
+                     productivity: np.ndarray) -> tuple[list[str], np.ndarray, float]:
+    """
+    Квадратичная поверхность отклика методом наименьших квадратов. Параметры нормируются на [-1, 1]
+    по своим диапазонам, поэтому коэффициенты разных параметров сравнимы между собой.
+    """
+    low = np.array([r.low for r in plan.ranges])
+    high = np.array([r.high for r in plan.ranges])
+    u = 2 * (points - low) / (high - low) - 1
+    terms, columns = ['1'], [np.ones(len(points))]
+    for i, name in enumerate(plan.names):
+        terms.append(name)
+        columns.append(u[:, i])
+    for i, j in combinations(range(len(plan.names)), 2):
+        terms.append(f'{plan.names[i]}*{plan.names[j]}')
+        columns.append(u[:, i] * u[:, j])
+    for i, name in enumerate(plan.names):
+        terms.append(f'{name}^2')
+        columns.append(u[:, i] ** 2)
+    matrix = np.column_stack(columns)
+    coefficients = np.linalg.lstsq(matrix, productivity, rcond=None)[0]
+    residual = ((matrix @ coefficients - productivity) ** 2).sum()
+    total = ((productivity - productivity.mean()) ** 2).sum()
+    r2 = 1 - residual / total if total > 0 else 1.0
+    return terms, coefficients, float(r2)
+
+
+def run_sweep(seams: SeamProperty,
+              well: WellProperty,
+              aux: AuxiliaryProperty,
+              plan: SweepPlan,
+              flux_tolerance: float = 1e-6) -> SweepResult:
+    points = sample_points(plan)
+    extra = tornado_points(plan, well)
+    dirt_length = plan.dirt_length if plan.dirt_length is not None else aux.tail_coordinate
+    productivity = evaluate(seams, well, aux, plan.names, np.vstack([points, extra]), dirt_length, flux_tolerance)
+    productivity, extra_productivity = productivity[:len(points)], productivity[len(points):]
+    terms, coefficients, r2 = response_surface(plan, points, productivity)
+    return SweepResult(names=plan.names,
+                       points=points,
+                       productivity=productivity,
+                       base_productivity=float(extra_productivity[0]),
+                       tornado=tornado_data(plan, extra, extra_productivity),
+                       surface_terms=terms,
+                       surface_coefficients=coefficients,
+                       surface_r2=r2)
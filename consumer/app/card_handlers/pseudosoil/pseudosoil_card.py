@@ -3,10 +3,9 @@ from pathlib import Path
 import pandas as pd
 
 from app.card_handlers.base.exceptions import CardHandlerException
-from app.card_handlers.base.utils import print_work_time
 from app.card_handlers.pseudosoil.src.results import (
     calculate_selected_case,
-    generate_plot,
+    permeability_chart,
 )
 from app.card_handlers.pseudosoil.src.calculate_permeability import (
     calculate_entry_pressures,
@@ -31,34 +30,37 @@ from app.entities.card import CardType
 class PseudosoilHandler(CardHandler):
     CARD_TYPE = CardType.PSEUDOSOIL
 
-    @print_work_time
     def process(self, data) -> HandlerResult:
         """
         Основной метод обработки данных.
         """
         try:
-            file_content = pd.ExcelFile(data)
-
             if not data.name.endswith('.xlsx'):
                 raise CardHandlerException("Ожидается файл с расширением .xlsx")
 
-            # Расчет по лабораторным данным
-            lab_exp_data = read_parameters_lab(file_content)
-            p_vhod_values = calculate_entry_pressures(
-                lab_exp_data, p_exit=101325, p_vhod=514317
-            )
-            k_values_calculated = calculate_permeability(lab_exp_data, p_vhod_values)
-            k_verified = filter_outliers(k_values_calculated, multiplier=2)
-            average_k_value = calculate_average_permeability(k_verified)
-            graph = generate_plot(k_values_calculated, average_k_value)
-
-            # Расчет изотропной среды
-            parameters = read_parameters_isotropic(file_content)
-            isotropic_results = calculate_selected_case(parameters, file_content)
-
-            # Проницаемость по скважине
-            well_param = read_parameters_well(file_content)
-            well_permeability = well_performance_permeability(well_param)
+            with self.stage('parse'):
+                file_content = pd.ExcelFile(data)
+                lab_exp_data = read_parameters_lab(file_content)
+                parameters = read_parameters_isotropic(file_content)
+                well_param = read_parameters_well(file_content)
+
+            with self.stage('compute'):
+                # Расчет по лабораторным данным
+                p_vhod_values = calculate_entry_pressures(
+                    lab_exp_data, p_exit=101325, p_vhod=514317
+                )
+                k_values_calculated = calculate_permeability(lab_exp_data, p_vhod_values)
+                k_verified = filter_outliers(k_values_calculated, multiplier=2)
+                average_k_value = calculate_average_permeability(k_verified)
+
+                # Расчет изотропной среды
+                isotropic_results = calculate_selected_case(parameters, file_content)
+
+                # Проницаемость по скважине
+                well_permeability = well_performance_permeability(well_param)
+
+            with self.stage('plot'):
+                graph = permeability_chart(k_values_calculated, average_k_value)
 
             average_permability_param = ResultParameter(
                 name="average_permability",
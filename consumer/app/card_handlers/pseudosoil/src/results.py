@@ -1,4 +1,3 @@
-from io import BytesIO
 from pathlib import Path
 from app.card_handlers.pseudosoil.src.pseudosoil_calculator import (
     calculate_case_1,
@@ -9,7 +8,7 @@ from app.card_handlers.pseudosoil.src.pseudosoil_calculator import (
     calculate_case_6,
     calculate_case_7,
 )
-import matplotlib.pyplot as plt
+from app.card_handlers.base.plotting import ChartSpec, Line, HLine
 import pandas as pd
 
 
@@ -50,55 +49,42 @@ def calculate_selected_case(parameters, file_content: pd.ExcelFile):
         raise ValueError("Неизвестный случай")
 
 
-def generate_plot(k_values_calculated, average_k_value) -> BytesIO:
+def permeability_chart(k_values_calculated, average_k_value) -> ChartSpec:
     """
-    Генерирует график результатов определения проницаемости и сохраняет его в формате SVG.
+    Описание графика результатов определения проницаемости.
 
     :param k_values_calculated: Список рассчитанных значений проницаемости.
     :param average_k_value: Среднее значение проницаемости.
-    :param output_path: Путь для сохранения графика (с расширением .svg).
 
-    :return: None
+    :return: Описание графика.
     """
-    # Создание графика
-    plt.figure(figsize=(10, 6))
-
-    # Нанесение точек на график для K_values_calculated
-    plt.scatter(
-        range(1, len(k_values_calculated) + 1),
-        k_values_calculated,
-        label="Результаты определения, мД",
+    return ChartSpec(
+        kind="pseudosoil_permeability",
+        title="Результаты определения проницаемости",
+        xlabel="Номер эксперимента",
+        ylabel="Результаты определения, мД",
+        # Точки на графике для K_values_calculated
+        lines=[
+            Line(
+                x=list(range(1, len(k_values_calculated) + 1)),
+                y=k_values_calculated,
+                label="Результаты определения, мД",
+                linestyle="None",
+                marker="o",
+            )
+        ],
+        # Прямая линия со значением average_k_value
+        hlines=[
+            HLine(
+                y=average_k_value,
+                color="r",
+                linestyle="-",
+                label="Среднее значение проницаемости, мД",
+            )
+        ],
+        figsize=(10, 6),
     )
 
-    # Нанесение прямой линии со значением average_k_value
-    plt.axhline(
-        y=average_k_value,
-        color="r",
-        linestyle="-",
-        label="Среднее значение проницаемости, мД",
-    )
-
-    # Настройка подписей осей и заголовка графика
-    plt.xlabel("Номер эксперимента")
-    plt.ylabel("Результаты определения, мД")
-    plt.title("Результаты определения проницаемости")
-    plt.grid()
-    plt.legend()
-
-    original_output = BytesIO()
-    plt.savefig(original_output, format="png", dpi=200)
-    plt.close()
-    original_output.seek(0)
-
-    # original_svg = original_output.getvalue().decode("utf-8")
-    #
-    # wrapped_svg = f'''<svg viewBox="0 0 100 50" preserveAspectRatio="xMidYMid meet">
-    #   <rect x="0" y="0" width="100" height="50" fill="blue"/>
-    #   {original_svg}
-    # </svg>'''
-
-    return original_output
-
 
 def save_results_to_excel(average_k_value: float, output_path_excel: Path) -> None:
     """
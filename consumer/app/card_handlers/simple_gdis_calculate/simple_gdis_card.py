@@ -2,7 +2,6 @@ from pathlib import Path
 import pandas as pd
 
 from app.card_handlers.base.exceptions import CardHandlerException
-from app.card_handlers.base.utils import print_work_time
 from app.card_handlers.simple_gdis_calculate.src.excel_reader import (
     read_excel_data,
 )
@@ -22,7 +21,6 @@ from app.entities.card import CardType
 class SimpleGDISHandler(CardHandler):
     CARD_TYPE = CardType.SIMPLEGDIS
 
-    @print_work_time
     def process(self, data) -> HandlerResult:
         """
         Основной метод обработки данных.
@@ -31,27 +29,29 @@ class SimpleGDISHandler(CardHandler):
         """
 
         try:
-            file_content = pd.ExcelFile(data)
-
             if not data.name.endswith(".xlsx"):
                 raise CardHandlerException("Ожидается файл с расширением .xlsx")
 
-            hydrodynamic_data = read_excel_data(file_content)
-            lg_t_result = calculate_lg_t(hydrodynamic_data)
-            delta_p = hydrodynamic_data.delta_p
-            coef_angle_incl = (delta_p[-1] - delta_p[-9]) / (
-                lg_t_result[-1] - lg_t_result[-9]
-            )
-            inter_segment = delta_p[-9] - coef_angle_incl * lg_t_result[-9]
-
-            formation_info = read_formation_info(file_content)
-            formation_info.recalibrate_Q()
-
-            epsilon, param, piezo, k_prod, k = calculate_mdh(
-                formation_info=formation_info,
-                coef_angle_incl=coef_angle_incl,
-                inter_segment=inter_segment,
-            )
+            with self.stage("parse"):
+                file_content = pd.ExcelFile(data)
+                hydrodynamic_data = read_excel_data(file_content)
+                formation_info = read_formation_info(file_content)
+
+            with self.stage("compute"):
+                lg_t_result = calculate_lg_t(hydrodynamic_data)
+                delta_p = hydrodynamic_data.delta_p
+                coef_angle_incl = (delta_p[-1] - delta_p[-9]) / (
+                    lg_t_result[-1] - lg_t_result[-9]
+                )
+                inter_segment = delta_p[-9] - coef_angle_incl * lg_t_result[-9]
+
+                formation_info.recalibrate_Q()
+
+                epsilon, param, piezo, k_prod, k = calculate_mdh(
+                    formation_info=formation_info,
+                    coef_angle_incl=coef_angle_incl,
+                    inter_segment=inter_segment,
+                )
 
             # Формирование результата в JSON
             result = HandlerResult(
@@ -12,16 +12,90 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_TYPE: str
     DB_DRIVER: str
+    DB_ECHO: bool = False
+    DB_INSTRUMENTATION: bool = True
+    DB_SLOW_QUERY_SECONDS: float = 0.5
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    DB_LOG_PARAMS_LIMIT: int = 200
+    # пул соединений у процесса-диспетчера (у каждого воркера uvicorn - свой): до size + overflow соединений
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_POOL_WARMUP: bool = True
+
+    # Logging
+    LOG_LEVEL: str = 'INFO'
 
     # MinIO
     MINIO_ENDPOINT: str
     MINIO_ACCESS_KEY: str
     MINIO_SECRET_KEY: str
     MINIO_BUCKET_NAME: str
+    MINIO_SECURE: bool = False
+    MINIO_REGION: str = 'us-east-1'
+    MINIO_POOL_SIZE: int = 10
+    MINIO_CONNECT_TIMEOUT: float = 5
+    MINIO_READ_TIMEOUT: float = 60
+    MINIO_RETRIES: int = 3
+    # объекты больше порога загружаются частями по MINIO_PART_SIZE, до MINIO_TRANSFER_CONCURRENCY частей одновременно
+    MINIO_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    MINIO_PART_SIZE: int = 8 * 1024 * 1024
+    MINIO_TRANSFER_CONCURRENCY: int = 4
+    # файлы больше этого размера при чтении складываются во временный файл, а не в память
+    MINIO_SPOOL_MAX_SIZE: int = 16 * 1024 * 1024
 
     # RabbitMQ
     RABBITMQ_URL: str
     RABBITMQ_QUEUE: str
+    RABBITMQ_EXCHANGE: str = 'cards'
+    RABBITMQ_EVENTS_EXCHANGE: str = 'card_events'
+    # отдельная очередь на каждый тип карточки: {RABBITMQ_QUEUE}.{card_type}
+    RABBITMQ_PREFETCH: dict[str, int] = {'grp': 2, 'grp_sweep': 1, 'pseudosoil': 10, 'simplegdis': 20}
+    RABBITMQ_CONCURRENCY: dict[str, int] = {'grp': 1, 'grp_sweep': 1, 'pseudosoil': 4, 'simplegdis': 8}
+    RABBITMQ_DEFAULT_PREFETCH: int = 10
+    RABBITMQ_DEFAULT_CONCURRENCY: int = 1
+    RABBITMQ_SHUTDOWN_TIMEOUT: float = 60
+    # повторы с задержкой base * 2^n (не больше max) и случайным разбросом jitter
+    RETRY_MAX_ATTEMPTS: int = 5
+    RETRY_BASE_DELAY: float = 5
+    RETRY_MAX_DELAY: float = 300
+    RETRY_JITTER: float = 0.2
+
+    # Handlers
+    # тип карточки -> 'модуль:Класс'; модуль импортируется при первой карточке этого типа
+    HANDLERS: dict[str, str] = {
+        'pseudosoil': 'app.card_handlers.pseudosoil.pseudosoil_card:PseudosoilHandler',
+        'simplegdis': 'app.card_handlers.simple_gdis_calculate.simple_gdis_card:SimpleGDISHandler',
+        'grp': 'app.card_handlers.grp_card.grp_optimal_params:GrpCardHandler',
+        'grp_sweep': 'app.card_handlers.grp_sweep.grp_sweep_card:GrpSweepHandler',
+    }
+    # под uvicorn: импортировать обработчики и запустить пулы при старте; python -m app.worker делает это всегда
+    HANDLERS_WARMUP: bool = False
+    # ряды модели Chen в карточке ГРП: python или numba (если numba не установлена - python)
+    GRP_KERNELS: str = 'python'
+    # сетка распределения притока в карточке ГРП: uniform - с шагом из входного файла, adaptive - узлы Чебышёва
+    GRP_FLUX_GRID: str = 'uniform'
+    GRP_FLUX_TOLERANCE: float = 1e-6
+    # анализ чувствительности ГРП: сколько вариантов допускается в одной карточке
+    GRP_SWEEP_MAX_POINTS: int = 10000
+
+    # Workers
+    HANDLER_WORKERS: int = 4
+    # python -m app.worker: адрес /health и /metrics и период проверки процессов пулов, с
+    WORKER_HTTP_HOST: str = '0.0.0.0'
+    WORKER_HTTP_PORT: int = 8080
+    WORKER_CHECK_INTERVAL: float = 5
+    # должна быть меньше суммарной задержки повторов, иначе сообщение упавшего воркера уйдет в dead
+    CARD_LEASE_SECONDS: float = 120
+    MESSAGE_DEDUP_SIZE: int = 10000
+
+    # Graphs
+    DEFERRED_RENDERING: bool = True
+    PLOT_DPI: int = 200
+    ASSET_WORKERS: int = 2
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,68 @@
+import os
+
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess
+
+# При запуске под uvicorn --workers метрики каждого процесса пишутся в PROMETHEUS_MULTIPROC_DIR
+# и собираются вместе при запросе /metrics
+
+MESSAGES_IN_FLIGHT = Gauge(
+    'card_messages_in_flight',
+    'Сообщения, которые сейчас обрабатываются',
+    ['queue'],
+    multiprocess_mode='livesum',
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    'card_queue_wait_seconds',
+    'Время ожидания сообщения от получения из брокера до начала обработки',
+    ['queue'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+PROCESSING_SECONDS = Histogram(
+    'card_processing_seconds',
+    'Время обработки сообщения',
+    ['queue'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+CARD_STAGE_SECONDS = Histogram(
+    'card_stage_seconds',
+    'Время этапов расчета карточки: download, parse, compute, plot, upload',
+    ['card_type', 'stage'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+CARD_INPUT_BYTES = Histogram(
+    'card_input_bytes',
+    'Размер входного файла карточки',
+    ['card_type'],
+    buckets=(2 ** 10, 2 ** 14, 2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22, 2 ** 24, 2 ** 26, 2 ** 28),
+)
+
+DB_QUERY_SECONDS = Histogram(
+    'db_query_seconds',
+    'Время выполнения SQL-запросов',
+    ['operation', 'table'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds',
+    'Время получения соединения из пула, включая ожидание свободного соединения',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    'db_pool_timeouts',
+    'Соединение не удалось получить за DB_POOL_TIMEOUT',
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Соединения, выданные из пула',
+    multiprocess_mode='livesum',
+)
+
+
+def generate_metrics() -> bytes:
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
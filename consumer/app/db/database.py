@@ -1,8 +1,22 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine, InstrumentedQueuePool
 
-engine = create_async_engine(settings.DB_URL, echo=True)
+engine = create_async_engine(settings.DB_URL,
+                             echo=settings.DB_ECHO,
+                             poolclass=InstrumentedQueuePool,
+                             pool_size=settings.DB_POOL_SIZE,
+                             max_overflow=settings.DB_MAX_OVERFLOW,
+                             pool_timeout=settings.DB_POOL_TIMEOUT,
+                             pool_pre_ping=settings.DB_POOL_PRE_PING,
+                             pool_recycle=settings.DB_POOL_RECYCLE,
+                             connect_args={'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE})
+if settings.DB_INSTRUMENTATION:
+    instrument_engine(engine.sync_engine,
+                      slow_query_seconds=settings.DB_SLOW_QUERY_SECONDS,
+                      slow_query_sample_rate=settings.DB_SLOW_QUERY_SAMPLE_RATE,
+                      params_limit=settings.DB_LOG_PARAMS_LIMIT)
 AsyncSessionFactory = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_QUERY_SECONDS, DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS, DB_POOL_CHECKED_OUT
+
+logger = logging.getLogger('app.db')
+
+_OPERATION_RE = re.compile(r'^\s*(\w+)')
+_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+def _truncate(value, limit: int) -> str:
+    text = repr(value)
+    if len(text) > limit:
+        return f'{text[:limit]}... ({len(text)} chars)'
+    return text
+
+
+def _labels(statement: str) -> tuple[str, str]:
+    operation = _OPERATION_RE.match(statement)
+    table = _TABLE_RE.search(statement)
+    return (operation.group(1).upper() if operation else 'UNKNOWN',
+            table.group(1) if table else '')
+
+
+def instrument_engine(engine: Engine,
+                      slow_query_seconds: float = 0.5,
+                      slow_query_sample_rate: float = 1.0,
+                      params_limit: int = 200):
+    """
+    Подключает к движку замер времени запросов: гистограмма по типу запроса и таблице,
+    выборочное логирование медленных запросов с обрезанными параметрами и логирование ошибок.
+
+    :param engine: Синхронный движок (для AsyncEngine - engine.sync_engine).
+    :param slow_query_seconds: Порог, начиная с которого запрос считается медленным.
+    :param slow_query_sample_rate: Доля медленных запросов, которые попадают в лог.
+    :param params_limit: Максимальная длина параметров запроса в логе.
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        operation, table = _labels(statement)
+        DB_QUERY_SECONDS.labels(operation, table).observe(elapsed)
+
+        if elapsed >= slow_query_seconds and random.random() < slow_query_sample_rate:
+            logger.warning('Slow query %.3fs: %s; params: %s',
+                           elapsed, statement, _truncate(parameters, params_limit))
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Query %.3fs: %s; params: %s',
+                         elapsed, statement, _truncate(parameters, params_limit))
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        starts = context.connection.info.get('query_start_time') if context.connection is not None else None
+        if starts:
+            starts.pop()
+        logger.error('Query failed: %s; params: %s; error: %s',
+                     context.statement,
+                     _truncate(context.parameters, params_limit),
+                     context.original_exception)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет время выдачи соединения и считает выданные соединения.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        event.listen(self, 'checkout', self.__on_checkout)
+        event.listen(self, 'checkin', self.__on_checkin)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def __on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @staticmethod
+    def __on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int):
+    """
+    Заранее открывает соединения пула, чтобы первые сообщения не ждали подключения к БД.
+    """
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
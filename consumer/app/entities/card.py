@@ -9,6 +9,7 @@ from app.card_handlers.base.card_handler import HandlerResult
 class CardType(str, Enum):
     PSEUDOSOIL = 'pseudosoil'
     GRP = 'grp'
+    GRP_SWEEP = 'grp_sweep'
     SIMPLEGDIS = 'simplegdis'
 
 
@@ -16,6 +17,7 @@ class CardStatus(str, Enum):
     CREATED = 'created'
     FAILED = 'failed'
     PENDING = 'pending'
+    PROCESSING = 'processing'
     COMPLETE = 'complete'
 
 
@@ -28,6 +30,7 @@ class Card:
     user_id: UUID
     card_type: str
     result: Optional[dict | HandlerResult]
+    lease_until: Optional[datetime] = None
 
     def dump(self):
         return asdict(self)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 
@@ -11,6 +12,7 @@ class File:
     is_public: bool
     uploaded_by_user: bool
     user_id: UUID
+    render_spec: Optional[dict] = None
 
     def dump(self):
         return asdict(self)
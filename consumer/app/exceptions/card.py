@@ -2,4 +2,7 @@ class CardNotFound(Exception):
     ...
 
 class NotACardOwner(Exception):
+    ...
+
+class CardLeaseBusy(Exception):
     ...
\ No newline at end of file
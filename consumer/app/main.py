@@ -1,37 +1,34 @@
 # {"id": "72e82323-3863-43cd-95d8-bf3a04f8937b", "file_id": "cfb684be-14da-499a-8fab-71d3b0d4f189", "card_type": "pvt"}
 
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from app.adapters.minio_client import client as minio_client
-from app.adapters.rabbitmq_client import RabbitMQConsumer
-from app.card_handlers.base.handler_manager import HandlerManager
-from app.card_handlers.grp_card.grp_optimal_params import GrpCardHandler
-from app.card_handlers.pseudosoil.pseudosoil_card import PseudosoilHandler
-from app.card_handlers.simple_gdis_calculate.simple_gdis_card import SimpleGDISHandler
+from app import runtime
 from app.core.config import settings
-from app.db.database import AsyncSessionFactory
-from app.services.card_service import CardServiceFactory
+from app.core.metrics import generate_metrics
 
-app = FastAPI()
+# Запуск под uvicorn. В рабочем окружении consumer запускается через python -m app.worker
 
+logging.basicConfig(level=settings.LOG_LEVEL,
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
-handler_manager = HandlerManager(PseudosoilHandler,
-                                 SimpleGDISHandler,
-                                 GrpCardHandler)
-card_service_factory = CardServiceFactory(AsyncSessionFactory,
-                                          minio_client,
-                                          handler_manager)
-consumer = RabbitMQConsumer(settings.RABBITMQ_URL,
-                            settings.RABBITMQ_QUEUE,
-                            card_service_factory)
+app = FastAPI()
 
 
 @app.on_event("startup")
 async def startup():
-    await consumer.connect()
-    await consumer.start_consuming()
+    if settings.HANDLERS_WARMUP:
+        runtime.prefork()
+    await runtime.start()
 
 @app.on_event("shutdown")
 async def shutdown():
-    await consumer.close()
+    await runtime.stop()
+
 
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
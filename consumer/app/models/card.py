@@ -17,6 +17,7 @@ class CardModel(Base):
     file_id = Column(UUID(as_uuid=True), nullable=False)
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     result = Column(JSON, default=None)
+    lease_until = Column(DateTime, nullable=True)
 
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
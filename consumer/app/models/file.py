@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, UUID, DateTime, Boolean, String
+from sqlalchemy import Column, UUID, DateTime, Boolean, String, JSON
 
 from app.db.database import Base
 
@@ -15,3 +15,4 @@ class FileModel(Base):
     is_public = Column(Boolean, nullable=False, default=False)
     uploaded_by_user = Column(Boolean, nullable=False)
     uploaded_at = Column(DateTime, nullable=False, default=datetime.now)
+    render_spec = Column(JSON, default=None)
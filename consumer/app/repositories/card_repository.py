@@ -1,13 +1,18 @@
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, and_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.entities.card import Card
+from app.entities.card import Card, CardStatus
+from app.entities.file import File
 from app.exceptions.card import CardNotFound
 from app.models.card import CardModel
+from app.models.file import FileModel
+from app.repositories.file_repository import SqlaFileRepository
 
 
 class CardRepository(ABC):
@@ -19,6 +24,25 @@ class CardRepository(ABC):
     async def get_by_id(self, card_id: UUID):
         raise NotImplementedError
 
+    @abstractmethod
+    async def save_result(self, card: Card) -> Card:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acquire_lease_with_file(self,
+                                      card_id: UUID,
+                                      file_id: UUID,
+                                      lease_seconds: float) -> Optional[tuple[Card, Optional[File]]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_lease(self, card_id: UUID, status: CardStatus):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def renew_lease(self, card_id: UUID, lease_seconds: float) -> bool:
+        raise NotImplementedError
+
 
 class SqlaCardRepository(CardRepository):
     def __init__(self, session: AsyncSession):
@@ -46,16 +70,124 @@ class SqlaCardRepository(CardRepository):
     async def get_by_id(self, card_id: UUID):
         stmt = select(CardModel).where(CardModel.id == card_id)
         result = await self._session.execute(stmt)
-        return self.to_entity(result.scalar())
+        card_db = result.scalar()
+        if not card_db:
+            raise CardNotFound(f'No such card with id {card_id}')
+        return self.to_entity(card_db)
+
+    async def save_result(self, card: Card) -> Card:
+        """
+        Записывает статус и результат одним UPDATE ... RETURNING, без предварительного SELECT.
+        Добавленные в сессию файлы результата сохраняются в той же транзакции.
+        """
+        stmt = (update(CardModel)
+                .where(CardModel.id == card.id)
+                .values(status=card.status,
+                        # как в Card.dump: ResultParameter сохраняются словарями, dataclass JSON-колонка не сериализует
+                        result=card.dump()['result'],
+                        lease_until=card.lease_until)
+                .returning(*CardModel.__table__.columns)
+                .execution_options(synchronize_session=False))
+        try:
+            result = await self._session.execute(stmt)
+            row = result.first()
+            if not row:
+                raise CardNotFound(f'No such card with id {card.id}')
+            await self._session.commit()
+            return self.to_entity(row)
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+
+    async def acquire_lease_with_file(self,
+                                      card_id: UUID,
+                                      file_id: UUID,
+                                      lease_seconds: float) -> Optional[tuple[Card, Optional[File]]]:
+        """
+        Захватывает карточку и в том же запросе загружает ее входной файл.
+        Захват атомарный: из двух одновременных доставок одного сообщения карточку получит только одна.
+
+        :return: None, если карточку захватить не удалось; файл None, если его нет.
+        """
+        now = datetime.now()
+        leased = (update(CardModel)
+                  .where(CardModel.id == card_id,
+                         or_(CardModel.status == CardStatus.PENDING,
+                             and_(CardModel.status == CardStatus.PROCESSING,
+                                  CardModel.lease_until < now)))
+                  .values(status=CardStatus.PROCESSING,
+                          lease_until=now + timedelta(seconds=lease_seconds))
+                  .returning(*CardModel.__table__.columns))
+        if self._session.get_bind().dialect.name != 'postgresql':
+            # UPDATE внутри CTE поддерживает только PostgreSQL; на SQLite (нагрузочный стенд) - два запроса
+            return await self.__acquire_lease_then_file(leased, file_id)
+        leased = leased.cte('leased')
+        stmt = (select(leased, FileModel)
+                .select_from(leased)
+                .outerjoin(FileModel, FileModel.id == file_id))
+        try:
+            result = await self._session.execute(stmt)
+            row = result.first()
+            await self._session.commit()
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+        if not row:
+            return None
+        file_db = row.FileModel
+        return self.to_entity(row), SqlaFileRepository.to_entity(file_db) if file_db else None
+
+    async def __acquire_lease_then_file(self, leased, file_id: UUID) -> Optional[tuple[Card, Optional[File]]]:
+        try:
+            row = (await self._session.execute(leased)).first()
+            file_db = await self._session.get(FileModel, file_id) if row else None
+            await self._session.commit()
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+        if not row:
+            return None
+        return self.to_entity(row), SqlaFileRepository.to_entity(file_db) if file_db else None
+
+    async def release_lease(self, card_id: UUID, status: CardStatus):
+        stmt = (update(CardModel)
+                .where(CardModel.id == card_id, CardModel.status == CardStatus.PROCESSING)
+                .values(status=status, lease_until=None)
+                .execution_options(synchronize_session=False))
+        try:
+            # несохраненные файлы результата не должны попасть в БД вместе со сбросом захвата
+            await self._session.rollback()
+            await self._session.execute(stmt)
+            await self._session.commit()
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+
+    async def renew_lease(self, card_id: UUID, lease_seconds: float) -> bool:
+        """
+        Продлевает захват карточки, которая еще в расчете. Возвращает False, если карточка уже не PROCESSING.
+        """
+        stmt = (update(CardModel)
+                .where(CardModel.id == card_id, CardModel.status == CardStatus.PROCESSING)
+                .values(lease_until=datetime.now() + timedelta(seconds=lease_seconds))
+                .execution_options(synchronize_session=False))
+        try:
+            result = await self._session.execute(stmt)
+            await self._session.commit()
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+        return result.rowcount > 0
 
     @staticmethod
-    def to_entity(card_db: CardModel):
+    def to_entity(card_db):
         return Card(id=card_db.id,
                     file_id=card_db.file_id,
                     status=card_db.status,
                     user_id=card_db.user_id,
                     result=card_db.result,
                     card_type=card_db.card_type,
-                    created_at=card_db.created_at)
+                    created_at=card_db.created_at,
+                    lease_until=card_db.lease_until)
 
 
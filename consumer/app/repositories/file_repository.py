@@ -19,6 +19,10 @@ class FileRepository(ABC):
     async def get_by_id(self, id: UUID) -> File:
         raise NotImplementedError
 
+    @abstractmethod
+    def add(self, file: File):
+        raise NotImplementedError
+
 
 class SqlaFileRepository(FileRepository):
     def __init__(self, session: AsyncSession):
@@ -30,25 +34,30 @@ class SqlaFileRepository(FileRepository):
             self._session.add(file_db)
             await self._session.commit()
             await self._session.refresh(file_db)
-            return self.__to_entity(file_db)
+            return self.to_entity(file_db)
         except SQLAlchemyError as e:
             await self._session.rollback()
             print(e)
             raise FailedToCreateFile(f'Failed to create file {file.dump()}')
 
+    def add(self, file: File):
+        # строка сохранится при ближайшем commit вместе с результатом карточки
+        self._session.add(FileModel(**file.dump()))
+
     async def get_by_id(self, id: UUID) -> File:
         stmt = select(FileModel).where(FileModel.id == id)
         result = await self._session.execute(stmt)
         file_db = result.scalar()
         if not file_db:
             raise FileNotFound(f'File {id} not found')
-        return self.__to_entity(file_db)
+        return self.to_entity(file_db)
 
     @staticmethod
-    def __to_entity(file_db: FileModel):
+    def to_entity(file_db: FileModel):
         return File(id=file_db.id,
                     user_id=file_db.user_id,
                     uploaded_at=file_db.uploaded_at,
                     is_public=file_db.is_public,
                     uploaded_by_user=file_db.uploaded_by_user,
-                    filename=file_db.filename)
\ No newline at end of file
+                    filename=file_db.filename,
+                    render_spec=file_db.render_spec)
\ No newline at end of file
@@ -0,0 +1,110 @@
+import gc
+import multiprocessing
+import multiprocessing.util
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.adapters.card_events import CardEventPublisher
+from app.adapters.minio_client import storage
+from app.adapters.rabbitmq_client import RabbitMQConsumer, QueueConfig, RetryPolicy, card_routing_key
+from app.card_handlers.base.handler_manager import HandlerManager, teardown_handlers
+from app.core.config import settings
+from app.db.database import AsyncSessionFactory, engine
+from app.db.instrumentation import warm_up_pool
+from app.services.card_service import CardServiceFactory
+
+# Общие объекты consumer: их запускают и app.main (FastAPI), и app.worker
+
+
+def _init_pool_process():
+    # процессы пулов останавливает диспетчер после дообработки сообщений; Ctrl+C и SIGTERM всей группе
+    # процессов не должны обрывать расчеты, которые он еще ждет
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    # atexit в процессах multiprocessing не выполняется, финализаторы с exitpriority - выполняются
+    multiprocessing.util.Finalize(None, teardown_handlers, exitpriority=0)
+
+
+# fork явно: процессы пулов получают импортированные обработчики от родителя, а не импортируют их заново
+_mp_context = multiprocessing.get_context('fork')
+
+handler_manager = HandlerManager(settings.HANDLERS)
+asset_executor = ProcessPoolExecutor(max_workers=settings.ASSET_WORKERS,
+                                     mp_context=_mp_context,
+                                     initializer=_init_pool_process)
+handler_executor = ProcessPoolExecutor(max_workers=settings.HANDLER_WORKERS,
+                                       mp_context=_mp_context,
+                                       initializer=_init_pool_process)
+event_publisher = CardEventPublisher(settings.RABBITMQ_URL,
+                                     settings.RABBITMQ_EVENTS_EXCHANGE)
+card_service_factory = CardServiceFactory(AsyncSessionFactory,
+                                          storage,
+                                          handler_manager,
+                                          asset_executor,
+                                          handler_executor,
+                                          event_publisher)
+queues = [
+    QueueConfig(name=f'{settings.RABBITMQ_QUEUE}.{card_type}',
+                routing_key=card_routing_key(card_type),
+                prefetch_count=settings.RABBITMQ_PREFETCH.get(card_type, settings.RABBITMQ_DEFAULT_PREFETCH),
+                concurrency=settings.RABBITMQ_CONCURRENCY.get(card_type, settings.RABBITMQ_DEFAULT_CONCURRENCY))
+    for card_type in handler_manager.card_types
+]
+# старая общая очередь: дочитываем сообщения, опубликованные до перехода на очереди по типам
+queues.append(QueueConfig(name=settings.RABBITMQ_QUEUE,
+                          prefetch_count=settings.RABBITMQ_DEFAULT_PREFETCH,
+                          concurrency=settings.RABBITMQ_DEFAULT_CONCURRENCY))
+consumer = RabbitMQConsumer(settings.RABBITMQ_URL,
+                            settings.RABBITMQ_EXCHANGE,
+                            queues,
+                            card_service_factory,
+                            settings.RABBITMQ_SHUTDOWN_TIMEOUT,
+                            RetryPolicy(max_attempts=settings.RETRY_MAX_ATTEMPTS,
+                                        base_delay=settings.RETRY_BASE_DELAY,
+                                        max_delay=settings.RETRY_MAX_DELAY,
+                                        jitter=settings.RETRY_JITTER),
+                            settings.MESSAGE_DEDUP_SIZE)
+
+
+def pool_processes() -> int:
+    return settings.HANDLER_WORKERS + settings.ASSET_WORKERS
+
+
+def prefork():
+    """
+    Импортирует обработчики, создает их экземпляры с setup и запускает все процессы пулов до первого сообщения.
+    Вызывается до запуска event loop и до соединений с RabbitMQ, MinIO и БД: их fork не копирует.
+
+    gc.freeze переносит объекты, созданные при импорте, в постоянное поколение: сборщик мусора
+    в процессах пулов их не обходит и не пишет в их заголовки, страницы остаются общими с родителем.
+    """
+    handler_manager.warm_up()
+    gc.collect()
+    gc.freeze()
+    for executor, workers in ((handler_executor, settings.HANDLER_WORKERS),
+                              (asset_executor, settings.ASSET_WORKERS)):
+        # новый процесс создается, только если нет свободного: задача должна длиться дольше,
+        # чем запуск остальных процессов пула
+        for future in [executor.submit(time.sleep, 0.5) for _ in range(workers)]:
+            future.result()
+
+
+async def start():
+    if settings.DB_POOL_WARMUP:
+        await warm_up_pool(engine, settings.DB_POOL_SIZE)
+    await storage.connect()
+    await consumer.connect()
+    # события публикуются через соединение consumer, отдельное соединение не нужно
+    await event_publisher.connect(consumer.connection)
+    await consumer.start_consuming()
+
+
+async def stop():
+    # consumer дожидается начатых карточек, их события публикуются до закрытия соединения
+    await consumer.close()
+    await event_publisher.close()
+    await storage.close()
+    asset_executor.shutdown()
+    handler_executor.shutdown()
+    teardown_handlers()
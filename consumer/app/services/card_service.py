@@ -1,49 +1,95 @@
 import asyncio
-from contextlib import asynccontextmanager
+import logging
+import time
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-from io import BytesIO
 from uuid import UUID, uuid4
 
-from minio import Minio
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.adapters.card_events import CardEventPublisher
+from app.adapters.object_storage import ObjectStorage
+from app.adapters.spooled_file import SpooledFile
 from app.card_handlers.base.card_handler import HandlerResult
 from app.card_handlers.base.exceptions import NoSuchHandler
 from app.card_handlers.base.handler_manager import HandlerManager
+from app.card_handlers.base.plotting import ChartSpec, renderer
+from app.core.metrics import CARD_STAGE_SECONDS, CARD_INPUT_BYTES
 from app.entities.card import Card, CardStatus, CardType
 from app.entities.file import File
-from app.exceptions.card import CardNotFound
+from app.exceptions.card import CardNotFound, CardLeaseBusy
 from app.exceptions.file import FileNotFound, NotAFileOwner
 from app.repositories.card_repository import CardRepository, SqlaCardRepository
 from app.repositories.file_repository import FileRepository, SqlaFileRepository
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class CardService:
     def __init__(self,
                  card_repository: CardRepository,
                  file_repository: FileRepository,
-                 minio_client: Minio,
-                 handler_manager: HandlerManager):
+                 storage: ObjectStorage,
+                 handler_manager: HandlerManager,
+                 asset_executor: Executor = None,
+                 handler_executor: Executor = None,
+                 event_publisher: CardEventPublisher = None,
+                 session_factory=None):
+        """
+        :param session_factory: Фабрика сессий для продления захвата карточки во время расчета:
+            основная сессия в это время занята, продление идет через отдельную. Без нее захват не продлевается.
+        """
         self._card_repository = card_repository
         self._file_repository = file_repository
-        self._minio_client = minio_client
+        self._storage = storage
         self._handler_manager = handler_manager
+        self._asset_executor = asset_executor
+        self._handler_executor = handler_executor
+        self._event_publisher = event_publisher
+        self._session_factory = session_factory
 
     async def process_card(self,
                            id: str,
                            file_id: str,
                            card_type: str):
         try:
-            card = await self.get_card_by_id(UUID(id))
-            file, data = await self.get_file_by_id(UUID(file_id),
-                                             user_id=card.user_id,
-                                             bucket_name=settings.MINIO_BUCKET_NAME)
-            handler = self._handler_manager.get_handler(card.card_type)
-            if card.status == CardStatus.PENDING or card.status == CardStatus.COMPLETE:
-                result = handler.process(data)
-                updated_card = await self.__save_result(card, result)
+            # карточку захватываем до скачивания файла, чтобы повторная доставка не стоила расчета;
+            # строка файла загружается тем же запросом
+            leased = await self._card_repository.acquire_lease_with_file(UUID(id),
+                                                                         UUID(file_id),
+                                                                         settings.CARD_LEASE_SECONDS)
+            if leased is None:
+                existing = await self.get_card_by_id(UUID(id))
+                if existing.status == CardStatus.PROCESSING:
+                    raise CardLeaseBusy(f'Card {id} is being processed by another worker')
+                # карточка уже посчитана или расчет не запрашивался - дубликат сообщения
+                return None
         except CardNotFound as e:
             return None
+
+        card, file = leased
+        try:
+            # задача может ждать свободный процесс пула дольше CARD_LEASE_SECONDS: без продления
+            # захват истек бы, и повторная доставка посчитала бы карточку второй раз
+            async with self.__keep_lease(card.id):
+                if file is None:
+                    raise FileNotFound(f'File {file_id} not found')
+                runner = self._handler_manager.get_runner(card.card_type)
+                # расчет синхронный и нагружает CPU, поэтому выполняется вне event loop
+                start = time.perf_counter()
+                with await self.get_file_data(file,
+                                              user_id=card.user_id,
+                                              bucket_name=settings.MINIO_BUCKET_NAME) as data:
+                    download = time.perf_counter() - start
+                    loop = asyncio.get_event_loop()
+                    result = await loop.run_in_executor(self._handler_executor, runner, data)
+                result.stages['download'] = download
+                start = time.perf_counter()
+                await self.__produce_assets(result)
+                result.stages['plot'] = result.stages.get('plot', 0.0) + time.perf_counter() - start
+                updated_card = await self.__save_result(card, result)
         except (FileNotFound, NotAFileOwner, NoSuchHandler) as e:
             card.result = {
                 'error': {
@@ -52,21 +98,82 @@ class CardService:
             }
             card.status = CardStatus.FAILED
             await self.__save_result(card)
+        except Exception:
+            # отпускаем карточку, чтобы повторная попытка могла ее захватить
+            await self._card_repository.release_lease(card.id, CardStatus.PENDING)
+            raise
+
+    async def fail_card(self, id: str, reason: str):
+        try:
+            card = await self.get_card_by_id(UUID(id))
+        except CardNotFound:
+            return None
+        card.result = {
+            'error': {
+                'message': reason
+            }
+        }
+        card.status = CardStatus.FAILED
+        return await self.__save_result(card)
 
 
+    @asynccontextmanager
+    async def __keep_lease(self, card_id: UUID):
+        if self._session_factory is None:
+            yield
+            return
+        renewal = asyncio.create_task(self.__renew_lease(card_id))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            with suppress(asyncio.CancelledError):
+                await renewal
+
+    async def __renew_lease(self, card_id: UUID):
+        while True:
+            await asyncio.sleep(settings.CARD_LEASE_SECONDS / 3)
+            try:
+                async with self._session_factory() as session:
+                    if not await SqlaCardRepository(session).renew_lease(card_id, settings.CARD_LEASE_SECONDS):
+                        return
+            except SQLAlchemyError as e:
+                # следующая попытка - через треть срока, захват к этому времени еще не истечет
+                logger.warning('Failed to renew lease of card %s: %s', card_id, e)
+
+    async def __produce_assets(self, result: HandlerResult):
+        if not result.asset_producers:
+            return
+        loop = asyncio.get_event_loop()
+        assets = await asyncio.gather(*(
+            loop.run_in_executor(self._asset_executor, producer)
+            for producer in result.asset_producers
+        ))
+        result.assets.extend(assets)
+        result.asset_producers = []
+
     async def __save_result(self,
                             card: Card,
                             result: HandlerResult = None) -> Card:
+        card.lease_until = None
         if not result:
-            updated = await self._card_repository.update(card)
+            updated = await self._card_repository.save_result(card)
+            await self.__publish_event(updated)
             return updated
 
+        start = time.perf_counter()
         saved_assets = []
         for asset in result.assets:
-            saved_asset = await self.__save_file(user_id=card.user_id,
-                                                 bucket_name=settings.MINIO_BUCKET_NAME,
-                                                 file_data=asset.data,
-                                                 filename=f'some_file{asset.file_format}')
+            if isinstance(asset.data, ChartSpec):
+                saved_asset = await self.__save_chart(user_id=card.user_id,
+                                                      bucket_name=settings.MINIO_BUCKET_NAME,
+                                                      spec=asset.data,
+                                                      filename=f'some_file{asset.file_format}')
+            else:
+                saved_asset = await self.__save_file(user_id=card.user_id,
+                                                     bucket_name=settings.MINIO_BUCKET_NAME,
+                                                     file_data=asset.data,
+                                                     filename=f'some_file{asset.file_format}')
             saved_assets.append(
                 {
                     'name': asset.name,
@@ -75,17 +182,36 @@ class CardService:
                     'file_id': str(saved_asset.id),
                 }
             )
+        result.stages['upload'] = time.perf_counter() - start
+        self.__observe(card, result)
         res = {
             'data': result.data,
-            'assets': saved_assets
+            'assets': saved_assets,
+            'metadata': {
+                'stages': {name: round(seconds, 6) for name, seconds in result.stages.items()},
+                'input_bytes': result.input_bytes,
+            }
         }
-        if card.status == CardStatus.PENDING:
+        if card.status in (CardStatus.PENDING, CardStatus.PROCESSING):
             card.status = CardStatus.COMPLETE
         if not card.result or card.result == {}:
             card.result = res
-        updated = await self._card_repository.update(card)
+        updated = await self._card_repository.save_result(card)
+        await self.__publish_event(updated)
         return updated
 
+    @staticmethod
+    def __observe(card: Card, result: HandlerResult):
+        card_type = CardType(card.card_type).value
+        for name, seconds in result.stages.items():
+            CARD_STAGE_SECONDS.labels(card_type, name).observe(seconds)
+        if result.input_bytes is not None:
+            CARD_INPUT_BYTES.labels(card_type).observe(result.input_bytes)
+
+    async def __publish_event(self, card: Card):
+        if self._event_publisher is not None:
+            await self._event_publisher.publish(card)
+
 
     async def __save_file(self,
                           user_id: UUID,
@@ -94,29 +220,9 @@ class CardService:
                           filename: str,
                           is_public: bool = False) -> File:
         file_id = uuid4()
-
-        loop = asyncio.get_event_loop()
-        try:
-            await loop.run_in_executor(
-                None,
-                self._minio_client.put_object,
-                bucket_name,
-                str(file_id),
-                BytesIO(file_data),
-                len(file_data),
-                'application/octet-stream'
-            )
-        except TypeError as e:
+        if not isinstance(file_data, (bytes, bytearray)):
             file_data = file_data.getvalue()
-            await loop.run_in_executor(
-                None,
-                self._minio_client.put_object,
-                bucket_name,
-                str(file_id),
-                BytesIO(file_data),
-                len(file_data),
-                'application/octet-stream'
-            )
+        await self._storage.put(bucket_name, str(file_id), file_data)
         file = File(
             id=file_id,
             user_id=user_id,
@@ -125,30 +231,48 @@ class CardService:
             uploaded_by_user=False,
             is_public=is_public
         )
-        await self._file_repository.create(file)
+        self._file_repository.add(file)
         return file
 
+    async def __save_chart(self,
+                           user_id: UUID,
+                           bucket_name: str,
+                           spec: ChartSpec,
+                           filename: str) -> File:
+        if not settings.DEFERRED_RENDERING:
+            loop = asyncio.get_event_loop()
+            file_data = await loop.run_in_executor(None,
+                                                   renderer.render,
+                                                   spec,
+                                                   settings.PLOT_DPI,
+                                                   filename.rsplit('.', 1)[-1])
+            return await self.__save_file(user_id, bucket_name, file_data, filename)
+
+        # Картинка не загружается в MinIO: producer отрисует ее по render_spec при первом запросе файла
+        file = File(
+            id=uuid4(),
+            user_id=user_id,
+            filename=filename,
+            uploaded_at=datetime.utcnow(),
+            uploaded_by_user=False,
+            is_public=False,
+            render_spec=spec.dump()
+        )
+        self._file_repository.add(file)
+        return file
 
 
     async def get_card_by_id(self, card_id: UUID) -> Card:
         return await self._card_repository.get_by_id(card_id)
 
-    async def get_file_by_id(self,
-                             file_id: UUID,
-                             user_id: UUID,
-                             bucket_name) -> (File, BytesIO):
-        file = await self._file_repository.get_by_id(file_id)
+    async def get_file_data(self,
+                            file: File,
+                            user_id: UUID,
+                            bucket_name) -> SpooledFile:
         if (not file.is_public) and (file.user_id != user_id):
             raise NotAFileOwner('You have not permission to access this file')
         try:
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(None,
-                                              self._minio_client.get_object,
-                                              bucket_name,
-                                              str(file_id))
-            data = BytesIO(data.read())
-            data.name = file.filename
-            return file, data
+            return await self._storage.get_file(bucket_name, str(file.id), file.filename)
         except Exception as e:
             print(e)
             raise e
@@ -157,11 +281,17 @@ class CardService:
 class CardServiceFactory:
     def __init__(self,
                  session_factory,
-                 minio_client,
-                 handler_manager):
+                 storage: ObjectStorage,
+                 handler_manager,
+                 asset_executor: Executor = None,
+                 handler_executor: Executor = None,
+                 event_publisher: CardEventPublisher = None):
         self.__session_factory = session_factory
-        self.__minio_client = minio_client
+        self.__storage = storage
         self.__handler_manager = handler_manager
+        self.__asset_executor = asset_executor
+        self.__handler_executor = handler_executor
+        self.__event_publisher = event_publisher
 
     @asynccontextmanager
     async def get_service(self) -> CardService:
@@ -170,5 +300,9 @@ class CardServiceFactory:
             file_repository = SqlaFileRepository(session)
             yield CardService(card_repository,
                               file_repository,
-                              self.__minio_client,
-                              self.__handler_manager)
+                              self.__storage,
+                              self.__handler_manager,
+                              self.__asset_executor,
+                              self.__handler_executor,
+                              self.__event_publisher,
+                              self.__session_factory)
@@ -0,0 +1,114 @@
+"""
+Процесс consumer без FastAPI и uvicorn --workers:
+
+    python -m app.worker
+
+Один процесс-диспетчер держит соединение с RabbitMQ, пул соединений БД и очереди по типам карточек.
+Расчеты идут в HANDLER_WORKERS процессах, графики - в ASSET_WORKERS процессах. Процессы создаются fork
+после импорта обработчиков, так что pandas, scipy и matplotlib загружаются один раз и остаются общими
+страницами памяти. Одновременность задается только настройками, а не числом копий приложения.
+
+SIGTERM или SIGINT: прием сообщений останавливается, начатые карточки дообрабатываются
+(не дольше RABBITMQ_SHUTDOWN_TIMEOUT), затем завершаются процессы пулов.
+Если процесс пула умер, воркер останавливается так же и выходит с кодом 1, чтобы его перезапустили.
+
+GET /health и GET /metrics - на WORKER_HTTP_HOST:WORKER_HTTP_PORT.
+"""
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app import runtime
+from app.core.config import settings
+from app.core.metrics import generate_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Supervisor:
+    STARTING = 'starting'
+    RUNNING = 'running'
+    DRAINING = 'draining'
+
+    def __init__(self, host: str, port: int, check_interval: float):
+        self.host = host
+        self.port = port
+        self.check_interval = check_interval
+        self.state = self.STARTING
+        self._stopping: asyncio.Event = None
+        self._exit_code = 0
+
+    async def run(self) -> int:
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop)
+
+        http = web.AppRunner(self._http_app(), access_log=None)
+        await http.setup()
+        await web.TCPSite(http, self.host, self.port).start()
+        try:
+            await runtime.start()
+            self.state = self.RUNNING
+            logger.info('Worker started: %d handler and %d asset processes',
+                        settings.HANDLER_WORKERS, settings.ASSET_WORKERS)
+            watch = asyncio.create_task(self._watch())
+            await self._stopping.wait()
+            watch.cancel()
+        finally:
+            self.state = self.DRAINING
+            logger.info('Draining: waiting for cards in progress')
+            await runtime.stop()
+            await http.cleanup()
+        return self._exit_code
+
+    def stop(self, exit_code: int = 0):
+        self._exit_code = self._exit_code or exit_code
+        self._stopping.set()
+
+    async def _watch(self):
+        # мертвый процесс ProcessPoolExecutor не заменяет: все следующие расчеты упали бы с BrokenProcessPool
+        while True:
+            await asyncio.sleep(self.check_interval)
+            alive = len(multiprocessing.active_children())
+            if alive < runtime.pool_processes():
+                logger.error('%d of %d pool processes are alive, stopping', alive, runtime.pool_processes())
+                self.stop(exit_code=1)
+                return
+
+    def _http_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/health', self._health)
+        app.router.add_get('/metrics', self._metrics)
+        return app
+
+    async def _health(self, request: web.Request) -> web.Response:
+        data = {
+            'status': self.state,
+            'processes': len(multiprocessing.active_children()),
+            'expected_processes': runtime.pool_processes(),
+        }
+        healthy = self.state == self.RUNNING and data['processes'] >= data['expected_processes']
+        return web.json_response(data, status=200 if healthy else 503)
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=generate_metrics(), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+
+def main() -> int:
+    logging.basicConfig(level=settings.LOG_LEVEL,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    runtime.prefork()
+    supervisor = Supervisor(settings.WORKER_HTTP_HOST,
+                            settings.WORKER_HTTP_PORT,
+                            settings.WORKER_CHECK_INTERVAL)
+    return asyncio.run(supervisor.run())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import openpyxl
+
+from app.card_handlers.base.card_handler import CardHandler
+from app.card_handlers.grp_card.grp_optimal_params import GrpCardHandler
+from app.card_handlers.grp_sweep.grp_sweep_card import GrpSweepHandler
+from app.card_handlers.pseudosoil.pseudosoil_card import PseudosoilHandler
+from app.card_handlers.simple_gdis_calculate.simple_gdis_card import SimpleGDISHandler
+
+HANDLERS_DIR = Path(__file__).resolve().parent.parent / 'app' / 'card_handlers'
+INPUT_FILENAME = 'Входной файл.xlsx'
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    Один сценарий бенчмарка.
+
+    :param name: Имя сценария, по нему же называется эталонный файл golden/{name}.json.
+    :param handler: Класс обработчика.
+    :param build_input: Возвращает содержимое входного xlsx-файла.
+    :param rtol: Допустимое относительное отклонение от эталона.
+    :param atol: Допустимое абсолютное отклонение от эталона.
+    :param golden: Сценарий, с эталоном которого сверяется результат, если не свой.
+    """
+    name: str
+    handler: Callable[[], CardHandler]
+    build_input: Callable[[], bytes]
+    rtol: float = 1e-9
+    atol: float = 0.0
+    tags: set[str] = field(default_factory=set)
+    golden: Optional[str] = None
+
+
+def bundled_input(handler_dir: str) -> Callable[[], bytes]:
+    def build() -> bytes:
+        return (HANDLERS_DIR / handler_dir / INPUT_FILENAME).read_bytes()
+    return build
+
+
+def _edit_workbook(handler_dir: str, edit: Callable) -> bytes:
+    workbook = openpyxl.load_workbook(HANDLERS_DIR / handler_dir / INPUT_FILENAME)
+    edit(workbook.active)
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def grp_input(step: Optional[float] = None,
+              epsilon: Optional[float] = None,
+              dirt_lengths: Optional[int] = None) -> Callable[[], bytes]:
+    """
+    Входной файл ГРП с измененными вспомогательными параметрами.
+
+    :param step: Шаг вычисления притока (C21).
+    :param epsilon: Точность вычислений (C20).
+    :param dirt_lengths: Количество длин загрязнения (столбец E), равномерно от 100 м до 0.
+    """
+
+    def edit(sheet):
+        if step is not None:
+            sheet['C21'] = step
+        if epsilon is not None:
+            sheet['C20'] = epsilon
+        if dirt_lengths is not None:
+            # длины шаблона затираются целиком, столбец E содержит только заданный диапазон
+            for row in range(2, sheet.max_row + 1):
+                sheet.cell(row=row, column=5, value=None)
+            for row, value in enumerate(np.linspace(99.9999, 0, dirt_lengths), start=2):
+                sheet.cell(row=row, column=5, value=float(value))
+
+    return lambda: _edit_workbook('grp_card', edit)
+
+
+def simple_gdis_input(points: int) -> Callable[[], bytes]:
+    """
+    Входной файл ГДИС с длинной кривой восстановления давления: исходная кривая
+    аппроксимируется зависимостью delta_p = a + b * lg(t) и продлевается до points замеров.
+    """
+
+    def edit(sheet):
+        rows = [(t, p) for t, p in sheet.iter_rows(min_row=2, max_col=2, values_only=True) if t is not None]
+        t, p = np.array(rows, dtype=float).T
+        b, a = np.polyfit(np.log10(t), p, 1)
+        new_t = np.linspace(t[0], t[-1], points)
+        new_p = a + b * np.log10(new_t)
+        for row, (t_value, p_value) in enumerate(zip(new_t, new_p), start=2):
+            sheet.cell(row=row, column=1, value=float(t_value))
+            sheet.cell(row=row, column=2, value=float(p_value))
+
+    return lambda: _edit_workbook('simple_gdis_calculate', edit)
+
+
+CASES = [
+    BenchmarkCase('grp', GrpCardHandler, bundled_input('grp_card'), tags={'bundled'}),
+    BenchmarkCase('grp_fine_step', GrpCardHandler, grp_input(step=0.0025, epsilon=1e-12)),
+    BenchmarkCase('grp_dirt_200', GrpCardHandler, grp_input(dirt_lengths=200)),
+    # адаптивная сетка должна давать тот же результат, что мелкий равномерный шаг
+    BenchmarkCase('grp_adaptive', partial(GrpCardHandler, flux_grid='adaptive'),
+                  grp_input(step=0.0025, epsilon=1e-12), rtol=1e-6, golden='grp_fine_step'),
+    BenchmarkCase('grp_sweep', GrpSweepHandler, bundled_input('grp_sweep'), tags={'bundled'}),
+    BenchmarkCase('pseudosoil', PseudosoilHandler, bundled_input('pseudosoil'), tags={'bundled'}),
+    BenchmarkCase('simplegdis', SimpleGDISHandler, bundled_input('simple_gdis_calculate'), tags={'bundled'}),
+    BenchmarkCase('simplegdis_20k', SimpleGDISHandler, simple_gdis_input(points=20000)),
+]
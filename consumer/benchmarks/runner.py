@@ -0,0 +1,238 @@
+"""
+Бенчмарк обработчиков карточек.
+
+Каждый сценарий из benchmarks/cases.py прогоняется несколько раз, по каждому этапу
+(parse, compute, plot, render, serialize) выводятся min/mean/max. Пиковая память замеряется
+отдельным прогоном в новом процессе, как в пуле обработчиков. Результат сверяется с эталоном
+golden/{case}.json.
+
+Запуск из каталога consumer:
+
+    python -m benchmarks                        # все сценарии
+    python -m benchmarks --case grp --rounds 5  # один сценарий
+    python -m benchmarks --update-golden        # перезаписать эталоны
+    python -m benchmarks --json result.json     # сохранить замеры для сравнения между запусками
+    python -m benchmarks --kernels numba        # ряды Chen через Numba, сверка с теми же эталонами
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+import numpy as np
+
+from app.adapters.spooled_file import SpooledFile
+from app.card_handlers.base.plotting import ChartSpec, renderer
+from app.card_handlers.grp_card.src import chen_kernels
+from benchmarks.cases import CASES, BenchmarkCase, INPUT_FILENAME
+
+GOLDEN_DIR = Path(__file__).resolve().parent / 'golden'
+STAGES = ('parse', 'compute', 'plot', 'render', 'serialize')
+
+
+@dataclass
+class RoundResult:
+    timings: dict[str, float]
+    output: dict
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def run_round(case: BenchmarkCase, payload: bytes) -> RoundResult:
+    handler = case.handler()
+    data = SpooledFile(INPUT_FILENAME)
+    data.write(payload)
+    data.seek(0)
+
+    # parse и compute размечают сами обработчики (CardHandler.stage)
+    with data:
+        result = handler.run(data)
+    timings = {stage: result.stages.get(stage, 0.0) for stage in ('parse', 'compute')}
+
+    start = time.perf_counter()
+    assets = list(result.assets) + [producer() for producer in result.asset_producers]
+    timings['plot'] = result.stages.get('plot', 0.0) + time.perf_counter() - start
+
+    charts = [asset.data for asset in assets if isinstance(asset.data, ChartSpec)]
+    start = time.perf_counter()
+    for chart in charts:
+        renderer.render(chart)
+    timings['render'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    serialized = json.dumps({
+        'data': [asdict(parameter) for parameter in result.data or []],
+        'charts': [chart.dump() for chart in charts],
+    }, default=_json_default)
+    timings['serialize'] = time.perf_counter() - start
+
+    return RoundResult(timings=timings, output=json.loads(serialized))
+
+
+def _reset_peak_rss():
+    # 5 в clear_refs сбрасывает VmHWM до текущего RSS. ru_maxrss так не сбросить: при fork и exec
+    # он наследуется от родителя, и новый процесс начинает с пика процесса бенчмарка
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def _read_peak_rss() -> int:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # без /proc - ru_maxrss (в Linux - в КиБ)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _peak_rss(case_name: str, payload: bytes, kernels: str) -> tuple[int, int]:
+    # прирост считается от RSS после импортов и чтения входных данных
+    case = next(case for case in CASES if case.name == case_name)
+    chen_kernels.use_backend(kernels)
+    _reset_peak_rss()
+    baseline = _read_peak_rss()
+    run_round(case, payload)
+    peak = _read_peak_rss()
+    return peak, peak - baseline
+
+
+def measure_peak_memory(case: BenchmarkCase, payload: bytes) -> tuple[int, int]:
+    """
+    Пиковый RSS процесса и его прирост за один прогон. tracemalloc здесь не подходит:
+    он замедляет расчеты на порядок.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_peak_rss, case.name, payload, chen_kernels.kernels.backend).result()
+
+
+def compare(expected, actual, rtol: float, atol: float, path: str = '$') -> list[str]:
+    """
+    Сравнивает результат с эталоном, числа - с допуском. Возвращает список расхождений.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            return [f'{path}: keys {sorted(expected)} != {sorted(actual)}']
+        return [diff for key in expected for diff in compare(expected[key], actual[key], rtol, atol, f'{path}.{key}')]
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f'{path}: length {len(expected)} != {len(actual)}']
+        return [diff for i, (e, a) in enumerate(zip(expected, actual))
+                for diff in compare(e, a, rtol, atol, f'{path}[{i}]')]
+    if _is_number(expected) and _is_number(actual):
+        if math.isnan(expected) and math.isnan(actual):
+            return []
+        if math.isclose(actual, expected, rel_tol=rtol, abs_tol=atol):
+            return []
+        return [f'{path}: {actual!r} != {expected!r}']
+    if expected != actual:
+        return [f'{path}: {actual!r} != {expected!r}']
+    return []
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_parity(case: BenchmarkCase, output: dict, update: bool) -> tuple[str, list[str]]:
+    golden_path = GOLDEN_DIR / f'{case.golden or case.name}.json'
+    if update and case.golden:
+        # чужой эталон перезаписывает только свой сценарий
+        return 'skipped', []
+    if update:
+        GOLDEN_DIR.mkdir(exist_ok=True)
+        golden_path.write_text(json.dumps(output, ensure_ascii=False) + '\n', encoding='utf-8')
+        return 'updated', []
+    if not golden_path.exists():
+        return 'missing', []
+    expected = json.loads(golden_path.read_text(encoding='utf-8'))
+    diffs = compare(expected, output, case.rtol, case.atol)
+    return ('ok' if not diffs else 'FAIL'), diffs
+
+
+def run_case(case: BenchmarkCase, rounds: int, update_golden: bool) -> dict:
+    payload = case.build_input()
+    # первый прогон прогревает импорты и кеши matplotlib, в статистику не входит
+    warmup = run_round(case, payload)
+    results = [run_round(case, payload) for _ in range(rounds)]
+    peak_rss, rss_growth = measure_peak_memory(case, payload)
+    parity, diffs = check_parity(case, warmup.output, update_golden)
+    stages = {
+        stage: {
+            'min': min(r.timings[stage] for r in results),
+            'mean': statistics.fmean(r.timings[stage] for r in results),
+            'max': max(r.timings[stage] for r in results),
+        }
+        for stage in STAGES
+    }
+    total = [sum(r.timings.values()) for r in results]
+    stages['total'] = {'min': min(total), 'mean': statistics.fmean(total), 'max': max(total)}
+    return {
+        'case': case.name,
+        'rounds': rounds,
+        'stages': stages,
+        'peak_rss_bytes': peak_rss,
+        'rss_growth_bytes': rss_growth,
+        'parity': parity,
+        'diffs': diffs,
+    }
+
+
+def print_report(reports: list[dict]):
+    header = f'{"case":<18}{"stage":<11}{"min, ms":>11}{"mean, ms":>11}{"max, ms":>11}'
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        for stage, stats in report['stages'].items():
+            print(f'{report["case"]:<18}{stage:<11}'
+                  f'{stats["min"] * 1000:>11.1f}{stats["mean"] * 1000:>11.1f}{stats["max"] * 1000:>11.1f}')
+        print(f'{report["case"]:<18}{"peak rss":<11}{report["peak_rss_bytes"] / 2 ** 20:>10.1f}M'
+              f'{report["rss_growth_bytes"] / 2 ** 20:>+10.1f}M')
+        print(f'{report["case"]:<18}{"parity":<11}{report["parity"]:>11}')
+        for diff in report['diffs'][:10]:
+            print(f'    {diff}')
+        if len(report['diffs']) > 10:
+            print(f'    ... {len(report["diffs"]) - 10} more')
+        print()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Бенчмарк обработчиков карточек')
+    parser.add_argument('--case', action='append', choices=[case.name for case in CASES],
+                        help='Сценарий, можно указать несколько раз. По умолчанию - все')
+    parser.add_argument('--rounds', type=int, default=3, help='Количество замеряемых прогонов')
+    parser.add_argument('--update-golden', action='store_true', help='Перезаписать эталонные результаты')
+    parser.add_argument('--json', type=Path, help='Сохранить замеры в JSON')
+    parser.add_argument('--kernels', choices=chen_kernels.BACKENDS, default='python',
+                        help='Бэкенд рядов Chen для карточки ГРП; результат сверяется с теми же эталонами')
+    args = parser.parse_args(argv)
+
+    if chen_kernels.use_backend(args.kernels).backend != args.kernels:
+        print(f'{args.kernels} kernels are not available', file=sys.stderr)
+        return 1
+    cases = [case for case in CASES if not args.case or case.name in args.case]
+    reports = [run_case(case, args.rounds, args.update_golden) for case in cases]
+    print_report(reports)
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding='utf-8')
+    return 1 if any(report['parity'] == 'FAIL' for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Время запуска и память процесса consumer при разной регистрации обработчиков.
+
+Каждая конфигурация запускается в новом интерпретаторе: замеряется импорт app.worker
+(и импорт обработчиков, если он входит в конфигурацию), пиковый RSS и какие тяжелые
+библиотеки оказались загружены. Из нескольких запусков берется минимум.
+
+    lazy           - обработчики не импортируются до первой карточки (по умолчанию)
+    warmup         - все обработчики импортируются при старте, как в app.worker (под uvicorn - HANDLERS_WARMUP=true)
+    first:{type}   - lazy и первая карточка типа type
+
+Запуск из каталога consumer, настройки читаются из окружения, как у сервиса:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --json startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.config import settings
+
+CONSUMER_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'matplotlib', 'openpyxl')
+
+_PROBE = '''
+import json, resource, sys, time
+config = sys.argv[1]
+start = time.perf_counter()
+import app.worker
+from app.runtime import handler_manager
+imported = time.perf_counter() - start
+if config == 'warmup':
+    handler_manager.warm_up()
+elif config.startswith('first:'):
+    handler_manager.get_handler(config.partition(':')[2])
+print(json.dumps({
+    'import_seconds': imported,
+    'total_seconds': time.perf_counter() - start,
+    'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    'modules': [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def probe(config: str) -> dict:
+    output = subprocess.run([sys.executable, '-c', _PROBE, config],
+                            cwd=CONSUMER_DIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_config(config: str, runs: int) -> dict:
+    results = [probe(config) for _ in range(runs)]
+    return {
+        'config': config,
+        'import_seconds': min(r['import_seconds'] for r in results),
+        'total_seconds': min(r['total_seconds'] for r in results),
+        'peak_rss_bytes': min(r['peak_rss_bytes'] for r in results),
+        'modules': results[0]['modules'],
+    }
+
+
+def print_report(reports: list[dict]):
+    header = f'{"config":<22}{"import, ms":>12}{"total, ms":>12}{"peak rss":>11}  modules'
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        print(f'{report["config"]:<22}{report["import_seconds"] * 1000:>12.0f}{report["total_seconds"] * 1000:>12.0f}'
+              f'{report["peak_rss_bytes"] / 2 ** 20:>10.1f}M  {", ".join(report["modules"]) or "-"}')
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup',
+                                     description='Время запуска и память consumer')
+    parser.add_argument('--runs', type=int, default=3, help='Запусков каждой конфигурации')
+    parser.add_argument('--json', type=Path, help='Сохранить замеры в JSON')
+    args = parser.parse_args(argv)
+
+    configs = ['lazy', 'warmup'] + [f'first:{card_type}' for card_type in settings.HANDLERS]
+    reports = [run_config(config, args.runs) for config in configs]
+    print_report(reports)
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
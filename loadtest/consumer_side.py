@@ -0,0 +1,106 @@
+"""
+Consumer на стенде: отдельный процесс, как в рабочем окружении. Задачи приходят из очередей multiprocessing
+вместо RabbitMQ, события о завершении расчета уходят в очередь events вместо fanout exchange.
+Модуль импортирует только app.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.adapters.object_storage import ObjectStorage
+from app.adapters.spooled_file import SpooledFile
+from app.card_handlers.base.handler_manager import HandlerManager
+from app.core.config import settings
+from app.entities.card import Card, CardStatus
+from app.services.card_service import CardServiceFactory
+from loadtest.db import create_engine
+
+
+class LocalObjectStorage(ObjectStorage):
+    """
+    Хранилище в каталоге вместо MinIO, тот же каталог, что у producer.
+    """
+
+    def __init__(self, root: Path):
+        self._root = root
+
+    async def put(self,
+                  bucket_name: str,
+                  object_name: str,
+                  data: bytes,
+                  content_type: str = 'application/octet-stream') -> None:
+        await asyncio.to_thread((self._root / bucket_name / object_name).write_bytes, bytes(data))
+
+    async def get_file(self, bucket_name: str, object_name: str, filename: str) -> SpooledFile:
+        data = await asyncio.to_thread((self._root / bucket_name / object_name).read_bytes)
+        file = SpooledFile(filename, max_size=settings.MINIO_SPOOL_MAX_SIZE)
+        file.write(data)
+        file.seek(0)
+        return file
+
+
+class QueueEventPublisher:
+    """
+    Замена CardEventPublisher: статус карточки отправляется процессу нагрузки.
+    """
+
+    def __init__(self, events: multiprocessing.Queue):
+        self._events = events
+
+    async def publish(self, card: Card):
+        self._events.put({'id': str(card.id), 'status': CardStatus(card.status).value})
+
+
+def run_consumer(db_url: str,
+                 storage_root: str,
+                 queues: dict[str, multiprocessing.Queue],
+                 events: multiprocessing.Queue):
+    asyncio.run(_serve(db_url, Path(storage_root), queues, events))
+
+
+async def _serve(db_url: str,
+                 storage_root: Path,
+                 queues: dict[str, multiprocessing.Queue],
+                 events: multiprocessing.Queue):
+    engine = create_engine(db_url, settings.DB_POOL_SIZE)
+    handler_manager = HandlerManager(settings.HANDLERS)
+    # одновременность по типам карточек - как у RabbitMQConsumer в рабочем окружении
+    concurrency = {card_type: settings.RABBITMQ_CONCURRENCY.get(card_type, settings.RABBITMQ_DEFAULT_CONCURRENCY)
+                   for card_type in handler_manager.card_types}
+    # чтение из очереди multiprocessing блокирующее: у каждого обработчика свой поток
+    with ProcessPoolExecutor(max_workers=settings.ASSET_WORKERS) as asset_executor, \
+            ProcessPoolExecutor(max_workers=settings.HANDLER_WORKERS) as handler_executor, \
+            ThreadPoolExecutor(max_workers=sum(concurrency.values())) as receivers:
+        factory = CardServiceFactory(async_sessionmaker(engine, expire_on_commit=False),
+                                     LocalObjectStorage(storage_root),
+                                     handler_manager,
+                                     asset_executor,
+                                     handler_executor,
+                                     QueueEventPublisher(events))
+        await asyncio.gather(*(
+            _work(queues[card_type], receivers, factory, events)
+            for card_type, count in concurrency.items()
+            for _ in range(count)
+        ))
+    await engine.dispose()
+
+
+async def _work(queue: multiprocessing.Queue,
+                receivers: ThreadPoolExecutor,
+                factory: CardServiceFactory,
+                events: multiprocessing.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        data = await loop.run_in_executor(receivers, queue.get)
+        if data is None:
+            # сигнал остановки возвращается в очередь для остальных обработчиков этого типа
+            queue.put(None)
+            return
+        try:
+            async with factory.get_service() as card_service:
+                await card_service.process_card(**data)
+        except Exception as e:
+            events.put({'id': data['id'], 'status': 'error', 'error': f'{type(e).__name__}: {e}'})
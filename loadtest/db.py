@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+def create_engine(db_url: str, pool_size: int = 10) -> AsyncEngine:
+    """
+    Движок для стенда. SQLite общий для producer и consumer, которые работают в разных процессах,
+    поэтому транзакции начинаются с BEGIN IMMEDIATE: иначе отложенная блокировка на запись
+    падает с "database is locked", не дожидаясь busy_timeout.
+    """
+    if not db_url.startswith('sqlite'):
+        return create_async_engine(db_url, pool_size=pool_size, max_overflow=pool_size)
+
+    engine = create_async_engine(db_url, connect_args={'timeout': 60})
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        # транзакциями управляет обработчик begin ниже, а не драйвер
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, 'begin')
+    def on_begin(connection):
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+    return engine
@@ -0,0 +1,63 @@
+import os
+import sys
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ROOT = Path(__file__).resolve().parent.parent
+PRODUCER_DIR = ROOT / 'producer'
+CONSUMER_DIR = ROOT / 'consumer'
+
+# Настройки producer и consumer читаются при импорте, поэтому окружение задается до импорта src и app.
+# Адреса RabbitMQ, MinIO и сервера авторизации на стенде не используются, но обязательны в Settings
+ENVIRONMENT = {
+    'APP_NAME': 'npi-loadtest',
+    'DB_USER': 'loadtest',
+    'DB_PASSWORD': 'loadtest',
+    'DB_HOST': 'localhost',
+    'DB_PORT': '5432',
+    'DB_NAME': 'loadtest',
+    'DB_TYPE': 'postgresql',
+    'DB_DRIVER': 'asyncpg',
+    'DB_POOL_WARMUP': 'false',
+    'MINIO_ENDPOINT': 'localhost:9000',
+    'MINIO_ACCESS_KEY': 'loadtest',
+    'MINIO_SECRET_KEY': 'loadtest',
+    'MINIO_BUCKET_NAME': 'loadtest',
+    'RABBITMQ_URL': 'amqp://localhost/',
+    'RABBITMQ_QUEUE': 'cards',
+    'AUTH_SERVER_URL': 'http://localhost',
+    'USERINFO_URI': '/userinfo',
+}
+
+
+def bootstrap(workdir: Path) -> bytes:
+    """
+    Готовит окружение стенда: пути к пакетам, переменные окружения и тестовую пару ключей JWT.
+    Открытый ключ producer читает из JWT_PUBLIC_KEY_PATH, закрытым подписываются токены пользователей.
+
+    :return: Закрытый ключ в PEM.
+    """
+    for path in (PRODUCER_DIR, CONSUMER_DIR):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key_path = workdir / 'jwt_public.pem'
+    public_key_path.write_bytes(key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                              serialization.PublicFormat.SubjectPublicKeyInfo))
+    os.environ.update(ENVIRONMENT)
+    os.environ['JWT_PUBLIC_KEY_PATH'] = str(public_key_path)
+    return key.private_bytes(serialization.Encoding.PEM,
+                             serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption())
+
+
+def consumer_entrypoint(*args):
+    """
+    Точка входа процесса consumer. app импортируется только в нем: producer и consumer регистрируют
+    метрики Prometheus с одинаковыми именами и не могут работать в одном процессе.
+    """
+    from loadtest.consumer_side import run_consumer
+    run_consumer(*args)
@@ -0,0 +1,164 @@
+"""
+Producer на стенде: FastAPI-приложение из src.main с подмененными зависимостями.
+Модуль импортирует только src: в одном процессе с app метрики Prometheus зарегистрировались бы дважды.
+"""
+import asyncio
+import multiprocessing
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+from fastapi import Depends
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.application.services.card_service import CardService
+from src.application.services.file_service import FileService
+from src.domain.adapters import AuthAdapter, ObjectStorage
+from src.domain.entities import User
+from src.domain.entities.card import CardType
+from src.infrastructure.config import settings
+from src.infrastructure.db.database import Base
+from src.infrastructure.repositories.card_repository import SqlaCardRepository
+from src.infrastructure.repositories.file_repository import SqlaFileRepository
+from src.main import app
+from src.presentation.api import deps
+import src.infrastructure.db.models  # noqa: F401 - регистрация моделей в Base.metadata
+
+
+class LocalObjectStorage(ObjectStorage):
+    """
+    Хранилище в каталоге вместо MinIO: объект лежит в {root}/{bucket}/{object}.
+    Consumer читает тот же каталог.
+    """
+
+    def __init__(self, root: Path):
+        self._root = root
+
+    async def ensure_bucket(self, bucket_name: str) -> None:
+        (self._root / bucket_name).mkdir(parents=True, exist_ok=True)
+
+    async def put(self,
+                  bucket_name: str,
+                  object_name: str,
+                  data: bytes,
+                  content_type: str = 'application/octet-stream') -> None:
+        await asyncio.to_thread((self._root / bucket_name / object_name).write_bytes, bytes(data))
+
+    async def get(self, bucket_name: str, object_name: str) -> bytes:
+        return await asyncio.to_thread((self._root / bucket_name / object_name).read_bytes)
+
+    async def delete(self, bucket_name: str, object_name: str) -> None:
+        (self._root / bucket_name / object_name).unlink(missing_ok=True)
+
+
+class QueueBroker:
+    """
+    Замена RabbitMQClient: задачи на расчет кладутся в очередь multiprocessing своего типа карточки,
+    как в очереди {RABBITMQ_QUEUE}.{card_type}.
+    """
+
+    def __init__(self, queues: dict[str, multiprocessing.Queue]):
+        self._queues = queues
+
+    async def publish_card(self, card):
+        card_type = CardType(card.card_type).value
+        self._queues[card_type].put({
+            'id': str(card.id),
+            'file_id': str(card.file_id),
+            'card_type': card_type,
+        })
+
+    async def publish_many(self, cards) -> list:
+        for card in cards:
+            await self.publish_card(card)
+        return []
+
+
+class LocalAuthAdapter(AuthAdapter):
+    """
+    Данные нового пользователя берутся из claims тестового токена, без сервера авторизации.
+    """
+
+    def __init__(self):
+        super().__init__(auth_server_url='', userinfo_uri='')
+
+    async def get_userinfo(self, token):
+        claims = jwt.get_unverified_claims(token)
+        return User(id=UUID(claims['sub']),
+                    first_name=claims['given_name'],
+                    last_name=claims['family_name'],
+                    email=claims['email'],
+                    email_verified=True,
+                    phone_number='',
+                    phone_number_verified=False)
+
+
+class TokenIssuer:
+    """
+    Подписывает токены тестовым закрытым ключом; producer проверяет их открытым ключом из JWT_PUBLIC_KEY_PATH.
+    """
+
+    def __init__(self, private_key: bytes, lifetime: timedelta = timedelta(hours=1)):
+        self._private_key = private_key.decode()
+        self._lifetime = lifetime
+
+    def issue(self, user_id: UUID) -> str:
+        now = datetime.utcnow()
+        claims = {
+            'sub': str(user_id),
+            'given_name': 'Load',
+            'family_name': f'Test {str(user_id)[:8]}',
+            'email': f'{user_id}@loadtest.local',
+            'iat': int(now.timestamp()),
+            'exp': int((now + self._lifetime).timestamp()),
+        }
+        return jwt.encode(claims, self._private_key, algorithm=settings.JWT_ALGORITHM)
+
+
+async def create_schema(engine):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+def build_app(session_factory: async_sessionmaker,
+              storage: ObjectStorage,
+              broker: QueueBroker):
+    """
+    Подменяет в приложении сессию БД, хранилище, брокер и сервер авторизации.
+    События startup не вызываются: httpx.ASGITransport их не запускает, к RabbitMQ и MinIO никто не подключается.
+    """
+
+    async def get_session() -> AsyncSession:
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except:
+                await session.rollback()
+                raise
+
+    async def get_file_service(file_repo: SqlaFileRepository = Depends(deps.get_file_repository)) -> FileService:
+        return FileService(file_repo, storage)
+
+    async def get_card_service(card_repository: SqlaCardRepository = Depends(deps.get_card_repository)) -> CardService:
+        return CardService(card_repository, broker)
+
+    async def get_auth_adapter() -> AuthAdapter:
+        return LocalAuthAdapter()
+
+    app.dependency_overrides.update({
+        deps.get_session: get_session,
+        deps.get_file_service: get_file_service,
+        deps.get_card_service: get_card_service,
+        deps.get_auth_adapter: get_auth_adapter,
+    })
+    return app
+
+
+def card_types() -> list[str]:
+    return [card_type.value for card_type in CardType]
+
+
+def bucket_name() -> str:
+    return settings.MINIO_BUCKET_NAME
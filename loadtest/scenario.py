@@ -0,0 +1,224 @@
+import asyncio
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+import httpx
+
+from loadtest.env import CONSUMER_DIR
+
+INPUT_FILENAME = 'Входной файл.xlsx'
+# входные файлы из комплекта обработчиков consumer
+INPUT_FILES = {
+    'grp': CONSUMER_DIR / 'app' / 'card_handlers' / 'grp_card' / INPUT_FILENAME,
+    'grp_sweep': CONSUMER_DIR / 'app' / 'card_handlers' / 'grp_sweep' / INPUT_FILENAME,
+    'pseudosoil': CONSUMER_DIR / 'app' / 'card_handlers' / 'pseudosoil' / INPUT_FILENAME,
+    'simplegdis': CONSUMER_DIR / 'app' / 'card_handlers' / 'simple_gdis_calculate' / INPUT_FILENAME,
+}
+
+
+@dataclass
+class LoadProfile:
+    """
+    :param users: Количество пользователей, работающих одновременно.
+    :param cards: Карточек у каждого пользователя, типы чередуются по card_types.
+    :param calculations: Сколько раз пересчитывается каждая карточка, следующий расчет - после результата предыдущего.
+    :param result_timeout: Сколько ждать результат одного расчета, с.
+    """
+    users: int
+    cards: int
+    calculations: int
+    card_types: list[str]
+    result_timeout: float = 300
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    time_to_result: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    failed_results: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    result_errors: list[str] = field(default_factory=list)
+    stages: dict[str, dict[str, list[float]]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(list)))
+    started: float = 0
+    finished: float = 0
+
+
+class ResultTracker:
+    """
+    Ждет событий о завершении расчета от consumer. Ожидание регистрируется до запроса на расчет,
+    чтобы не пропустить быстрый результат.
+    """
+
+    def __init__(self):
+        self._waiters: dict[str, asyncio.Future] = {}
+
+    def expect(self, card_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[card_id] = future
+        return future
+
+    def on_event(self, event: dict):
+        if event['status'] not in ('complete', 'failed', 'error'):
+            return
+        future = self._waiters.pop(event['id'], None)
+        if future is not None and not future.done():
+            future.set_result(event)
+
+
+class LoadTestError(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self,
+                 client: httpx.AsyncClient,
+                 token: str,
+                 tracker: ResultTracker,
+                 stats: Stats):
+        self.client = client
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.tracker = tracker
+        self.stats = stats
+
+    async def request(self, method: str, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """
+        :param endpoint: Шаблон пути для отчета, например POST /cards/calculate/{card_id}.
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            # необработанное исключение приложения httpx.ASGITransport пробрасывает как есть
+            self.stats.latencies[endpoint].append(time.perf_counter() - start)
+            self.stats.errors[endpoint] += 1
+            raise LoadTestError(f'{endpoint}: {type(e).__name__}: {e}') from e
+        self.stats.latencies[endpoint].append(time.perf_counter() - start)
+        if response.is_error:
+            self.stats.errors[endpoint] += 1
+            raise LoadTestError(f'{endpoint}: {response.status_code} {response.text[:200]}')
+        return response
+
+    async def run(self, profile: LoadProfile):
+        await self.request('GET', 'GET /users/me', '/users/me')
+        files = {}
+        for card_type in {profile.card_types[i % len(profile.card_types)] for i in range(profile.cards)}:
+            response = await self.request('POST', 'POST /files/upload', '/files/upload',
+                                          files={'uploaded_file': (INPUT_FILENAME, INPUT_FILES[card_type].read_bytes())})
+            files[card_type] = response.json()['id']
+        cards = []
+        for i in range(profile.cards):
+            card_type = profile.card_types[i % len(profile.card_types)]
+            response = await self.request('POST', 'POST /cards', '/cards',
+                                          json={'card_type': card_type, 'name': f'Карточка {i}', 'file_id': files[card_type]})
+            cards.append((response.json()['id'], card_type))
+        await asyncio.gather(*(self.calculate(card_id, card_type, profile) for card_id, card_type in cards))
+
+    async def calculate(self, card_id: str, card_type: str, profile: LoadProfile):
+        for _ in range(profile.calculations):
+            result = self.tracker.expect(card_id)
+            start = time.perf_counter()
+            await self.request('POST', 'POST /cards/calculate/{card_id}', f'/cards/calculate/{card_id}')
+            try:
+                event = await asyncio.wait_for(result, profile.result_timeout)
+            except asyncio.TimeoutError:
+                self.stats.failed_results[card_type] += 1
+                raise LoadTestError(f'No result for card {card_id} in {profile.result_timeout} s')
+            self.stats.time_to_result[card_type].append(time.perf_counter() - start)
+            if event['status'] == 'error':
+                # исключение в consumer, карточка не сохранена
+                self.stats.failed_results[card_type] += 1
+                self.stats.result_errors.append(f'{card_type} {card_id}: {event["error"]}')
+                continue
+            response = await self.request('GET', 'GET /cards/{card_id}', f'/cards/{card_id}')
+            result = response.json().get('result') or {}
+            if event['status'] != 'complete':
+                self.stats.failed_results[card_type] += 1
+                self.stats.result_errors.append(f'{card_type} {card_id}: {result.get("error", {}).get("message")}')
+                continue
+            for stage, seconds in result.get('metadata', {}).get('stages', {}).items():
+                self.stats.stages[card_type][stage].append(seconds)
+
+
+async def run_load(client: httpx.AsyncClient,
+                   issue_token,
+                   tracker: ResultTracker,
+                   profile: LoadProfile) -> tuple[Stats, list[BaseException]]:
+    stats = Stats()
+    users = [VirtualUser(client, issue_token(uuid4()), tracker, stats) for _ in range(profile.users)]
+    stats.started = time.perf_counter()
+    results = await asyncio.gather(*(user.run(profile) for user in users), return_exceptions=True)
+    stats.finished = time.perf_counter()
+    return stats, [result for result in results if isinstance(result, BaseException)]
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p99': percentile(values, 99),
+        'max': max(values),
+    }
+
+
+def build_report(stats: Stats, profile: LoadProfile, failures: list[BaseException]) -> dict:
+    elapsed = stats.finished - stats.started
+    requests = sum(len(values) for values in stats.latencies.values())
+    results = sum(len(values) for values in stats.time_to_result.values())
+    return {
+        'profile': {
+            'users': profile.users,
+            'cards': profile.cards,
+            'calculations': profile.calculations,
+            'card_types': profile.card_types,
+        },
+        'elapsed': elapsed,
+        'requests_per_second': requests / elapsed,
+        'results_per_second': results / elapsed,
+        'endpoints': {endpoint: {**summarize(values), 'errors': stats.errors.get(endpoint, 0)}
+                      for endpoint, values in stats.latencies.items()},
+        'time_to_result': {card_type: {**summarize(values), 'failed': stats.failed_results.get(card_type, 0)}
+                           for card_type, values in stats.time_to_result.items()},
+        'stages': {card_type: {stage: sum(values) / len(values) for stage, values in stages.items()}
+                   for card_type, stages in stats.stages.items()},
+        'failures': [str(failure) for failure in failures[:20]],
+        'result_errors': stats.result_errors[:20],
+    }
+
+
+def print_report(report: dict):
+    profile = report['profile']
+    print(f'{profile["users"]} users x {profile["cards"]} cards x {profile["calculations"]} calculations '
+          f'({", ".join(profile["card_types"])}) in {report["elapsed"]:.1f} s: '
+          f'{report["requests_per_second"]:.1f} req/s, {report["results_per_second"]:.2f} results/s')
+    print()
+    header = f'{"endpoint":<34}{"count":>7}{"errors":>8}{"p50, ms":>10}{"p99, ms":>10}{"max, ms":>10}'
+    print(header)
+    print('-' * len(header))
+    for endpoint, row in report['endpoints'].items():
+        print(f'{endpoint:<34}{row["count"]:>7}{row["errors"]:>8}'
+              f'{row["p50"] * 1000:>10.1f}{row["p99"] * 1000:>10.1f}{row["max"] * 1000:>10.1f}')
+    print()
+    header = f'{"time to result":<34}{"count":>7}{"failed":>8}{"p50, s":>10}{"p99, s":>10}{"max, s":>10}'
+    print(header)
+    print('-' * len(header))
+    for card_type, row in report['time_to_result'].items():
+        print(f'{card_type:<34}{row["count"]:>7}{row["failed"]:>8}'
+              f'{row["p50"]:>10.2f}{row["p99"]:>10.2f}{row["max"]:>10.2f}')
+    if report['stages']:
+        print()
+        print('mean stage time in consumer, s')
+        for card_type, stages in report['stages'].items():
+            print(f'  {card_type:<14}' + '  '.join(f'{stage} {seconds:.3f}' for stage, seconds in stages.items()))
+    if report['failures'] or report['result_errors']:
+        print()
+        print('failures:')
+        for failure in report['failures'] + report['result_errors']:
+            print(f'  {failure}')
@@ -10,4 +10,8 @@ class SharingError(NPIToolsException):
 
 
 class FailedToDeleteCard(NPIToolsException):
+    ...
+
+
+class FailedToStartCalculation(NPIToolsException):
     ...
\ No newline at end of file
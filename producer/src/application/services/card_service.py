@@ -2,8 +2,10 @@ from uuid import UUID
 
 from src.domain.entities import Card, CardStatus
 from src.domain.entities.card import SharingURL, CardCopy
+from src.application.exceptions.cards import FailedToStartCalculation
 from src.domain.repositories.card_repository import CardRepository
 from src.infrastructure.rabbitmq.client import RabbitMQClient
+from src.infrastructure.rabbitmq.exceptions import FailedToPublish
 from src.infrastructure.utils import generate_share_token
 
 
@@ -27,11 +29,36 @@ class CardService:
         return created
 
     async def start_calculation(self, card: Card) -> Card:
+        previous_status = card.status
         card.status = CardStatus.PENDING
         updated = await self._card_repository.update(card)
-        await self._rabbitmq_client.publish_card(updated)
+        # строка карточки заблокирована до commit запроса, воркер дождется фиксации статуса PENDING
+        try:
+            await self._rabbitmq_client.publish_card(updated)
+        except FailedToPublish as e:
+            # задача не попала в очередь - возвращаем статус, иначе карточка навсегда останется в PENDING
+            updated.status = previous_status
+            await self._card_repository.update(updated)
+            raise FailedToStartCalculation('Failed to enqueue card for calculation, try again later') from e
         return updated
 
+    async def start_calculation_many(self,
+                                     user_id: UUID,
+                                     card_ids: list[UUID] = None,
+                                     group_id: UUID = None) -> list[Card]:
+        marked = await self._card_repository.mark_pending(user_id, card_ids=card_ids, group_id=group_id)
+        if not marked:
+            return []
+        cards = [card for card, _ in marked]
+        previous_statuses = {card.id: status for card, status in marked}
+        failed = await self._rabbitmq_client.publish_many(cards)
+        if failed:
+            await self._card_repository.restore_statuses({card.id: previous_statuses[card.id] for card in failed})
+            if len(failed) == len(cards):
+                raise FailedToStartCalculation('Failed to enqueue cards for calculation, try again later')
+        failed_ids = {card.id for card in failed}
+        return [card for card in cards if card.id not in failed_ids]
+
     async def get_by_id(self, card_id: UUID) -> Card:
         card = await self._card_repository.get(card_id)
         return card
@@ -59,7 +86,8 @@ class CardService:
                                  base_url=base_url,
                                  code=code,
                                  url=url,
-                                 user_id=card.user_id)
+                                 user_id=card.user_id,
+                                 card=card)
         created = await self._card_repository.create_sharing_url(sharing_url)
         return created
 
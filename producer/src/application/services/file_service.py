@@ -1,24 +1,23 @@
 import asyncio
 import hashlib
-import io
 import uuid
 from datetime import datetime
 from io import BytesIO
 
-from minio import Minio
-
 from src.application.exceptions.files import NotAFileOwner, FileNotFound, FileAlreadyExists
+from src.domain.adapters import ObjectStorage
 from src.domain.entities.card import CardType
 from src.domain.entities.file import File
 from src.domain.repositories.file_repository import FileRepository
+from src.infrastructure.charts import render_chart
 
 
 class FileService:
     def __init__(self,
                  file_repo: FileRepository,
-                 minio_client: Minio):
+                 storage: ObjectStorage):
         self.file_repo = file_repo
-        self.minio_client = minio_client
+        self.storage = storage
 
     async def upload_file(self,
                           user_id: uuid.UUID,
@@ -35,16 +34,7 @@ class FileService:
             file_ex = await self.file_repo.get_by_hash_and_user_id(file_hash, user_id)
             return file_ex
         except FileNotFound:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self.minio_client.put_object,
-                bucket_name,
-                str(file_id),
-                io.BytesIO(file_data),
-                len(file_data),
-                'application/octet-stream'
-            )
+            await self.storage.put(bucket_name, str(file_id), file_data)
             file = File(
                 id=file_id,
                 user_id=user_id,
@@ -66,19 +56,30 @@ class FileService:
         file = await self.file_repo.get_by_id(file_id)
         if (not file.is_public) and (file.user_id != user_id):
             raise NotAFileOwner('You have not permission to access this file')
+        if file.render_spec:
+            data = await self.__render_file(file, bucket_name)
+            return file, data
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None,
-                                       self.minio_client.get_object,
-                                       bucket_name,
-                                       str(file_id))
-            data = await loop.run_in_executor(None, response.read)
-            response.close()
+            data = await self.storage.get(bucket_name, str(file_id))
             return file, data
         except Exception as e:
             print(e)
             raise e
 
+    async def __render_file(self,
+                            file: File,
+                            bucket_name: str) -> bytes:
+        # График, рассчитанный consumer'ом, рендерится при первом запросе и кешируется в MinIO
+        loop = asyncio.get_event_loop()
+        data = await loop.run_in_executor(None,
+                                          render_chart,
+                                          file.render_spec,
+                                          file.filename.rsplit('.', 1)[-1])
+        await self.storage.put(bucket_name, str(file.id), data)
+        await self.file_repo.clear_render_spec(file.id)
+        file.render_spec = None
+        return data
+
     async def get_user_files(self, user_id: uuid.UUID, show_all: bool):
         files = await self.file_repo.get_files_by_user(user_id, (not show_all))
         return files
@@ -90,12 +91,6 @@ class FileService:
                            file_id: uuid.UUID,
                            bucket_name: str):
         deleted = await self.file_repo.delete(file_id)
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self.minio_client.remove_object,
-            bucket_name,
-            str(file_id),
-        )
+        await self.storage.delete(bucket_name, str(file_id))
         return deleted
 
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from src.application.exceptions.user import FailedToAuthorize
 from src.domain.exceptions import UserNotFound
 from src.domain.entities import User
@@ -22,7 +24,7 @@ class UserService:
             payload = JWTDecoder.decode(token)
             if not payload.get('sub'):
                 raise InvalidToken('Invalid token payload')
-            user = await self.__repository.get(payload['sub'])
+            user = await self.__repository.get(UUID(payload['sub']))
             return user
-        except InvalidToken as e:
+        except (InvalidToken, ValueError) as e:
             raise FailedToAuthorize(e)
@@ -1,5 +1,6 @@
 from uuid import UUID
 
+from src.application.exceptions.base import NPIToolsException
 from src.application.exceptions.cards import NotACardOwner, SharingError, FailedToDeleteCard
 from src.application.exceptions.files import FileNotFound
 from src.application.exceptions.groups import NotAGroupOwner
@@ -202,6 +203,8 @@ class CalculateCardUseCase:
                 raise FileNotFound('There is no file provided to calculate this card.')
             if card_ex.user_id != user_id:
                 raise NotACardOwner('You do not have permission to access this card.')
+            if card_ex.is_being_calculated():
+                raise NPIToolsException('The card is already being calculated.')
             result = await self._card_service.start_calculation(card_ex)
             return result
         except Exception as e:
@@ -209,6 +212,16 @@ class CalculateCardUseCase:
             raise e
 
 
+class CalculateCardsUseCase:
+    def __init__(self,
+                 card_service: CardService):
+        self._card_service = card_service
+
+    async def execute(self, card_ids: list[UUID], user_id: UUID) -> list[Card]:
+        # чужие карточки, карточки без файла и уже стоящие в очереди пропускаются
+        return await self._card_service.start_calculation_many(user_id, card_ids=card_ids)
+
+
 class CreateShareURlUseCase:
     def __init__(self,
                  card_service: CardService):
@@ -2,8 +2,9 @@ from uuid import UUID
 
 from src.application.exceptions.base import NPIToolsException
 from src.application.exceptions.groups import NotAGroupOwner
+from src.application.services.card_service import CardService
 from src.application.services.group_service import GroupService
-from src.domain.entities import Group
+from src.domain.entities import Group, Card
 from src.domain.exceptions import GroupNotFound
 
 
@@ -81,3 +82,17 @@ class MoveGroupUseCase:
                 res = await self.group_service.update(group)
             await self.group_service.update(group)
         return res
+
+
+class CalculateGroupUseCase:
+    def __init__(self,
+                 group_service: GroupService,
+                 card_service: CardService):
+        self.group_service = group_service
+        self.card_service = card_service
+
+    async def execute(self, group_id: UUID, user_id: UUID) -> list[Card]:
+        group_ex = await self.group_service.get_by_id(group_id)
+        if group_ex.user_id != user_id:
+            raise NotAGroupOwner('You are not allowed to calculate this group')
+        return await self.card_service.start_calculation_many(user_id, group_id=group_id)
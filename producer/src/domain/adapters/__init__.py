@@ -1 +1,2 @@
-from src.domain.adapters.auth import AuthAdapter
\ No newline at end of file
+from src.domain.adapters.auth import AuthAdapter
+from src.domain.adapters.object_storage import ObjectStorage
\ No newline at end of file
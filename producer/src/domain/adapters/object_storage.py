@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+
+
+class ObjectStorage(ABC):
+    @abstractmethod
+    async def ensure_bucket(self, bucket_name: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def put(self,
+                  bucket_name: str,
+                  object_name: str,
+                  data: bytes,
+                  content_type: str = 'application/octet-stream') -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, bucket_name: str, object_name: str) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, bucket_name: str, object_name: str) -> None:
+        raise NotImplementedError
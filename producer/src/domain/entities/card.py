@@ -8,6 +8,7 @@ from uuid import UUID
 class CardStatus(str, Enum):
     CREATED = "created"
     PENDING = "pending"
+    PROCESSING = "processing"
     FAILED = "failed"
     COMPLETE = "complete"
 
@@ -16,13 +17,15 @@ class CardType(str, Enum):
     PSEUDOSOIL = 'pseudosoil'
     SIMPLEGDIS = 'simplegdis'
     GRP = 'grp'
+    GRP_SWEEP = 'grp_sweep'
     PVT = 'pvt'
 
 CARD_TYPE_TRANSLATIONS = {
     CardType.PSEUDOSOIL: 'Псевдогрунт',
     CardType.PVT: 'PVT-расчет',
     CardType.SIMPLEGDIS: 'Простые ГДИС',
-    CardType.GRP: 'Расчет оптимальных параметров ГРП'
+    CardType.GRP: 'Расчет оптимальных параметров ГРП',
+    CardType.GRP_SWEEP: 'Анализ чувствительности ГРП',
 }
 
 
@@ -42,6 +45,8 @@ class Card:
     result: Optional[dict] = None
     user: Optional['User'] = None
     author: Optional['User'] = None
+    # до какого момента карточку считает воркер consumer; захват продлевается, пока расчет идет
+    lease_until: Optional[datetime] = None
 
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -49,6 +54,12 @@ class Card:
     def __post_init__(self):
         self.card_type_translation = CARD_TYPE_TRANSLATIONS.get(self.card_type)
 
+    def is_being_calculated(self) -> bool:
+        # PROCESSING с истекшим захватом: воркер упал или не смог отпустить карточку, расчет можно запустить снова
+        return (self.status == CardStatus.PROCESSING
+                and self.lease_until is not None
+                and self.lease_until >= datetime.now())
+
     def dump(self, exclude: Optional[set] = None) -> dict:
         data = asdict(self)
         if exclude:
@@ -18,6 +18,7 @@ class File:
     template_for: Optional[CardType] = None
 
     file_hash: Optional[str] = None
+    render_spec: Optional[dict] = None
 
     def dump(self):
         return asdict(self)
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
 
-from src.domain.entities.card import Card, SharingURL, CardCopy
+from src.domain.entities.card import Card, SharingURL, CardCopy, CardStatus
 
 
 class CardRepository(ABC):
@@ -30,6 +30,17 @@ class CardRepository(ABC):
     async def delete(self, card_id: UUID):
         raise NotImplementedError
 
+    @abstractmethod
+    async def mark_pending(self,
+                           user_id: UUID,
+                           card_ids: list[UUID] = None,
+                           group_id: UUID = None) -> list[tuple[Card, CardStatus]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def restore_statuses(self, statuses: dict[UUID, CardStatus]):
+        raise NotImplementedError
+
 
     @abstractmethod
     async def create_sharing_url(self, sharing_url: SharingURL) -> SharingURL:
@@ -28,4 +28,8 @@ class FileRepository(ABC):
 
     @abstractmethod
     async def get_by_hash_and_user_id(self, file_hash: str, user_id: UUID) -> File:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear_render_spec(self, file_id: UUID) -> None:
         raise NotImplementedError
\ No newline at end of file
@@ -1 +1,2 @@
-from src.infrastructure.adapters.npi_auth import NPIAuthAdapter
\ No newline at end of file
+from src.infrastructure.adapters.npi_auth import NPIAuthAdapter
+from src.infrastructure.adapters.s3_storage import S3ObjectStorage
\ No newline at end of file
@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from src.domain.adapters import ObjectStorage
+
+# S3 не принимает части multipart-загрузки меньше 5 МБ, кроме последней
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3ObjectStorage(ObjectStorage):
+    """
+    Асинхронный клиент S3-совместимого хранилища (MinIO) на aiobotocore.
+
+    Большие объекты загружаются и скачиваются частями, части передаются параллельно.
+
+    :param max_pool_connections: Размер пула HTTP-соединений клиента.
+    :param multipart_threshold: Размер объекта, начиная с которого он передается частями.
+    :param part_size: Размер одной части.
+    :param max_concurrency: Сколько частей одного объекта передается одновременно.
+    """
+
+    def __init__(self,
+                 endpoint_url: str,
+                 access_key: str,
+                 secret_key: str,
+                 region: str = 'us-east-1',
+                 max_pool_connections: int = 50,
+                 connect_timeout: float = 5,
+                 read_timeout: float = 60,
+                 retries: int = 3,
+                 multipart_threshold: int = 8 * 1024 * 1024,
+                 part_size: int = 8 * 1024 * 1024,
+                 max_concurrency: int = 4):
+        self._endpoint_url = endpoint_url
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self._config = AioConfig(max_pool_connections=max_pool_connections,
+                                 connect_timeout=connect_timeout,
+                                 read_timeout=read_timeout,
+                                 retries={'max_attempts': retries, 'mode': 'standard'},
+                                 s3={'addressing_style': 'path'})
+        self._multipart_threshold = multipart_threshold
+        self._part_size = max(part_size, MIN_PART_SIZE)
+        self._max_concurrency = max_concurrency
+        self._exit_stack = None
+        self._client = None
+
+    async def connect(self):
+        if self._client is not None:
+            return
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(
+            get_session().create_client('s3',
+                                        endpoint_url=self._endpoint_url,
+                                        aws_access_key_id=self._access_key,
+                                        aws_secret_access_key=self._secret_key,
+                                        region_name=self._region,
+                                        config=self._config)
+        )
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def ensure_bucket(self, bucket_name: str) -> None:
+        try:
+            await self._client.head_bucket(Bucket=bucket_name)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchBucket'):
+                raise
+            await self._client.create_bucket(Bucket=bucket_name)
+
+    async def put(self,
+                  bucket_name: str,
+                  object_name: str,
+                  data: bytes,
+                  content_type: str = 'application/octet-stream') -> None:
+        if len(data) < self._multipart_threshold:
+            await self._client.put_object(Bucket=bucket_name, Key=object_name, Body=data, ContentType=content_type)
+            return
+        await self.__put_multipart(bucket_name, object_name, data, content_type)
+
+    async def get(self, bucket_name: str, object_name: str) -> bytes:
+        # первая часть запрашивается сразу, из Content-Range берется полный размер объекта
+        try:
+            response = await self._client.get_object(Bucket=bucket_name,
+                                                     Key=object_name,
+                                                     Range=f'bytes=0-{self._part_size - 1}')
+        except ClientError as e:
+            # у пустого объекта нет ни одного байта, который можно запросить по диапазону
+            if e.response['Error']['Code'] == 'InvalidRange':
+                return b''
+            raise
+        async with response['Body'] as stream:
+            first = await stream.read()
+        content_range = response.get('ContentRange')
+        if not content_range:
+            return first
+        size = int(content_range.rsplit('/', 1)[1])
+        if size <= len(first):
+            return first
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_part(start: int) -> bytes:
+            end = min(start + self._part_size, size) - 1
+            async with semaphore:
+                part = await self._client.get_object(Bucket=bucket_name, Key=object_name, Range=f'bytes={start}-{end}')
+                async with part['Body'] as part_stream:
+                    return await part_stream.read()
+
+        parts = await asyncio.gather(*(get_part(start) for start in range(len(first), size, self._part_size)))
+        return b''.join([first, *parts])
+
+    async def delete(self, bucket_name: str, object_name: str) -> None:
+        await self._client.delete_object(Bucket=bucket_name, Key=object_name)
+
+    async def __put_multipart(self, bucket_name: str, object_name: str, data: bytes, content_type: str):
+        upload = await self._client.create_multipart_upload(Bucket=bucket_name,
+                                                            Key=object_name,
+                                                            ContentType=content_type)
+        upload_id = upload['UploadId']
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        view = memoryview(data)
+
+        async def upload_part(number: int, start: int) -> dict:
+            async with semaphore:
+                part = await self._client.upload_part(Bucket=bucket_name,
+                                                      Key=object_name,
+                                                      UploadId=upload_id,
+                                                      PartNumber=number,
+                                                      Body=bytes(view[start:start + self._part_size]))
+            return {'PartNumber': number, 'ETag': part['ETag']}
+
+        try:
+            parts = await asyncio.gather(*(
+                upload_part(number, start)
+                for number, start in enumerate(range(0, len(data), self._part_size), start=1)
+            ))
+            await self._client.complete_multipart_upload(Bucket=bucket_name,
+                                                         Key=object_name,
+                                                         UploadId=upload_id,
+                                                         MultipartUpload={'Parts': parts})
+        except BaseException:
+            await self._client.abort_multipart_upload(Bucket=bucket_name, Key=object_name, UploadId=upload_id)
+            raise
@@ -0,0 +1 @@
+from src.infrastructure.charts.renderer import render_chart
\ No newline at end of file
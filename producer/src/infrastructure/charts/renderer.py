@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.infrastructure.config import settings
+
+
+def render_chart(spec: dict, fmt: str = 'png', dpi: int = settings.PLOT_DPI) -> bytes:
+    """
+    Рендерит график по описанию, сохраненному consumer'ом в files.render_spec.
+    Используется объектный API matplotlib без pyplot, поэтому функцию можно вызывать из пула потоков.
+
+    :param spec: Описание графика (kind, title, xlabel, ylabel, lines, hlines, figsize,
+        yticks, yticklabels).
+    :param fmt: Формат изображения (png, svg).
+    :param dpi: Разрешение изображения.
+    :return: Байты изображения.
+    """
+    # подписи делений оси Y длинные, без tight layout они обрезаются краем фигуры
+    figure = Figure(figsize=spec.get('figsize', (10, 5)), layout='tight' if spec.get('yticklabels') else None)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    for line in spec.get('lines', []):
+        kwargs = {'label': line.get('label'), 'linestyle': line.get('linestyle', '-')}
+        if line.get('color'):
+            kwargs['color'] = line['color']
+        if line.get('marker'):
+            kwargs['marker'] = line['marker']
+        axes.plot(line['x'], line['y'], **kwargs)
+
+    for hline in spec.get('hlines', []):
+        kwargs = {'label': hline.get('label'), 'linestyle': hline.get('linestyle', '-')}
+        if hline.get('color'):
+            kwargs['color'] = hline['color']
+        axes.axhline(y=hline['y'], **kwargs)
+
+    axes.set_title(spec.get('title', ''))
+    axes.set_xlabel(spec.get('xlabel', ''))
+    axes.set_ylabel(spec.get('ylabel', ''))
+    if spec.get('yticks') is not None:
+        axes.set_yticks(spec['yticks'], labels=spec.get('yticklabels'))
+    axes.grid()
+    if any(artist.get_label() and not artist.get_label().startswith('_') for artist in axes.get_lines()):
+        axes.legend()
+
+    output = BytesIO()
+    figure.savefig(output, format=fmt, dpi=dpi)
+    return output.getvalue()
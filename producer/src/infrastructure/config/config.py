@@ -13,16 +13,45 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_TYPE: str
     DB_DRIVER: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_POOL_WARMUP: bool = True
 
     # MinIO
     MINIO_ENDPOINT: str
     MINIO_ACCESS_KEY: str
     MINIO_SECRET_KEY: str
     MINIO_BUCKET_NAME: str
+    MINIO_SECURE: bool = False
+    MINIO_REGION: str = 'us-east-1'
+    MINIO_POOL_SIZE: int = 50
+    MINIO_CONNECT_TIMEOUT: float = 5
+    MINIO_READ_TIMEOUT: float = 60
+    MINIO_RETRIES: int = 3
+    # объекты больше порога передаются частями по MINIO_PART_SIZE, до MINIO_TRANSFER_CONCURRENCY частей одновременно
+    MINIO_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    MINIO_PART_SIZE: int = 8 * 1024 * 1024
+    MINIO_TRANSFER_CONCURRENCY: int = 4
 
     # RabbitMQ
     RABBITMQ_URL: str
     RABBITMQ_QUEUE: str
+    RABBITMQ_EXCHANGE: str = 'cards'
+    # типы карточек, для которых у consumer есть обработчик и своя очередь {RABBITMQ_QUEUE}.{card_type};
+    # остальные публикуются в общую очередь RABBITMQ_QUEUE, и consumer отмечает их FAILED
+    RABBITMQ_CARD_TYPES: list[str] = ['pseudosoil', 'simplegdis', 'grp', 'grp_sweep']
+    RABBITMQ_PUBLISH_WINDOW: int = 100
+    RABBITMQ_PUBLISH_RETRIES: int = 3
+    RABBITMQ_PUBLISH_TIMEOUT: float = 10
+    RABBITMQ_EVENTS_EXCHANGE: str = 'card_events'
+    SSE_KEEPALIVE: float = 15
+
+    # Graphs
+    PLOT_DPI: int = 200
 
     # Auth
     AUTH_SERVER_URL: str
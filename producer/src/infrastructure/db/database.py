@@ -1,8 +1,17 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from src.infrastructure.config import settings
+from src.infrastructure.db.pool import InstrumentedQueuePool
 
-engine = create_async_engine(settings.DB_URL, echo=False)
+engine = create_async_engine(settings.DB_URL,
+                             echo=False,
+                             poolclass=InstrumentedQueuePool,
+                             pool_size=settings.DB_POOL_SIZE,
+                             max_overflow=settings.DB_MAX_OVERFLOW,
+                             pool_timeout=settings.DB_POOL_TIMEOUT,
+                             pool_pre_ping=settings.DB_POOL_PRE_PING,
+                             pool_recycle=settings.DB_POOL_RECYCLE,
+                             connect_args={'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE})
 AsyncSessionFactory = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -0,0 +1,32 @@
+"""card_processing_lease
+
+Revision ID: 8c41e5d07a2f
+Revises: 3b7d2f9a41c6
+Create Date: 2026-10-19 16:05:47.218304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41e5d07a2f"
+down_revision: Union[str, None] = "3b7d2f9a41c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # новое значение enum нельзя использовать в той же транзакции, в которой оно добавлено
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE cardstatus ADD VALUE IF NOT EXISTS 'PROCESSING' AFTER 'PENDING'")
+    op.add_column("cards", sa.Column("lease_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cards", "lease_until")
+    # значение из enum в PostgreSQL удалить нельзя, поэтому карточки в обработке возвращаются в очередь
+    op.execute("UPDATE cards SET status = 'PENDING' WHERE status = 'PROCESSING'")
@@ -23,6 +23,8 @@ class CardModel(Base):
     author_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
     result = Column(JSON, default=None)
     order = Column(Integer, nullable=False, server_default='0')
+    # до какого момента карточку держит воркер consumer, пока она в статусе PROCESSING
+    lease_until = Column(DateTime, nullable=True)
 
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, UUID, String, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, UUID, String, DateTime, Boolean, ForeignKey, Enum, JSON
 from sqlalchemy.orm import relationship, foreign
 
 from src.domain.entities.card import CardType
@@ -20,6 +20,7 @@ class FileModel(Base):
     uploaded_at = Column(DateTime, nullable=False, default=datetime.now)
     file_hash = Column(String(64), index=True)
     template_for = Column(String, default=None)
+    render_spec = Column(JSON, default=None)
 
     user = relationship('UserModel', back_populates='files')
     cards = relationship('CardModel', back_populates='file')
\ No newline at end of file
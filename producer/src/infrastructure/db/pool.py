@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.infrastructure.metrics.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS, DB_POOL_CHECKED_OUT
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет время выдачи соединения и считает выданные соединения.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        event.listen(self, 'checkout', self.__on_checkout)
+        event.listen(self, 'checkin', self.__on_checkin)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def __on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @staticmethod
+    def __on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int):
+    """
+    Заранее открывает соединения пула, чтобы первые запросы не ждали подключения к БД.
+    """
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
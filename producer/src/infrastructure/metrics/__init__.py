@@ -0,0 +1 @@
+from src.infrastructure.metrics.metrics import generate_metrics
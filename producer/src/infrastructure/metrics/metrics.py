@@ -0,0 +1,29 @@
+import os
+
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess
+
+# При запуске нескольких воркеров метрики каждого процесса пишутся в PROMETHEUS_MULTIPROC_DIR
+# и собираются вместе при запросе /metrics
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds',
+    'Время получения соединения из пула, включая ожидание свободного соединения',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    'db_pool_timeouts',
+    'Соединение не удалось получить за DB_POOL_TIMEOUT',
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Соединения, выданные из пула',
+    multiprocess_mode='livesum',
+)
+
+
+def generate_metrics() -> bytes:
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
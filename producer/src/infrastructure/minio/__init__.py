@@ -1 +1 @@
-from src.infrastructure.minio.client import init_minio, BUCKET_NAME, client
\ No newline at end of file
+from src.infrastructure.minio.client import init_minio, close_minio, BUCKET_NAME, storage
\ No newline at end of file
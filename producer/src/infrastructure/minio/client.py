@@ -1,26 +1,27 @@
-import asyncio
-from minio import Minio
-from minio.error import S3Error
+from src.infrastructure.adapters import S3ObjectStorage
 from src.infrastructure.config import settings
 
-client = Minio(
-    settings.MINIO_ENDPOINT,
+storage = S3ObjectStorage(
+    endpoint_url=f'{"https" if settings.MINIO_SECURE else "http"}://{settings.MINIO_ENDPOINT}',
     access_key=settings.MINIO_ACCESS_KEY,
     secret_key=settings.MINIO_SECRET_KEY,
-    secure=False
+    region=settings.MINIO_REGION,
+    max_pool_connections=settings.MINIO_POOL_SIZE,
+    connect_timeout=settings.MINIO_CONNECT_TIMEOUT,
+    read_timeout=settings.MINIO_READ_TIMEOUT,
+    retries=settings.MINIO_RETRIES,
+    multipart_threshold=settings.MINIO_MULTIPART_THRESHOLD,
+    part_size=settings.MINIO_PART_SIZE,
+    max_concurrency=settings.MINIO_TRANSFER_CONCURRENCY,
 )
 
 BUCKET_NAME = settings.MINIO_BUCKET_NAME
 
-async def ensure_bucket_exists():
-    loop = asyncio.get_event_loop()
-    exists = await loop.run_in_executor(None, client.bucket_exists, BUCKET_NAME)
-    if not exists:
-        await loop.run_in_executor(None, client.make_bucket, settings.MINIO_BUCKET_NAME)
-    else:
-        print(f"Bucket '{BUCKET_NAME}' уже существует.")
 
 async def init_minio():
-    await ensure_bucket_exists()
+    await storage.connect()
+    await storage.ensure_bucket(BUCKET_NAME)
 
 
+async def close_minio():
+    await storage.close()
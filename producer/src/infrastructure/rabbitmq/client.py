@@ -1,51 +1,121 @@
+import asyncio
 import json
+from uuid import uuid4
 
 import aio_pika
-from aio_pika import Message, DeliveryMode
+from aio_pika import Message, DeliveryMode, ExchangeType
+from aio_pika.exceptions import AMQPError, ChannelInvalidStateError
 
 from src.domain.entities import Card
+from src.domain.entities.card import CardType
 from src.infrastructure.config import settings
+from src.infrastructure.rabbitmq.exceptions import FailedToPublish
+
+
+def card_routing_key(card_type: str) -> str:
+    return f'card.{card_type}'
+
 
 class RabbitMQClient:
     def __init__(self,
                  url,
-                 queue):
+                 queue,
+                 exchange,
+                 card_types: list[str],
+                 publish_window: int = 100,
+                 publish_retries: int = 3,
+                 publish_timeout: float = 10):
         self.url = url
         self.queue = queue
+        self.exchange_name = exchange
+        self.card_types = set(card_types)
+        self.publish_retries = publish_retries
+        self.publish_timeout = publish_timeout
         self.connection = None
         self.channel = None
+        self.exchange = None
+        # сколько опубликованных сообщений может одновременно ждать подтверждения брокера
+        self._window = asyncio.Semaphore(publish_window)
 
     async def connect(self):
         try:
             self.connection = await aio_pika.connect_robust(self.url)
-            self.channel = await self.connection.channel()
+            self.channel = await self.connection.channel(publisher_confirms=True)
             await self.channel.set_qos(prefetch_count=10)
-            queue_object = await self.channel.declare_queue(self.queue, durable=True)
+            self.exchange = await self.channel.declare_exchange(self.exchange_name,
+                                                                ExchangeType.TOPIC,
+                                                                durable=True)
+            # очереди объявляются и здесь, чтобы карточки не терялись, пока consumer не запущен
+            await self.channel.declare_queue(self.queue, durable=True)
+            for card_type in self.card_types:
+                queue_object = await self.channel.declare_queue(f'{self.queue}.{card_type}', durable=True)
+                await queue_object.bind(self.exchange, routing_key=card_routing_key(card_type))
         except Exception as e:
             raise e
 
     async def publish_card(self, card: Card):
-        try:
-            data = {
-                'id': str(card.id),
-                'file_id': str(card.file_id),
-                'card_type': card.card_type,
-            }
-            message = Message(
-                json.dumps(data).encode(),
-                delivery_mode=DeliveryMode.PERSISTENT
-            )
-            await self.channel.default_exchange.publish(
-                message,
-                routing_key=self.queue
-            )
-            print(f"Published task {card.id}")
-        except Exception as e:
-            print(f"Error publishing task {card.id}: {e}")
+        """
+        Публикует задачу на расчет и дожидается подтверждения брокера.
+        Если брокер не подтвердил сообщение после всех повторов, выбрасывает FailedToPublish.
+        """
+        data = {
+            'id': str(card.id),
+            'file_id': str(card.file_id),
+            'card_type': card.card_type,
+        }
+        card_type = CardType(card.card_type).value
+        # очередь типа без обработчика consumer не читает, и карточка осталась бы PENDING навсегда:
+        # такие карточки идут в общую очередь, consumer отметит их FAILED
+        typed = card_type in self.card_types
+        # один message_id на все попытки: consumer отбросит копию, если брокер все же принял сообщение
+        message_id = str(uuid4())
+        error = None
+        for attempt in range(self.publish_retries + 1):
+            if attempt:
+                await asyncio.sleep(0.1 * 2 ** attempt)
+            try:
+                async with self._window:
+                    if self.exchange is None:
+                        raise FailedToPublish('RabbitMQ client is not connected')
+                    message = Message(
+                        json.dumps(data).encode(),
+                        message_id=message_id,
+                        delivery_mode=DeliveryMode.PERSISTENT
+                    )
+                    exchange = self.exchange if typed else self.channel.default_exchange
+                    await exchange.publish(
+                        message,
+                        routing_key=card_routing_key(card_type) if typed else self.queue,
+                        timeout=self.publish_timeout
+                    )
+                return
+            except (AMQPError, ChannelInvalidStateError, ConnectionError, asyncio.TimeoutError) as e:
+                error = e
+        raise FailedToPublish(f'Failed to publish task {card.id}: {error}')
+
+    async def publish_many(self, cards: list[Card]) -> list[Card]:
+        """
+        Публикует задачи пачкой: сообщения отправляются без ожидания подтверждения предыдущих,
+        в пределах окна publish_window. Возвращает карточки, которые опубликовать не удалось.
+        """
+        results = await asyncio.gather(*(self.publish_card(card) for card in cards),
+                                       return_exceptions=True)
+        failed = []
+        for card, result in zip(cards, results):
+            if isinstance(result, FailedToPublish):
+                failed.append(card)
+            elif isinstance(result, BaseException):
+                raise result
+        return failed
 
     async def close(self):
         await self.connection.close()
 
 
 rabbitmq_client = RabbitMQClient(settings.RABBITMQ_URL,
-                                 settings.RABBITMQ_QUEUE)
+                                 settings.RABBITMQ_QUEUE,
+                                 settings.RABBITMQ_EXCHANGE,
+                                 settings.RABBITMQ_CARD_TYPES,
+                                 settings.RABBITMQ_PUBLISH_WINDOW,
+                                 settings.RABBITMQ_PUBLISH_RETRIES,
+                                 settings.RABBITMQ_PUBLISH_TIMEOUT)
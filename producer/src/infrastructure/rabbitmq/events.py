@@ -0,0 +1,94 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable
+from uuid import UUID
+
+import aio_pika
+from aio_pika import ExchangeType, IncomingMessage
+
+from src.infrastructure.config import settings
+
+
+class CardEventsListener:
+    """
+    Получает события об изменении статуса карточек от consumer и раздает их подписчикам текущего процесса.
+    У каждого процесса своя эксклюзивная очередь, привязанная к fanout exchange, поэтому события
+    доходят до всех воркеров uvicorn.
+    """
+
+    def __init__(self,
+                 url: str,
+                 exchange: str,
+                 subscriber_queue_size: int = 100):
+        self.url = url
+        self.exchange_name = exchange
+        self.subscriber_queue_size = subscriber_queue_size
+        self.connection = None
+        self.channel = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def connect(self):
+        self.connection = await aio_pika.connect_robust(self.url)
+        self.channel = await self.connection.channel()
+        exchange = await self.channel.declare_exchange(self.exchange_name,
+                                                       ExchangeType.FANOUT,
+                                                       durable=True)
+        queue = await self.channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+        await queue.consume(self.on_message, no_ack=True)
+
+    async def on_message(self, message: IncomingMessage):
+        try:
+            event = json.loads(message.body)
+        except ValueError:
+            return
+        for subscriber in self._subscribers.get(event.get('user_id'), ()):
+            if subscriber.full():
+                # медленный клиент: старое событие выбрасываем, актуальный статус важнее
+                subscriber.get_nowait()
+            subscriber.put_nowait(event)
+
+    def subscribe(self, user_id: UUID) -> asyncio.Queue:
+        subscriber = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self._subscribers[str(user_id)].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id: UUID, subscriber: asyncio.Queue):
+        subscribers = self._subscribers.get(str(user_id))
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[str(user_id)]
+
+    async def stream(self,
+                     user_id: UUID,
+                     is_disconnected: Callable[[], Awaitable[bool]],
+                     keepalive: float = 15) -> AsyncIterator[str]:
+        """
+        Поток событий пользователя в формате Server-Sent Events.
+        """
+        subscriber = self.subscribe(user_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    # комментарий, чтобы прокси не закрывали соединение по таймауту
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: card_status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(user_id, subscriber)
+
+    async def close(self):
+        if self.connection:
+            await self.connection.close()
+
+
+card_events = CardEventsListener(settings.RABBITMQ_URL,
+                                 settings.RABBITMQ_EVENTS_EXCHANGE)
@@ -0,0 +1,2 @@
+class FailedToPublish(Exception):
+    ...
\ No newline at end of file
@@ -1,12 +1,13 @@
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update, or_, and_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 from typing_extensions import override
 
 from src.domain.entities import Card, User
-from src.domain.entities.card import Card, SharingURL, CardCopy
+from src.domain.entities.card import Card, SharingURL, CardCopy, CardStatus
 from src.domain.exceptions.cards import CardNotFound, SharingUrlNotFound, CardCopyNotFound
 from src.domain.repositories.card_repository import CardRepository
 from src.infrastructure.db.models import CardModel, UserModel
@@ -19,15 +20,21 @@ class SqlaCardRepository(CardRepository):
 
     @override
     async def create(self, card: Card) -> Card:
-        card_db = CardModel(**card.dump(exclude={'user', 'author'}))
+        # у новой карточки (и у копии чужой) захвата нет
+        card_db = CardModel(**card.dump(exclude={'user', 'author', 'lease_until'}))
         try:
             self._session.add(card_db)
-            await self._session.commit()
-            await self._session.refresh(card_db)
-            return self.__to_entity(card_db)
+            await self._session.flush()
         except SQLAlchemyError as e:
             await self._session.rollback()
             raise e
+        card = self.__to_entity(card_db, with_users=False)
+        # обычно автор и владелец совпадают, тогда второй get берет пользователя из identity map без запроса
+        user_db = await self._session.get(UserModel, card_db.user_id)
+        author_db = await self._session.get(UserModel, card_db.author_id) if card_db.author_id else None
+        card.user = self.__to_user_entity(user_db)
+        card.author = self.__to_user_entity(author_db)
+        return card
 
     @override
     async def get(self, card_id: UUID) -> Card:
@@ -56,46 +63,102 @@ class SqlaCardRepository(CardRepository):
 
     @override
     async def update(self, card: Card) -> Card:
+        # updated_at не передается, чтобы сработал onupdate; захватом карточки управляет consumer
+        allowed_fields = ({column.name for column in CardModel.__table__.columns}
+                          - {'id', 'created_at', 'updated_at', 'lease_until'})
+        values = {field: value for field, value in card.dump().items() if field in allowed_fields}
+        stmt = (update(CardModel)
+                .where(CardModel.id == card.id)
+                .values(**values)
+                .returning(CardModel)
+                .execution_options(synchronize_session=False))
         try:
-            card_db = await self._session.get(CardModel, card.id)
-            if not card_db:
-                raise CardNotFound(f'No such card with id {card.id}')
-
-            allowed_fields = {column.name for column in CardModel.__table__.columns}
-
-            for field, value in card.dump().items():
-                if field in allowed_fields:
-                    setattr(card_db, field, value)
-
-            await self._session.commit()
-            await self._session.refresh(card_db)
-            return self.__to_entity(card_db)
+            result = await self._session.execute(stmt)
+            card_db = result.scalars().first()
         except SQLAlchemyError as e:
             await self._session.rollback()
             raise e
+        if not card_db:
+            raise CardNotFound(f'No such card with id {card.id}')
+        # пользователи карточки при обновлении не меняются, берем их из переданной сущности
+        updated = self.__to_entity(card_db, with_users=False)
+        updated.user = card.user
+        updated.author = card.author
+        return updated
 
 
     @override
     async def delete(self, card_id: UUID):
         stmt = delete(CardModel).where(CardModel.id == card_id).returning(CardModel)
         result = await self._session.execute(stmt)
-        await self._session.commit()
         card_db = result.scalars().first()
         if not card_db:
             raise CardNotFound(f'No such card with id {card_id}')
         return True
 
+    @override
+    async def mark_pending(self,
+                           user_id: UUID,
+                           card_ids: list[UUID] = None,
+                           group_id: UUID = None) -> list[tuple[Card, CardStatus]]:
+        # карточки пользователя с файлом, которые еще не стоят в очереди и не считаются (PROCESSING
+        # с истекшим захватом - считаются заново); прежний статус нужен, чтобы вернуть его карточкам,
+        # которые не удалось опубликовать
+        eligible = (select(CardModel.id, CardModel.status)
+                    .where(CardModel.user_id == user_id,
+                           CardModel.file_id.is_not(None),
+                           or_(CardModel.status.not_in([CardStatus.PENDING, CardStatus.PROCESSING]),
+                               and_(CardModel.status == CardStatus.PROCESSING,
+                                    or_(CardModel.lease_until.is_(None),
+                                        CardModel.lease_until < datetime.now())))))
+        if card_ids is not None:
+            eligible = eligible.where(CardModel.id.in_(card_ids))
+        if group_id is not None:
+            eligible = eligible.where(CardModel.group_id == group_id)
+        previous = eligible.with_for_update().subquery()
+
+        stmt = (update(CardModel)
+                .where(CardModel.id == previous.c.id)
+                .values(status=CardStatus.PENDING, updated_at=datetime.now())
+                .returning(CardModel, previous.c.status)
+                .execution_options(synchronize_session=False))
+        try:
+            result = await self._session.execute(stmt)
+            rows = result.all()
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+        cards = [(self.__to_entity(card_db, with_users=False), status) for card_db, status in rows]
+        return sorted(cards, key=lambda item: item[0].order)
+
+    @override
+    async def restore_statuses(self, statuses: dict[UUID, CardStatus]):
+        by_status = {}
+        for card_id, status in statuses.items():
+            by_status.setdefault(status, []).append(card_id)
+        try:
+            # статусов немного, поэтому по одному UPDATE на статус
+            for status, card_ids in by_status.items():
+                stmt = (update(CardModel)
+                        .where(CardModel.id.in_(card_ids))
+                        .values(status=status)
+                        .execution_options(synchronize_session=False))
+                await self._session.execute(stmt)
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+
     @override
     async def create_sharing_url(self, sharing_url: SharingURL) -> SharingURL:
         try:
             url_db = SharingURLModel(**sharing_url.dump())
             self._session.add(url_db)
-            await self._session.commit()
-            await self._session.refresh(url_db)
-            return self.__to_sharing_url_entity(url_db)
+            await self._session.flush()
         except SQLAlchemyError as e:
             await self._session.rollback()
             raise e
+        card = sharing_url.card or await self.get(url_db.card_id)
+        return self.__to_sharing_url_entity(url_db, card)
 
     @override
     async def get_sharing_url_by_card_id(self, card_id: UUID) -> SharingURL:
@@ -122,20 +185,18 @@ class SqlaCardRepository(CardRepository):
         try:
             card_copy_db = CardCopyModel(**card_copy.dump())
             self._session.add(card_copy_db)
-            await self._session.commit()
-            await self._session.refresh(card_copy_db)
+            await self._session.flush()
             return self.__to_card_copy_entity(card_copy_db)
         except SQLAlchemyError as e:
             await self._session.rollback()
             raise e
 
-    def __to_entity(self, card_db: CardModel) -> Card | None:
+    def __to_entity(self, card_db: CardModel, with_users: bool = True) -> Card | None:
         if not card_db:
             return None
-        user_db = card_db.user
-        user = self.__to_user_entity(user_db)
-        author_db = card_db.author
-        author = self.__to_user_entity(author_db)
+        # после UPDATE ... RETURNING связи не загружены, обращение к ним вызвало бы ленивую загрузку
+        user = self.__to_user_entity(card_db.user) if with_users else None
+        author = self.__to_user_entity(card_db.author) if with_users else None
         return Card(id=card_db.id,
                     card_type=card_db.card_type,
                     name=card_db.name,
@@ -150,11 +211,13 @@ class SqlaCardRepository(CardRepository):
                     created_at=card_db.created_at,
                     updated_at=card_db.updated_at,
                     result=card_db.result,
+                    lease_until=card_db.lease_until,
                     user=user,
                     author=author)
 
-    def __to_sharing_url_entity(self, sharing_url_db: SharingURLModel) -> SharingURL:
-        card = self.__to_entity(sharing_url_db.card)
+    def __to_sharing_url_entity(self, sharing_url_db: SharingURLModel, card: Card = None) -> SharingURL:
+        if card is None:
+            card = self.__to_entity(sharing_url_db.card)
         return SharingURL(card_id=sharing_url_db.card_id,
                           base_url=sharing_url_db.base_url,
                           code=sharing_url_db.code,
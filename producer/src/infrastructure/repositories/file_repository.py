@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.application.exceptions.files import FileNotFound
@@ -24,12 +24,12 @@ class SqlaFileRepository(FileRepository):
             uploaded_by_user=file.uploaded_by_user,
             uploaded_at=file.uploaded_at,
             file_hash=file.file_hash,
-            template_for=file.template_for
+            template_for=file.template_for,
+            render_spec=file.render_spec
         )
         try:
             self._session.add(file_db)
-            await self._session.commit()
-            await self._session.refresh(file_db)
+            await self._session.flush()
             return self.__to_entity(file_db)
         except SQLAlchemyError as e:
             await self._session.rollback()
@@ -62,7 +62,6 @@ class SqlaFileRepository(FileRepository):
     async def delete(self, file_id: UUID) -> File:
         stmt = delete(FileModel).where(FileModel.id == file_id).returning(FileModel)
         result = await self._session.execute(stmt)
-        await self._session.commit()
         file_db = result.scalars().first()
         if not file_db:
             raise FileNotFound(f'No such file with this ID {file_id}')
@@ -76,6 +75,14 @@ class SqlaFileRepository(FileRepository):
             raise FileNotFound(f'No such file with this ID {file_id}')
         return self.__to_entity(file_db)
 
+    async def clear_render_spec(self, file_id: UUID) -> None:
+        try:
+            stmt = update(FileModel).where(FileModel.id == file_id).values(render_spec=None)
+            await self._session.execute(stmt)
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            raise e
+
     def __to_entity(self, file_db: FileModel) -> File:
         return File(id=file_db.id,
                     user_id=file_db.user_id,
@@ -85,4 +92,5 @@ class SqlaFileRepository(FileRepository):
                     uploaded_by_user=file_db.uploaded_by_user,
                     uploaded_at=file_db.uploaded_at,
                     file_hash=file_db.file_hash,
-                    template_for=file_db.template_for)
\ No newline at end of file
+                    template_for=file_db.template_for,
+                    render_spec=file_db.render_spec)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.domain.entities import User
@@ -20,8 +20,7 @@ class SqlaGroupRepository(GroupRepository):
         group_db = self.__from_entity(group)
         try:
             self._session.add(group_db)
-            await self._session.commit()
-            await self._session.refresh(group_db)
+            await self._session.flush()
             return self.__to_entity(group_db)
         except SQLAlchemyError as e:
             await self._session.rollback()
@@ -48,48 +47,38 @@ class SqlaGroupRepository(GroupRepository):
         return [self.__to_entity(g) for g in group_db]
 
     async def update_name(self, group_id: UUID, group: Group) -> Group:
-        try:
-            group_db = await self._session.get(GroupModel, group_id)
-            if not group_db:
-                raise GroupNotFound(f'No such card with id {group.id}')
-
-            group_db.name = group.name
-
-            await self._session.commit()
-            await self._session.refresh(group_db)
-
-            return self.__to_entity(group_db)
-        except SQLAlchemyError as e:
-            await self._session.rollback()
-            raise e
-
+        return await self.__update(group_id, group.cards, name=group.name)
 
     async def update(self, group: Group) -> Group:
+        # updated_at не передается, чтобы сработал onupdate
+        allowed_fields = {column.name for column in GroupModel.__table__.columns} - {'id', 'created_at', 'updated_at'}
+        values = {field: value for field, value in group.dump().items() if field in allowed_fields}
+        return await self.__update(group.id, group.cards, **values)
+
+    async def __update(self, group_id: UUID, cards: list[Card], **values) -> Group:
+        stmt = (update(GroupModel)
+                .where(GroupModel.id == group_id)
+                .values(**values)
+                .returning(GroupModel)
+                .execution_options(synchronize_session=False))
         try:
-            group_db = await self._session.get(GroupModel, group.id)
-            if not group_db:
-                raise GroupNotFound(f'No such group with id {group.id}')
-
-            allowed_fields = {column.name for column in GroupModel.__table__.columns}
-
-            for field, value in group.dump().items():
-                if field in allowed_fields:
-                    setattr(group_db, field, value)
-
-            await self._session.commit()
-            await self._session.refresh(group_db)
-            return self.__to_entity(group_db)
+            result = await self._session.execute(stmt)
+            group_db = result.scalars().first()
         except SQLAlchemyError as e:
             await self._session.rollback()
             raise e
+        if not group_db:
+            raise GroupNotFound(f'No such group with id {group_id}')
+        # карточки группы не меняются, берем их из переданной сущности вместо повторной загрузки
+        updated = self.__to_raw_entity(group_db)
+        updated.cards = cards
+        return updated
 
 
     async def delete(self, group_id: UUID) -> Group:
         try:
             stmt = delete(GroupModel).where(GroupModel.id == group_id).returning(GroupModel)
             result = await self._session.execute(stmt)
-
-            await self._session.commit()
             group_db = result.scalars().first()
             if not group_db:
                 raise GroupNotFound(f'No such group with id {group_id}')
@@ -101,9 +90,11 @@ class SqlaGroupRepository(GroupRepository):
 
     def __from_entity(self, group: Group) -> GroupModel:
         # cards_db = [CardModel(**c.dump()) for c in group.cards]
+        # пустой список карточек сразу считается загруженным, без запроса после вставки
         group_db = GroupModel(name=group.name,
                               order=group.order,
-                              user_id=group.user_id)
+                              user_id=group.user_id,
+                              cards=[])
         # group_db.cards.extend(cards_db)
         return group_db
 
@@ -122,6 +113,7 @@ class SqlaGroupRepository(GroupRepository):
                      user_id=group_db.user_id,
                      name=group_db.name,
                      cards=[],
+                     order=group_db.order,
                      created_at=group_db.created_at,
                      updated_at=group_db.updated_at)
 
@@ -19,8 +19,7 @@ class SqlaUserRepository(UserRepository):
         user_db = UserModel(**user.dump())
         try:
             self._session.add(user_db)
-            await self._session.commit()
-            await self._session.refresh(user_db)
+            await self._session.flush()
             return User(id=user_db.id,
                         first_name=user_db.first_name,
                         last_name=user_db.last_name,
@@ -1,9 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.middleware.cors import CORSMiddleware
 
 from src.infrastructure.config import settings
-from src.infrastructure.minio import init_minio
+from src.infrastructure.db.database import engine
+from src.infrastructure.db.pool import warm_up_pool
+from src.infrastructure.metrics import generate_metrics
+from src.infrastructure.minio import init_minio, close_minio
 from src.infrastructure.rabbitmq.client import rabbitmq_client
+from src.infrastructure.rabbitmq.events import card_events
 from src.presentation.api.v1 import files_router, users_router, cards_router, groups_router
 
 app = FastAPI(
@@ -13,13 +19,18 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup():
+    if settings.DB_POOL_WARMUP:
+        await warm_up_pool(engine, settings.DB_POOL_SIZE)
     await init_minio()
     await rabbitmq_client.connect()
+    await card_events.connect()
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    await card_events.close()
     await rabbitmq_client.close()
+    await close_minio()
 
 
 app.include_router(files_router)
@@ -28,6 +39,11 @@ app.include_router(groups_router)
 app.include_router(users_router)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
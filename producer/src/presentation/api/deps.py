@@ -1,4 +1,7 @@
-from fastapi import Depends, HTTPException
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
@@ -9,34 +12,39 @@ from src.application.services.group_service import GroupService
 
 from src.application.services.user_service import UserService
 from src.application.use_cases.cards import CreateCardUseCase, GetCardUseCase, UpdateCardUseCase, DeleteCardUseCase, \
-    GetUserCardsUseCase, MoveCardUseCase, CalculateCardUseCase, CreateShareURlUseCase, CopyBySharingCodeUseCase
+    GetUserCardsUseCase, MoveCardUseCase, CalculateCardUseCase, CreateShareURlUseCase, CopyBySharingCodeUseCase, \
+    CalculateCardsUseCase
 from src.application.use_cases.files import DeleteFileUseCase
 from src.application.use_cases.get_file import GetFileUseCase, GetPublicFilesUseCase
 from src.application.use_cases.get_user import GetUserUseCase
 from src.application.use_cases.get_user_files import GetUserFilesUseCase
 from src.application.use_cases.groups import GetGroupsUseCase, RenameGroupUseCase, DeleteGroupUseCase, \
-    CreateGroupUseCase, MoveGroupUseCase
+    CreateGroupUseCase, MoveGroupUseCase, CalculateGroupUseCase
 from src.domain.adapters import AuthAdapter
 from src.domain.entities import User
 from src.domain.exceptions import UserNotFound
 from src.domain.repositories.group_repository import GroupRepository
 from src.domain.repositories.user_repository import UserRepository
 from src.infrastructure.config import settings
+from src.infrastructure.jwt import JWTDecoder, InvalidToken
 from src.infrastructure.rabbitmq.client import rabbitmq_client
+from src.infrastructure.rabbitmq.events import card_events, CardEventsListener
 from src.infrastructure.repositories.card_repository import SqlaCardRepository
 from src.infrastructure.adapters import NPIAuthAdapter
 from src.application.services.file_service import FileService
 from src.application.use_cases.upload_file import UploadFileUseCase, UploadPublicFileUseCase
 from src.infrastructure.db.database import AsyncSessionFactory
-from src.infrastructure.minio import client as minio_client
+from src.infrastructure.minio import storage
 from src.infrastructure.repositories.file_repository import SqlaFileRepository
 from src.infrastructure.repositories.group_repository import SqlaGroupRepository
 from src.infrastructure.repositories.user_repository import SqlaUserRepository
 
 http_bearer = HTTPBearer()
+http_bearer_optional = HTTPBearer(auto_error=False)
 
 
 async def get_session() -> AsyncSession:
+    # одна транзакция на запрос: репозитории только делают flush, фиксируется все здесь одним commit
     async with AsyncSessionFactory() as session:
         try:
             yield session
@@ -65,7 +73,7 @@ async def get_group_repository(session: AsyncSession = Depends(get_session)) ->
 
 async def get_file_service(file_repo: SqlaFileRepository = Depends(get_file_repository)) -> FileService:
     return FileService(file_repo,
-                       minio_client)
+                       storage)
 
 async def get_upload_file_use_case(file_service: FileService = Depends(get_file_service)) -> UploadFileUseCase:
     return UploadFileUseCase(file_service)
@@ -140,6 +148,13 @@ async def get_update_card_use_case(card_service: CardService = Depends(get_card_
 async def get_calculate_card_use_case(card_service: CardService = Depends(get_card_service)) -> CalculateCardUseCase:
     return CalculateCardUseCase(card_service)
 
+async def get_calculate_cards_use_case(card_service: CardService = Depends(get_card_service)) -> CalculateCardsUseCase:
+    return CalculateCardsUseCase(card_service)
+
+async def get_calculate_group_use_case(group_service: GroupService = Depends(get_group_service),
+                                       card_service: CardService = Depends(get_card_service)) -> CalculateGroupUseCase:
+    return CalculateGroupUseCase(group_service, card_service)
+
 async def get_move_card_use_case(card_service: CardService = Depends(get_card_service),
                                  group_service: GroupService = Depends(get_group_service)) -> MoveCardUseCase:
     return MoveCardUseCase(card_service, group_service)
@@ -178,6 +193,28 @@ async def get_current_user(use_case: GetUserUseCase = Depends(get_user_use_case)
     except UserNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
+async def get_token_user_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer_optional),
+                            access_token: Optional[str] = Query(None,
+                                                                description='Токен для клиентов, которые не могут '
+                                                                            'передать заголовок (EventSource)')) -> UUID:
+    # только проверка подписи токена, без запроса к БД: подходит для долгих соединений
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise credentials_exception
+    try:
+        payload = JWTDecoder.decode(token)
+        return UUID(payload['sub'])
+    except (InvalidToken, KeyError, ValueError):
+        raise credentials_exception
+
+async def get_card_events() -> CardEventsListener:
+    return card_events
+
 async def get_current_admin(user: User = Depends(get_current_user)):
     if not user.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from starlette import status
 
 from src.application.exceptions.base import NPIToolsException
-from src.application.exceptions.cards import NotACardOwner, SharingError, FailedToDeleteCard
+from src.application.exceptions.cards import NotACardOwner, SharingError, FailedToDeleteCard, FailedToStartCalculation
 from src.application.exceptions.files import NotAFileOwner, FileNotFound
 from src.application.exceptions.groups import NotAGroupOwner
 from src.application.use_cases.cards import CreateCardUseCase, GetUserCardsUseCase, GetCardUseCase, DeleteCardUseCase, \
-    UpdateCardUseCase, MoveCardUseCase, CalculateCardUseCase, CreateShareURlUseCase, CopyBySharingCodeUseCase
+    UpdateCardUseCase, MoveCardUseCase, CalculateCardUseCase, CreateShareURlUseCase, CopyBySharingCodeUseCase, \
+    CalculateCardsUseCase
 from src.domain.entities import User, Card
 from src.domain.entities.card import CardType, CARD_TYPE_TRANSLATIONS
 from src.domain.exceptions import GroupNotFound
 from src.domain.exceptions.cards import CardNotFound, SharingUrlNotFound
+from src.infrastructure.config import settings
+from src.infrastructure.rabbitmq.events import CardEventsListener
 from src.presentation.api.deps import get_current_user, get_create_card_use_case, get_card_use_case, \
     get_delete_card_use_case, get_user_cards_use_case, get_update_card_use_case, get_move_card_use_case, \
-    get_calculate_card_use_case, get_create_sharing_url_use_case, get_copy_by_sharing_code_use_case
+    get_calculate_card_use_case, get_create_sharing_url_use_case, get_copy_by_sharing_code_use_case, \
+    get_calculate_cards_use_case, get_token_user_id, get_card_events
 from src.presentation.schemas.card import CreateCardSchema, CardSchema, \
-    UpdateCardSchema, CreateShareUrlSchema, MoveCardSchema, ShareUrlSchema
+    UpdateCardSchema, CreateShareUrlSchema, MoveCardSchema, ShareUrlSchema, CalculateCardsSchema
 
 router = APIRouter(prefix="/cards", tags=["cards"])
 
@@ -50,6 +57,20 @@ async def get_types():
     ]
 
 
+@router.get('/events',
+            description='Поток изменений статусов карточек пользователя (Server-Sent Events). '
+                        'Токен можно передать заголовком Authorization или параметром access_token')
+async def card_events_stream(request: Request,
+                             user_id: UUID = Depends(get_token_user_id),
+                             events: CardEventsListener = Depends(get_card_events)):
+    return StreamingResponse(events.stream(user_id, request.is_disconnected, settings.SSE_KEEPALIVE),
+                             media_type='text/event-stream',
+                             headers={
+                                 'Cache-Control': 'no-cache',
+                                 'X-Accel-Buffering': 'no',
+                             })
+
+
 @router.get('',
             response_model=list[CardSchema],
             description='Список карточек пользователя')
@@ -74,6 +95,23 @@ async def calculate_card(card_id: UUID4,
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except (CardNotFound, FileNotFound) as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FailedToStartCalculation as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except NPIToolsException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post('/calculate',
+             response_model=list[CardSchema],
+             description='Создать задачи на расчет нескольких карточек. '
+                         'Возвращает карточки, поставленные в очередь')
+async def calculate_cards(schema: CalculateCardsSchema,
+                          user: User = Depends(get_current_user),
+                          use_case: CalculateCardsUseCase = Depends(get_calculate_cards_use_case)):
+    try:
+        result = await use_case.execute(schema.card_ids, user.id)
+        return [CardSchema(**card.dump()) for card in result]
+    except FailedToStartCalculation as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except NPIToolsException as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
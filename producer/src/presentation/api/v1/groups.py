@@ -5,13 +5,15 @@ from pydantic import UUID4
 from starlette import status
 
 from src.application.exceptions.base import NPIToolsException
+from src.application.exceptions.cards import FailedToStartCalculation
 from src.application.exceptions.groups import NotAGroupOwner
 from src.application.use_cases.groups import GetGroupsUseCase, RenameGroupUseCase, DeleteGroupUseCase, \
-    CreateGroupUseCase, MoveGroupUseCase
+    CreateGroupUseCase, MoveGroupUseCase, CalculateGroupUseCase
 from src.domain.entities import User
 from src.domain.exceptions import GroupNotFound
 from src.presentation.api.deps import get_current_user, get_groups_use_case, get_rename_group_use_case, \
-    get_delete_group_use_case, get_create_group_use_case, get_move_group_use_case
+    get_delete_group_use_case, get_create_group_use_case, get_move_group_use_case, get_calculate_group_use_case
+from src.presentation.schemas.card import CardSchema
 from src.presentation.schemas.group import GroupSchema, RenameGroupSchema, CreateGroupSchema, MoveGroupSchema
 
 router = APIRouter(prefix='/groups', tags=['groups'])
@@ -79,6 +81,26 @@ async def move_group(schema: MoveGroupSchema,
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post('/{group_id}/calculate',
+             response_model=list[CardSchema],
+             description='Создать задачи на расчет всех карточек группы. '
+                         'Возвращает карточки, поставленные в очередь')
+async def calculate_group(group_id: UUID4,
+                          user: User = Depends(get_current_user),
+                          use_case: CalculateGroupUseCase = Depends(get_calculate_group_use_case)):
+    try:
+        result = await use_case.execute(group_id, user.id)
+        return [CardSchema(**card.dump()) for card in result]
+    except GroupNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except NotAGroupOwner as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except FailedToStartCalculation as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except NPIToolsException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.delete('/{group_id}',
                response_model=GroupSchema,
                description='Удаляет группу карточек (карточки тоже удаляются)')
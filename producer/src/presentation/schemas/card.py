@@ -60,3 +60,7 @@ class MoveCardSchema(BaseModel):
     card_id: UUID4
     group_id: UUID4
     order: Optional[int] = Field(None, ge=0)
+
+
+class CalculateCardsSchema(BaseModel):
+    card_ids: list[UUID4] = Field(..., min_length=1, max_length=1000)